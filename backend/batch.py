@@ -0,0 +1,274 @@
+"""Runs a template many times from the command line, without the GUI
+
+The template is chosen by its title. Its inputs are filled in from --set
+options and, if given, from each row of a CSV file (with a header) or each
+object of a JSONL file, so one process can run thousands of lookups or
+changes. The keys are described in backend.templates.
+
+Every page of the output is written as CSV or JSONL. When an input file is
+given, each row of output starts with the number of the row of input which
+made it.
+
+Every parameter set runs in one transaction, which is committed at the end
+unless --dry-run is given.
+
+Usage:
+    python3 -m backend.batch --list
+    python3 -m backend.batch TITLE [--set KEY=VALUE ...] [--input FILE]
+                             [--format csv|jsonl] [--output FILE]
+                             [--profile PROFILE] [--dry-run] [--database DB]
+"""
+
+import argparse
+import csv
+import json
+import os
+import sqlite3
+import sys
+
+import backend.master
+import backend.profiles
+import backend.templates
+
+
+def read_inputs(path, format_=None):
+    """Reads the parameter sets from a CSV or JSONL file
+
+    Arguments:
+        path (str)
+            -- The file or "-" for stdin
+
+    Keyword Arguments:
+        format_ (str) default None
+            -- "csv" or "jsonl", or None to use the extension of the file
+
+    Returns:
+        parameter_sets (Iterator[dict[str:Any]])
+            -- The values of the inputs of each parameter set
+    """
+    if format_ is None:
+        format_ = "jsonl" if os.path.splitext(path)[1] in (".jsonl", ".json") else "csv"
+
+    file = sys.stdin if path == "-" else open(path, newline="", encoding="utf-8")
+    try:
+        if format_ == "csv":
+            yield from csv.DictReader(file)
+        else:
+            for line in file:
+                if line.strip():
+                    yield json.loads(line)
+    finally:
+        if file is not sys.stdin:
+            file.close()
+
+
+class Writer:
+    """Writes the output of the queries as CSV or JSONL
+
+    Attributes:
+        Private:
+            __file (TextIO)
+                -- The file written to
+            __format (str)
+                -- "csv" or "jsonl"
+            __numbered (bool)
+                -- Whether each row starts with the number of its input
+            __csv (csv.writer|None)
+                -- Writes the rows when the format is CSV
+            __headings (list[str]|None)
+                -- The headings written at the top of the CSV
+
+    Methods:
+        Magic:
+            __init__(file: TextIO, format_: str, numbered: bool) -> None
+        Public:
+            write(number: int, headings: list[str], rows: list[tuple]) -> None
+                -- Writes rows of output
+    """
+
+    def __init__(self, file, format_, numbered):
+        """The constructor for Writer
+
+        Arguments:
+            file (TextIO)
+                -- The file to write to
+            format_ (str)
+                -- "csv" or "jsonl"
+            numbered (bool)
+                -- Whether each row starts with the number of its input
+
+        Returns:
+            None
+        """
+        self.__file = file
+        self.__format = format_
+        self.__numbered = numbered
+        self.__csv = csv.writer(file) if format_ == "csv" else None
+        self.__headings = None
+
+    def write(self, number, headings, rows):
+        """Writes rows of output
+
+        Arguments:
+            number (int)
+                -- The number of the input which made the rows
+            headings (list[str])
+                -- The heading of each column
+            rows (list[tuple])
+                -- The rows
+
+        Returns:
+            None
+        """
+        if self.__numbered:
+            headings = ["Input"] + headings
+            rows = [(number,) + tuple(row) for row in rows]
+
+        if self.__csv is None:
+            for row in rows:
+                self.__file.write(json.dumps(dict(zip(headings, row)), default=str))
+                self.__file.write("\n")
+            return
+
+        # Only write the headings once, at the top
+        if self.__headings is None:
+            self.__headings = headings
+            self.__csv.writerow(headings)
+        self.__csv.writerows(rows)
+
+
+def run(master, template, parameter_sets, writer):
+    """Runs a template once for each parameter set
+
+    Arguments:
+        master (backend.master.Backend)
+            -- The backend
+        template (xml.etree.ElementTree.ElementTree)
+            -- The template
+        parameter_sets (Iterable[dict[str:Any]])
+            -- The values of the inputs of each run
+        writer (backend.batch.Writer)
+            -- Writes the output
+
+    Returns:
+        counts (dict[str:int])
+            -- How many parameter sets ran and failed, and how many rows were
+               written and changed
+    """
+    counts = {"runs": 0, "failed": 0, "rows": 0, "changed": 0}
+
+    for number, values in enumerate(parameter_sets, 1):
+        counts["runs"] += 1
+        try:
+            query = backend.templates.compile_template(master, template, values)
+
+            # Changes have no output
+            if query.changed_db():
+                counts["changed"] += max(master.handle_query(query).rowcount, 0)
+                continue
+
+            # Read every page
+            headings = backend.templates.gen_headings(query)
+            while True:
+                for rows in master.stream_query(query):
+                    writer.write(number, headings, rows)
+                    counts["rows"] += len(rows)
+                if not query.has_next():
+                    break
+                query.next_page()
+
+        # Report the parameter sets which fail and carry on
+        except (ValueError, sqlite3.IntegrityError) as err:
+            counts["failed"] += 1
+            print(f"Input {number}: {err}", file=sys.stderr)
+
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Run a template for many parameter sets without the GUI"
+    )
+    parser.add_argument("title", nargs="?", help="the title of the template")
+    parser.add_argument(
+        "--list", action="store_true", help="list the titles of the templates"
+    )
+    parser.add_argument(
+        "--set",
+        action="append",
+        default=[],
+        metavar="KEY=VALUE",
+        help="a value used by every parameter set",
+    )
+    parser.add_argument(
+        "--input", help="a CSV or JSONL file of parameter sets (- for stdin)"
+    )
+    parser.add_argument("--input-format", choices=("csv", "jsonl"))
+    parser.add_argument("--format", choices=("csv", "jsonl"), default="csv")
+    parser.add_argument("--output", help="the file to write to (default stdout)")
+    parser.add_argument(
+        "--profile",
+        choices=sorted(backend.profiles.PROFILES),
+        help="the tuning profile of the connection",
+    )
+    parser.add_argument(
+        "--dry-run", action="store_true", help="roll back the changes at the end"
+    )
+    parser.add_argument("--database", default=backend.master.DB_NAME)
+    args = parser.parse_args()
+
+    templates = backend.templates.load_templates()
+
+    if args.list:
+        for title in sorted(templates):
+            print(title)
+        return
+
+    if args.title not in templates:
+        parser.error(f"unknown template {args.title!r} (see --list)")
+
+    # The values every parameter set shares
+    defaults = {}
+    for pair in args.set:
+        key, sep, value = pair.partition("=")
+        if not sep:
+            parser.error(f"--set needs KEY=VALUE, not {pair!r}")
+        defaults[key] = value
+
+    if args.input is None:
+        parameter_sets = [defaults]
+    else:
+        parameter_sets = (
+            {**defaults, **values}
+            for values in read_inputs(args.input, args.input_format)
+        )
+
+    master = backend.master.Backend(args.database, profile=args.profile)
+    output = sys.stdout
+    if args.output is not None:
+        output = open(args.output, "w", newline="", encoding="utf-8")
+
+    try:
+        writer = Writer(output, args.format, args.input is not None)
+        counts = run(master, templates[args.title], parameter_sets, writer)
+
+        if args.dry_run:
+            master.rollback()
+        else:
+            master.commit()
+    finally:
+        if output is not sys.stdout:
+            output.close()
+        master.close()
+
+    print(
+        f"{counts['runs']} parameter sets, {counts['failed']} failed,"
+        f" {counts['rows']} rows written, {counts['changed']} rows changed",
+        file=sys.stderr,
+    )
+    if counts["failed"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""The file which contains the tokens used to cancel queries"""
+
+import sqlite3
+import threading
+
+
+class QueryCancelled(sqlite3.OperationalError):
+    """Raised when a query is cancelled or runs out of time"""
+
+
+class CancelToken:
+    """A flag which cancels the query it is given to
+
+    The token may be cancelled from any thread. The query is interrupted
+    straight away if it is running, otherwise it is stopped as soon as it
+    starts.
+
+    Attributes:
+        Private:
+            __event (threading.Event)
+                -- Set when the token is cancelled
+            __reason (str)
+                -- Why the token was cancelled
+            __lock (threading.Lock)
+                -- Guards __interrupt
+            __interrupt (Callable[[], None]|None)
+                -- Interrupts the running query
+
+    Methods:
+        Magic:
+            __init__() -> None
+        Public:
+            cancel(reason:str="Cancelled") -> None
+                -- Cancels the query
+            is_cancelled() -> bool
+                -- Whether the token has been cancelled
+            get_reason() -> str|None
+                -- Gets why the token was cancelled
+            bind(interrupt: Callable[[], None]|None) -> None
+                -- Sets what to call to interrupt the running query
+    """
+
+    def __init__(self):
+        """The constructor for CancelToken
+
+        Arguments:
+            None
+
+        Returns:
+            None
+        """
+        self.__event = threading.Event()
+        self.__reason = None
+        self.__lock = threading.Lock()
+        self.__interrupt = None
+
+    def cancel(self, reason="Cancelled"):
+        """Cancels the query
+
+        Arguments:
+            None
+
+        Keyword Arguments:
+            reason (str) default "Cancelled"
+                -- Why the query was cancelled
+
+        Returns:
+            None
+        """
+        with self.__lock:
+            # Only remember the first reason
+            if self.__event.is_set():
+                return
+            self.__reason = reason
+            self.__event.set()
+
+            if self.__interrupt is not None:
+                self.__interrupt()
+
+    def is_cancelled(self):
+        """Whether the token has been cancelled"""
+        return self.__event.is_set()
+
+    def get_reason(self):
+        """Gets why the token was cancelled"""
+        return self.__reason
+
+    def bind(self, interrupt):
+        """Sets what to call to interrupt the running query
+
+        Arguments:
+            interrupt (Callable[[], None]|None)
+                -- Interrupts the running query or None once the query has
+                   finished
+
+        Returns:
+            None
+        """
+        with self.__lock:
+            self.__interrupt = interrupt
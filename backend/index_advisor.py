@@ -0,0 +1,229 @@
+"""Advises which indexes the XML templates need and creates them
+
+Every column a template looks rows up by (its search data, optional data and
+links) should lead an index, otherwise the lookup scans the whole table. If a
+template also orders by columns of the same table, they are added after the
+lookup column so the rows come out of the index already in order.
+
+Usage:
+    python3 -m backend.index_advisor [--apply] [database]
+"""
+
+import argparse
+import re
+import sqlite3
+import sys
+
+import backend.master
+import backend.schema
+import backend.templates
+from backend.sqlescape import escape
+
+# The inputs which rows are looked up by. Checkboxes and radio buttons only
+# have a few values, so an index on them would not help.
+LOOKUP_TAGS = ("entry", "phone", "email", "number", "date")
+
+# Matches Table.Field in custom SQL
+COLUMN_RE = re.compile(r"(\w+)\.(\w+)")
+
+
+def collect_columns(template):
+    """Collects the columns a template uses to look up and order rows
+
+    Arguments:
+        template (xml.etree.ElementTree.ElementTree)
+            -- The template
+
+    Returns:
+        columns (dict[str:list[(str, str)]])
+            -- The (table, field) pairs which are always looked up by
+               ("required"), may be looked up by ("optional"), are linked on
+               ("link") and are ordered or grouped by ("order")
+    """
+    root = template.getroot()
+    columns = {"required": [], "optional": [], "link": [], "order": []}
+
+    def walk(node, kind):
+        for item in node:
+            if item.tag == "horizontal":
+                walk(item, kind)
+            elif item.tag == "optional":
+                walk(item, "optional")
+            elif item.tag == "link":
+                for table_field in item:
+                    columns["link"].append(
+                        (table_field.attrib["table"], table_field.attrib["field"])
+                    )
+            elif item.tag == "custom-tail":
+                columns["order"].extend(COLUMN_RE.findall(item.text))
+            elif item.tag in LOOKUP_TAGS and kind is not None:
+                columns[kind].append((item.attrib["table"], item.attrib["field"]))
+
+    for item in root:
+        if item.tag == "search-data":
+            walk(item, "required")
+        elif item.tag == "constraints":
+            walk(item, None)
+
+    # The keys to order by and the page key
+    for key in root.attrib.get("order-by", "").split(","):
+        if key.strip():
+            columns["order"].append(tuple(key.split()[0].split(".")))
+    for key in root.attrib.get("page-key", "").split():
+        columns["order"].append(tuple(key.split(".")))
+
+    return columns
+
+
+def propose_indexes(templates, schema):
+    """Proposes the smallest set of indexes which covers every lookup
+
+    Arguments:
+        templates (Iterable[xml.etree.ElementTree.ElementTree])
+            -- The templates
+        schema (backend.schema.Schema)
+            -- The schema of the database
+
+    Returns:
+        proposals (list[(str, list[str])])
+            -- The table and the columns of each index
+    """
+    candidates = []
+
+    for template in templates:
+        root = template.getroot()
+
+        # Adding rows does not look any up
+        if root.attrib["type"] == "add":
+            continue
+
+        columns = collect_columns(template)
+
+        # Ignore (and warn about) columns which do not exist
+        for kind in columns:
+            known = []
+            for table, field in columns[kind]:
+                if schema.has_column(table, field):
+                    known.append((table, field))
+                else:
+                    # Warn on stderr so stdout stays a valid SQL script
+                    print(f"Warning: {root.attrib['title']} uses unknown "
+                          f"column {table}.{field}", file=sys.stderr)
+            columns[kind] = known
+
+        # The columns ordered by on each table
+        order = {}
+        for table, field in columns["order"]:
+            order.setdefault(table, [])
+            if field not in order[table]:
+                order[table].append(field)
+
+        def propose(table, field):
+            # The rowid is already the best index, and every index ends with
+            # it anyway
+            rowid = schema.get_rowid(table)
+            if field == rowid:
+                return
+            key = [field]
+            for other in order.get(table, []):
+                if other not in (field, rowid):
+                    key.append(other)
+            candidates.append((table, key))
+
+        # Both sides of a link so either table can be looked up from the other
+        for table, field in columns["link"]:
+            propose(table, field)
+
+        # Each optional field may be the only one filled in
+        for table, field in columns["optional"]:
+            propose(table, field)
+
+        # The required fields are always filled in together, so only one
+        # of them needs to be indexed
+        required = columns["required"]
+        if required and not any(
+            schema.is_indexed(table, [field]) for table, field in required
+        ):
+            propose(*required[0])
+
+    # Only keep the longest of the indexes which start the same way, and
+    # leave out any which an existing index already starts with
+    proposals = []
+    for table, key in sorted(candidates):
+        if schema.is_indexed(table, key):
+            continue
+        if any(
+            other_table == table and other_key[: len(key)] == key
+            for other_table, other_key in candidates
+            if (other_table, other_key) != (table, key)
+        ):
+            continue
+        if (table, key) not in proposals:
+            proposals.append((table, key))
+
+    return proposals
+
+
+def gen_index_sql(table, key):
+    """Generates the statement which creates an index
+
+    Arguments:
+        table (str)
+            -- The table
+        key (list[str])
+            -- The columns of the index
+
+    Returns:
+        text (str)
+            -- The CREATE INDEX statement
+    """
+    name = escape(f"idx_{table}_{'_'.join(key)}")
+    columns = ",".join(escape(field) for field in key)
+    return f"CREATE INDEX IF NOT EXISTS {name} ON {escape(table)}({columns})"
+
+
+def create_indexes(conn, proposals):
+    """Creates the proposed indexes
+
+    Arguments:
+        conn (sqlite3.Connection)
+            -- The connection to the database
+        proposals (list[(str, list[str])])
+            -- The table and the columns of each index
+
+    Returns:
+        None
+    """
+    for table, key in proposals:
+        conn.execute(gen_index_sql(table, key))
+
+    # Let the query planner know about the new indexes
+    conn.execute("ANALYZE")
+    conn.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Advise (and create) the indexes the templates need"
+    )
+    parser.add_argument("database", nargs="?", default=backend.master.DB_NAME)
+    parser.add_argument(
+        "--apply", action="store_true", help="create the indexes as well"
+    )
+    args = parser.parse_args()
+
+    templates = backend.templates.load_templates().values()
+
+    connection = sqlite3.connect(args.database)
+    proposals = propose_indexes(templates, backend.schema.Schema(connection))
+
+    for table, key in proposals:
+        print(gen_index_sql(table, key) + ";")
+
+    if args.apply:
+        create_indexes(connection, proposals)
+    connection.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,289 @@
+"""The file which contains the journal used to undo and redo changes"""
+
+import collections
+import json
+
+from backend.sqlescape import escape
+
+
+def read_rows(conn, table, rowids):
+    """Reads rows of a table by their rowid
+
+    Arguments:
+        conn (sqlite3.Connection)
+            -- The connection to the database
+        table (str)
+            -- The table
+        rowids (list[int])
+            -- The rowids of the rows
+
+    Returns:
+        rows (list[tuple])
+            -- The rows, each starting with its rowid
+    """
+    if not rowids:
+        return []
+
+    # Pass the rowids as one JSON parameter so there can be any number
+    return conn.execute(
+        f"SELECT rowid, * FROM {escape(table)} "
+        f"WHERE rowid IN (SELECT value FROM json_each(?))",
+        [json.dumps(rowids)],
+    ).fetchall()
+
+
+class UndoJournal:
+    """A bounded journal of the changes made to the database
+
+    Each change is stored as the images of the rows it changed, before and
+    after the change. Undoing a change writes the rows before it back and
+    redoing it writes the rows after it back, so changes can be undone after
+    they have been committed.
+
+    Both the number of changes and the number of row images kept are
+    bounded. Once there are too many images, the oldest changes are
+    forgotten, so a change to more rows than the limit can not be undone.
+
+    Attributes:
+        Private:
+            __max_rows (int)
+                -- How many row images can be kept
+            __undo (collections.deque[(str, list[str], list[tuple], list[tuple])])
+                -- The changes which can be undone, most recent last
+            __redo (collections.deque[(str, list[str], list[tuple], list[tuple])])
+                -- The changes which can be redone, most recently undone last
+            __saved (tuple)
+                -- Copies of __undo and __redo from the last commit
+
+    Methods:
+        Magic:
+            __init__(max_depth:int=100, max_rows:int=100000) -> None
+        Public:
+            record(table: str,
+                   columns: list[str],
+                   before: list[tuple],
+                   after: list[tuple]) -> None
+                -- Records a change
+            undo(conn: sqlite3.Connection,
+                 schema: backend.schema.Schema) -> str|None
+                -- Undoes the most recent change
+            redo(conn: sqlite3.Connection,
+                 schema: backend.schema.Schema) -> str|None
+                -- Redoes the most recently undone change
+            count_rows() -> int
+                -- Counts the row images kept
+            can_undo() -> bool
+                -- Whether there is a change to undo
+            can_redo() -> bool
+                -- Whether there is a change to redo
+            save() -> None
+                -- Remembers the journal as it is when committing
+            restore() -> None
+                -- Goes back to the journal as it was at the last commit
+        Private:
+            __apply(conn: sqlite3.Connection,
+                    schema: backend.schema.Schema,
+                    table: str,
+                    columns: list[str],
+                    old: list[tuple],
+                    new: list[tuple]) -> None
+                -- Replaces the old images of rows with the new images
+    """
+
+    def __init__(self, max_depth=100, max_rows=100000):
+        """The constructor for UndoJournal
+
+        Arguments:
+            None
+
+        Keyword Arguments:
+            max_depth (int) default 100
+                -- How many changes can be undone
+            max_rows (int) default 100000
+                -- How many row images can be kept, before and after counted
+                   separately
+
+        Returns:
+            None
+        """
+        self.__max_rows = max_rows
+        self.__undo = collections.deque(maxlen=max_depth)
+        self.__redo = collections.deque(maxlen=max_depth)
+        self.save()
+
+    def record(self, table, columns, before, after):
+        """Records a change
+
+        Arguments:
+            table (str)
+                -- The table which was changed
+            columns (list[str])
+                -- The columns of the images, starting with the rowid
+            before (list[tuple])
+                -- The rows before the change
+            after (list[tuple])
+                -- The rows after the change
+
+        Returns:
+            None
+        """
+        # Changes which did nothing can not be undone
+        if not before and not after:
+            return
+
+        self.__undo.append((table, columns, before, after))
+
+        # A new change means the undone changes can not be redone
+        self.__redo.clear()
+
+        # Forget the oldest changes until the images fit. Only the oldest
+        # can go, as undoing a change needs every later one undone first
+        while self.__undo and self.count_rows() > self.__max_rows:
+            self.__undo.popleft()
+
+    def undo(self, conn, schema):
+        """Undoes the most recent change
+
+        Arguments:
+            conn (sqlite3.Connection)
+                -- The connection to the database
+            schema (backend.schema.Schema)
+                -- The schema of the database
+
+        Returns:
+            table (str|None)
+                -- The table which was changed or None if there was nothing
+                   to undo
+        """
+        if not self.__undo:
+            return None
+
+        table, columns, before, after = self.__undo[-1]
+        self.__apply(conn, schema, table, columns, after, before)
+
+        # Only move the change once it has been undone
+        self.__redo.append(self.__undo.pop())
+        return table
+
+    def redo(self, conn, schema):
+        """Redoes the most recently undone change
+
+        Arguments:
+            conn (sqlite3.Connection)
+                -- The connection to the database
+            schema (backend.schema.Schema)
+                -- The schema of the database
+
+        Returns:
+            table (str|None)
+                -- The table which was changed or None if there was nothing
+                   to redo
+        """
+        if not self.__redo:
+            return None
+
+        table, columns, before, after = self.__redo[-1]
+        self.__apply(conn, schema, table, columns, before, after)
+
+        # Only move the change once it has been redone
+        self.__undo.append(self.__redo.pop())
+        return table
+
+    def __apply(self, conn, schema, table, columns, old, new):
+        """Replaces the old images of rows with the new images
+
+        Arguments:
+            conn (sqlite3.Connection)
+                -- The connection to the database
+            schema (backend.schema.Schema)
+                -- The schema of the database
+            table (str)
+                -- The table
+            columns (list[str])
+                -- The columns of the images, starting with the rowid
+            old (list[tuple])
+                -- The rows to remove
+            new (list[tuple])
+                -- The rows to put back
+
+        Returns:
+            None
+        """
+        # If the table has an INTEGER PRIMARY KEY, it is the rowid and is
+        # already in the columns. Otherwise the rowid is set explicitly.
+        if schema.get_rowid(table) == "rowid":
+            fields = ["rowid"] + columns[1:]
+            rows = new
+        else:
+            fields = columns[1:]
+            rows = [row[1:] for row in new]
+
+        insert = (
+            f"INSERT INTO {escape(table)}"
+            f"({','.join(escape(field) for field in fields)}) "
+            f"VALUES ({','.join('?' for _ in fields)})"
+        )
+
+        # Either every row is replaced or none are
+        conn.execute("SAVEPOINT journal")
+        try:
+            conn.execute(
+                f"DELETE FROM {escape(table)} "
+                f"WHERE rowid IN (SELECT value FROM json_each(?))",
+                [json.dumps([row[0] for row in old])],
+            )
+            conn.executemany(insert, rows)
+        except Exception:
+            conn.execute("ROLLBACK TO journal")
+            raise
+        finally:
+            conn.execute("RELEASE journal")
+
+    def count_rows(self):
+        """Counts the row images kept
+
+        Arguments:
+            None
+
+        Returns:
+            rows (int)
+                -- How many rows are stored before and after the changes
+                   which can be undone or redone
+        """
+        return sum(
+            len(before) + len(after)
+            for _, _, before, after in (*self.__undo, *self.__redo)
+        )
+
+    def can_undo(self):
+        """Whether there is a change to undo"""
+        return bool(self.__undo)
+
+    def can_redo(self):
+        """Whether there is a change to redo"""
+        return bool(self.__redo)
+
+    def save(self):
+        """Remembers the journal as it is when committing
+
+        Arguments:
+            None
+
+        Returns:
+            None
+        """
+        self.__saved = (self.__undo.copy(), self.__redo.copy())
+
+    def restore(self):
+        """Goes back to the journal as it was at the last commit
+
+        Used when rolling back, as the changes since the commit are lost.
+
+        Arguments:
+            None
+
+        Returns:
+            None
+        """
+        self.__undo, self.__redo = self.__saved
+        self.save()
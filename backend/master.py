@@ -1,9 +1,25 @@
 """The backend master file"""
 
+import collections
+import contextlib
 import sqlite3
 import os
+import random
+import re
+import sys
+import time
 
+import backend.cancel
+import backend.journal
+import backend.migrations
+import backend.profiles
 import backend.query
+import backend.query_cache
+import backend.result_cache
+import backend.result_stream
+import backend.schema
+import backend.slow_log
+import backend.timings
 
 # Get the directory of this file
 DIR = os.path.split(os.path.realpath(__file__))[0]
@@ -11,6 +27,56 @@ DIR = os.path.split(os.path.realpath(__file__))[0]
 # Get the database
 DB_NAME = os.path.join(DIR, "sunnytots.db")
 
+# How many virtual machine steps sqlite runs between checks for cancellation
+PROGRESS_STEPS = 1000
+
+# How many rows to read from a result at a time
+BATCH_SIZE = 100
+
+# How many changes can be undone
+UNDO_DEPTH = 100
+
+# How many row images the undo journal may keep, before and after counted
+# separately
+UNDO_ROWS = 100000
+
+# How many changes to make before committing when autosaving
+AUTOSAVE_WRITES = 20
+
+# How long after the last change a transaction counts as idle (s)
+IDLE_RELEASE = 5
+
+# How long sqlite waits for another connection to release a lock (s)
+BUSY_TIMEOUT = 5.0
+
+# How many times to try again if the database is still locked after that
+BUSY_RETRIES = 5
+
+# How long to wait before the first retry, doubling each time (s)
+BUSY_BACKOFF = 0.05
+
+# How many of the statements run for a query are kept for the slow query log
+TRACE_DEPTH = 50
+
+
+def is_busy(err):
+    """Whether an error is caused by the database being locked
+
+    Arguments:
+        err (sqlite3.Error)
+            -- The error
+
+    Returns:
+        is_busy (bool)
+            -- Whether another connection holds a lock
+    """
+    code = getattr(err, "sqlite_errorcode", None)
+    if code is not None:
+        # Ignore the extended part of the code
+        return code & 0xFF in (sqlite3.SQLITE_BUSY, sqlite3.SQLITE_LOCKED)
+
+    return "locked" in str(err)
+
 
 class Backend:
     """The backend master.
@@ -21,31 +87,173 @@ class Backend:
                 -- The database name
             __connection (sqlite3.Connection)
                 -- The connection to the database
-            __current_query_id (int)
-                -- The ID of the most recent query
+            __journal (backend.journal.UndoJournal)
+                -- The changes which can be undone and redone
+            __autosave_writes (int|None)
+                -- How many changes to make before committing or None to
+                   only commit when asked
+            __unsaved_writes (int)
+                -- How many changes have been made since the last commit
+            __last_write (float)
+                -- When the last change was made (time.monotonic)
+            __busy_retries (int)
+                -- How many times to retry when the database is locked
+            __lock_stats (dict[str:int|float])
+                -- How long was spent waiting for the write lock
+            __query_cache (backend.query_cache.QueryCache)
+                -- The cache of compiled query shapes
+            __result_cache (backend.result_cache.ResultCache)
+                -- The cache of the rows read by queries
+            __data_version (int|None)
+                -- The PRAGMA data_version the cached results were read at
+            __table_re (re.Pattern)
+                -- Matches the name of any table in the text of a query
+            __schema (backend.schema.Schema)
+                -- The tables, columns and indexes of the database
+            __profile (str)
+                -- The name of the tuning profile of the connection
+            __deadline (float|None)
+                -- When the running query runs out of time
+                   (time.monotonic) or None if it has no budget
+            __cancel (backend.cancel.CancelToken|None)
+                -- The token which cancels the running query
+            __timings (backend.timings.Timings)
+                -- How long each step of each template took
+            __slow_log (backend.slow_log.SlowQueryLog|None)
+                -- The queries which took too long, or None if they are not
+                   logged
+            __statements (collections.deque[str])
+                -- The statements SQLite has run for the running query
 
     Methods:
         Magic:
-            __init__(db_name:str=DB_NAME)
+            __init__(db_name:str=DB_NAME,
+                     profile:str=None,
+                     autosave_writes:int=None,
+                     busy_timeout:float=BUSY_TIMEOUT,
+                     busy_retries:int=BUSY_RETRIES,
+                     timings_log:str=None,
+                     slow_query_ms:float=None,
+                     slow_query_log:str=None)
         Public:
-            handle_query(query: backend.query.Query)
+            handle_query(query: backend.query.Query,
+                         budget: float=None,
+                         cancel: backend.cancel.CancelToken=None)
                 -- handles a query
+            stream_query(query: backend.query.Query,
+                         batch_size: int=BATCH_SIZE,
+                         budget: float=None,
+                         cancel: backend.cancel.CancelToken=None)
+                         -> backend.result_stream.ResultStream
+                -- Handles a query and reads its result in batches
+            gen_cancel_token() -> backend.cancel.CancelToken
+                -- Generates a token to cancel a query with
             commit() -> None
                 -- Commits the database
+            autosave() -> None
+                -- Commits any changes and checkpoints the write-ahead log
+            get_unsaved_writes() -> int
+                -- Accessor method for __unsaved_writes
+            release_if_idle(idle:float=IDLE_RELEASE) -> bool
+                -- Commits the transaction if no change has been made for a
+                   while
             rollback() -> None
                 -- Rolls back the database
             close() -> None
                 -- Closes the database
             undo() -> None
                 -- Undoes the database one step
+            redo() -> None
+                -- Redoes the most recently undone step
             gen_new_query() -> backend.query.Query
                 -- Generates a new query
+            get_query_cache_stats() -> dict[str:int]
+                -- Gets the hit and miss counters of the query cache
+            get_result_cache_stats() -> dict[str:int|float]
+                -- Gets the counters of the result cache
+            get_lock_stats() -> dict[str:int|float]
+                -- Gets how long was spent waiting for the write lock
+            get_timings() -> backend.timings.Timings
+                -- Accessor method for __timings
+            explain_query(query: backend.query.Query) -> list[str]
+                -- Gets the plan SQLite would use to run a query
+            get_slow_queries() -> list[dict[str:Any]]
+                -- Gets the latest slow queries
+            get_profile() -> str
+                -- Gets the name of the tuning profile
+            set_profile(profile: str) -> None
+                -- Commits the database and changes the tuning profile
+            use_profile(profile: str) -> ContextManager[Backend]
+                -- Changes the tuning profile until the end of a with block
         Private:
-            __add_savepoint() -> None
-                -- Adds a savepoint to the database
+            __compile(query: backend.query.Query) -> (str, list[Any])
+                -- Checks and compiles a query
+            __execute(query: backend.query.Query,
+                      qtext: str,
+                      param: list[Any],
+                      budget: float,
+                      cancel: backend.cancel.CancelToken) -> sqlite3.Cursor
+                -- Executes a compiled query
+            __execute_change(query: backend.query.Query,
+                             qtext: str,
+                             param: list[Any]) -> sqlite3.Cursor
+                -- Executes a compiled query which changes the database and
+                   records the change in the journal
+            __begin() -> None
+                -- Starts the write transaction if it has not started
+            __retry(function: Callable, *args) -> Any
+                -- Calls a function, trying again while the database is
+                   locked
+            __count_write() -> None
+                -- Counts a change and commits if there have been enough to
+                   autosave
+            __changed(table: str|None) -> None
+                -- Forgets the results which may have read a changed table
+            __check_slow(title: str|None,
+                         seconds: float,
+                         qtext: str,
+                         param: list[Any]) -> None
+                -- Logs a query if it was slow
+            __watch_batches(title: str|None,
+                            seconds: float,
+                            qtext: str,
+                            param: list[Any],
+                            batches: Iterable[list[tuple]])
+                            -> Iterator[list[tuple]]
+                -- Passes on the batches of a result and then logs the
+                   query if it was slow
+            __explain(qtext: str, param: list[Any]) -> list[str]
+                -- Gets the plan of a compiled query
+            __check_data_version() -> None
+                -- Forgets the cached results if another connection has
+                   committed
+            __remember(key: tuple,
+                       qtext: str,
+                       query: backend.query.Query,
+                       columns: list[str],
+                       batches: Iterator[list[tuple]],
+                       generation: int) -> Iterator[list[tuple]]
+                -- Passes on the batches of a result and then caches it
+            __get_tables_read(qtext: str) -> set[str]
+                -- Gets the tables named in the text of a query
+            __set_limit(budget: float=None,
+                        cancel: backend.cancel.CancelToken=None) -> None
+                -- Sets the time budget and cancel token of the queries
+            __check_progress() -> bool
+                -- Whether to stop the running query
     """
 
-    def __init__(self, db_name=DB_NAME):
+    def __init__(
+        self,
+        db_name=DB_NAME,
+        profile=None,
+        autosave_writes=None,
+        busy_timeout=BUSY_TIMEOUT,
+        busy_retries=BUSY_RETRIES,
+        timings_log=None,
+        slow_query_ms=None,
+        slow_query_log=None,
+    ):
         """The constructor for Backend
 
         Arguments:
@@ -54,69 +262,734 @@ class Backend:
         Keyword Arguments:
             db_name (str) default DB_NAME
                 -- The name of the database
+            profile (str) default None
+                -- The name of the tuning profile (see backend.profiles) or
+                   None to read it from the environment
+            autosave_writes (int) default None
+                -- How many changes to make before committing (for example
+                   AUTOSAVE_WRITES) or None to only commit when asked
+            busy_timeout (float) default BUSY_TIMEOUT
+                -- How many seconds to wait for another connection to
+                   release a lock
+            busy_retries (int) default BUSY_RETRIES
+                -- How many times to try again if the database is still
+                   locked
+            timings_log (str) default None
+                -- The file to append the timings of the queries to, or None
+                   to read it from the environment (see backend.timings)
+            slow_query_ms (float) default None
+                -- How long a query may take before it is logged as slow
+                   (ms), or None to read it from the environment (see
+                   backend.slow_log)
+            slow_query_log (str) default None
+                -- The file to append the slow queries to, or None to read
+                   it from the environment
 
         Returns:
             None
         """
         self.__db_name = db_name
 
-        # Create a connection
-        self.__connection = sqlite3.connect(self.__db_name)
-        self.__current_query_id = 0
+        # Check the profile before opening the database
+        self.__profile = backend.profiles.get_profile_name(profile)
+
+        # Create a connection. It may be used from a thread other than the
+        # one which created it (see gui.worker), but only by one at a time.
+        # Transactions are started by the backend (see __begin), so reads
+        # outside of one run in autocommit mode and hold no lock
+        self.__connection = sqlite3.connect(
+            self.__db_name,
+            check_same_thread=False,
+            isolation_level=None,
+            timeout=busy_timeout,
+        )
+
+        # Bring the schema up to date before anything reads it
+        backend.migrations.migrate(self.__connection)
+
+        # Tune the connection before the first transaction starts
+        backend.profiles.apply_profile(self.__connection, self.__profile)
 
-        # Add the first save point
-        self.__add_savepoint()
+        # Remember the text of queries that have been compiled before
+        self.__query_cache = backend.query_cache.QueryCache()
 
-    def handle_query(self, query):
+        # Read the schema to check what queries can order by
+        self.__schema = backend.schema.Schema(self.__connection)
+
+        # Remember the rows read by queries until the tables they read change
+        self.__result_cache = backend.result_cache.ResultCache()
+        self.__data_version = None
+        tables = sorted(self.__schema.get_tables(), key=len, reverse=True)
+        self.__table_re = re.compile(
+            r"\b(" + "|".join(re.escape(table) for table in tables) + r")\b"
+        )
+
+        # Check every so often whether the running query should stop
+        self.__deadline = None
+        self.__cancel = None
+        self.__connection.set_progress_handler(
+            self.__check_progress, PROGRESS_STEPS
+        )
+
+        # Remember the changes so they can be undone, even after committing
+        self.__journal = backend.journal.UndoJournal(UNDO_DEPTH, UNDO_ROWS)
+
+        # Commit every so many changes so the write lock is not held for long
+        self.__autosave_writes = autosave_writes
+        self.__unsaved_writes = 0
+        self.__last_write = time.monotonic()
+
+        # Other instances of the app may share the database
+        self.__busy_retries = busy_retries
+        self.__lock_stats = {
+            "waits": 0,
+            "wait_time": 0.0,
+            "max_wait": 0.0,
+            "retries": 0,
+            "failures": 0,
+        }
+
+        # Time each step of the queries of each template
+        self.__timings = backend.timings.Timings(
+            backend.timings.get_log_file(timings_log)
+        )
+
+        # Log the queries which take too long, with every statement SQLite
+        # runs for them
+        threshold = backend.slow_log.get_threshold(slow_query_ms)
+        self.__slow_log = None
+        self.__statements = collections.deque(maxlen=TRACE_DEPTH)
+        if threshold is not None:
+            self.__slow_log = backend.slow_log.SlowQueryLog(
+                threshold, backend.slow_log.get_log_file(slow_query_log)
+            )
+            self.__connection.set_trace_callback(self.__statements.append)
+
+    def handle_query(self, query, budget=None, cancel=None):
         """Handles a query
 
+        The budget and the cancel token also cover fetching rows from the
+        result, until the next call to the backend.
+
+        Interrupting a change to the database would roll back every change
+        since the last commit, so queries which change the database ignore
+        the budget and the cancel token.
+
         Arguments:
             query (backend.query.Query)
                 -- The query to handle
 
+        Keyword Arguments:
+            budget (float) default None
+                -- How many seconds the query may run for or None for no
+                   limit
+            cancel (backend.cancel.CancelToken) default None
+                -- The token which cancels the query
+
         Returns:
-            None
+            result (sqlite3.Cursor)
+                -- The result of the query
+
+        Raises:
+            backend.cancel.QueryCancelled
+                -- If the query is cancelled or runs out of time
         """
-        try:
-            # Execute the query
-            result = query.execute(self.__connection)
+        title = query.get_title()
+
+        with self.__timings.time(title, "generate"):
+            qtext, param = self.__compile(query)
+
+        start = time.perf_counter()
+        with self.__timings.time(title, "execute"):
+            result = self.__execute(query, qtext, param, budget, cancel)
+
+        self.__check_slow(title, time.perf_counter() - start, qtext, param)
+        return result
 
-            # If the query might have changed the database, add a savepoint
+    def __compile(self, query):
+        """Checks and compiles a query
+
+        Arguments:
+            query (backend.query.Query)
+                -- The query to compile
+
+        Returns:
+            qtext (str)
+                -- The query text
+            param (list[Any])
+                -- The parameters of the query
+        """
+        # Make sure the query only orders by fields it can
+        query.check_order(self.__schema)
+
+        # Compile the query, reusing the text if the shape has been seen
+        return self.__query_cache.compile(query)
+
+    def __execute(self, query, qtext, param, budget, cancel):
+        """Executes a compiled query
+
+        Arguments:
+            query (backend.query.Query)
+                -- The query
+            qtext (str)
+                -- The query text
+            param (list[Any])
+                -- The parameters of the query
+            budget (float|None)
+                -- How many seconds the query may run for
+            cancel (backend.cancel.CancelToken|None)
+                -- The token which cancels the query
+
+        Returns:
+            result (sqlite3.Cursor)
+                -- The result of the query
+        """
+        # Only keep the statements run for this query
+        self.__statements.clear()
+
+        # Limit the query if it only reads
+        if query.changed_db():
+            self.__set_limit()
+        else:
+            self.__set_limit(budget, cancel)
+
+        # Do not start a query which has already been cancelled
+        if self.__cancel is not None and self.__cancel.is_cancelled():
+            raise backend.cancel.QueryCancelled(self.__cancel.get_reason())
+
+        try:
+            # Execute the query, recording it if it changes the database
             if query.changed_db():
-                self.__add_savepoint()
+                result = self.__execute_change(query, qtext, param)
+            else:
+                result = self.__retry(self.__connection.execute, qtext, param)
         # In the case of an error
-        except sqlite3.Error:
-            # Get the query text and the parameters for debugging and raise
-            qtext, param = query.generate_query()
-            print(qtext, param)
+        except sqlite3.Error as err:
+            # If the query was stopped, say why
+            if self.__cancel is not None and self.__cancel.is_cancelled():
+                raise backend.cancel.QueryCancelled(
+                    self.__cancel.get_reason()
+                ) from err
+
+            # Print the query text and the parameters for debugging and raise
+            print(qtext, param, file=sys.stderr)
             raise
 
         # Return the result
         return result
 
+    def __execute_change(self, query, qtext, param):
+        """Executes a compiled query which changes the database and records
+        the change in the journal
+
+        The rows are read before and after the change in the same
+        transaction as the change, so the images match what was changed.
+
+        Arguments:
+            query (backend.query.Query)
+                -- The query
+            qtext (str)
+                -- The query text
+            param (list[Any])
+                -- The parameters of the query
+
+        Returns:
+            result (sqlite3.Cursor)
+                -- The result of the query
+        """
+        target = query.get_target()
+
+        # Start the transaction before reading the rows to be changed
+        self.__begin()
+
+        # Read the rows before they are changed
+        image_query = query.generate_image_query()
+        before = []
+        if image_query is not None:
+            before = self.__connection.execute(*image_query).fetchall()
+
+        result = self.__connection.execute(qtext, param)
+
+        # Read the rows after they are changed. A change keeps the rowids,
+        # and an addition adds a single row
+        if image_query is not None:
+            rowids = [row[0] for row in before]
+        elif result.rowcount > 0:
+            rowids = [result.lastrowid]
+        else:
+            rowids = []
+
+        if target is not None:
+            after = backend.journal.read_rows(self.__connection, target, rowids)
+            columns = ["rowid"] + self.__schema.get_columns(target)
+            self.__journal.record(target, columns, before, after)
+
+        self.__changed(target)
+        self.__count_write()
+        return result
+
+    def __begin(self):
+        """Starts the write transaction if it has not started
+
+        The write lock is taken straight away, so a change never fails
+        half way through waiting for another connection to finish writing.
+
+        Arguments:
+            None
+
+        Returns:
+            None
+        """
+        if self.__connection.in_transaction:
+            return
+
+        # Time how long it takes to get the lock
+        start = time.monotonic()
+        try:
+            self.__retry(self.__connection.execute, "BEGIN IMMEDIATE")
+        finally:
+            waited = time.monotonic() - start
+            self.__lock_stats["waits"] += 1
+            self.__lock_stats["wait_time"] += waited
+            self.__lock_stats["max_wait"] = max(
+                self.__lock_stats["max_wait"], waited
+            )
+
+    def __retry(self, function, *args):
+        """Calls a function, trying again while the database is locked
+
+        sqlite already waits up to the busy timeout for a lock. If it is
+        still locked, wait for longer each time before trying again, with
+        some randomness so several instances do not retry together.
+
+        Arguments:
+            function (Callable)
+                -- The function to call
+            *args
+                -- Passed to the function
+
+        Returns:
+            result (Any)
+                -- What the function returns
+
+        Raises:
+            sqlite3.OperationalError
+                -- If the database is still locked after every retry
+        """
+        delay = BUSY_BACKOFF
+        for attempt in range(self.__busy_retries + 1):
+            try:
+                return function(*args)
+            except sqlite3.OperationalError as err:
+                # Only a locked database is worth trying again
+                if not is_busy(err):
+                    raise
+                if attempt == self.__busy_retries:
+                    self.__lock_stats["failures"] += 1
+                    raise
+
+            self.__lock_stats["retries"] += 1
+            time.sleep(delay * random.uniform(0.5, 1.5))
+            delay *= 2
+
+    def __count_write(self):
+        """Counts a change and commits if there have been enough to autosave
+
+        Arguments:
+            None
+
+        Returns:
+            None
+        """
+        self.__unsaved_writes += 1
+        self.__last_write = time.monotonic()
+
+        if (
+            self.__autosave_writes is not None
+            and self.__unsaved_writes >= self.__autosave_writes
+        ):
+            self.autosave()
+
+    def __changed(self, table):
+        """Forgets the results which may have read a changed table
+
+        Arguments:
+            table (str|None)
+                -- The table which changed or None if it is not known
+
+        Returns:
+            None
+        """
+        # Also forget the results of tables a deletion may cascade to
+        if table is None:
+            self.__result_cache.clear()
+        else:
+            self.__result_cache.invalidate(
+                {table} | self.__schema.get_dependents(table)
+            )
+
+    def stream_query(self, query, batch_size=BATCH_SIZE, budget=None, cancel=None):
+        """Handles a query and reads its result in batches
+
+        The batches must be read before the next call to the backend.
+
+        Arguments:
+            query (backend.query.Query)
+                -- The query to handle
+
+        Keyword Arguments:
+            batch_size (int) default BATCH_SIZE
+                -- The most rows in each batch
+            budget (float) default None
+                -- How many seconds the query may run for or None for no
+                   limit
+            cancel (backend.cancel.CancelToken) default None
+                -- The token which cancels the query
+
+        Returns:
+            result (backend.result_stream.ResultStream)
+                -- The columns and the batches of rows of the result
+        """
+        title = query.get_title()
+
+        with self.__timings.time(title, "generate"):
+            qtext, param = self.__compile(query)
+
+        # Only results which read the database are cached
+        if query.changed_db():
+            start = time.perf_counter()
+            with self.__timings.time(title, "execute"):
+                cursor = self.__execute(query, qtext, param, budget, cancel)
+            self.__check_slow(title, time.perf_counter() - start, qtext, param)
+            return backend.result_stream.ResultStream(
+                query.get_columns(cursor),
+                self.__timings.time_batches(
+                    title, query.stream_rows(cursor, batch_size)
+                ),
+            )
+
+        # Forget the cached results if another connection changed the database
+        self.__check_data_version()
+
+        # If the result is cached, nothing needs to run
+        key = (" ".join(qtext.split()), tuple(param))
+        cached = self.__result_cache.get(key)
+        if cached is not None:
+            self.__set_limit()
+            columns, rows, state = cached
+            query.set_page_state(state)
+            return backend.result_stream.ResultStream(
+                columns,
+                self.__timings.time_batches(
+                    title,
+                    (rows[i : i + batch_size] for i in range(0, len(rows), batch_size)),
+                ),
+            )
+
+        # Otherwise run the query and cache the result once it has been read
+        generation = self.__result_cache.get_generation()
+        start = time.perf_counter()
+        with self.__timings.time(title, "execute"):
+            cursor = self.__execute(query, qtext, param, budget, cancel)
+        columns = query.get_columns(cursor)
+
+        # The query is only known to be slow once its rows have been read
+        batches = self.__remember(
+            key,
+            qtext,
+            query,
+            columns,
+            query.stream_rows(cursor, batch_size),
+            generation,
+        )
+        batches = self.__watch_batches(
+            title, time.perf_counter() - start, qtext, param, batches
+        )
+        return backend.result_stream.ResultStream(
+            columns, self.__timings.time_batches(title, batches)
+        )
+
+    def __check_slow(self, title, seconds, qtext, param):
+        """Logs a query if it was slow
+
+        Arguments:
+            title (str|None)
+                -- The title of the template of the query
+            seconds (float)
+                -- How long the query took (s)
+            qtext (str)
+                -- The query text
+            param (list[Any])
+                -- The parameters of the query
+
+        Returns:
+            None
+        """
+        if self.__slow_log is None or not self.__slow_log.is_slow(seconds):
+            return
+
+        # Copy the statements before explaining the query
+        statements = list(self.__statements)
+
+        # A query which could not be explained is still logged
+        try:
+            plan = self.__explain(qtext, param)
+        except sqlite3.Error as err:
+            plan = [f"EXPLAIN QUERY PLAN failed: {err}"]
+
+        self.__slow_log.record(title, seconds, qtext, param, statements, plan)
+
+    def __watch_batches(self, title, seconds, qtext, param, batches):
+        """Passes on the batches of a result and then logs the query if it
+        was slow
+
+        Only the time spent reading is counted, not the time the caller
+        spends on each batch.
+
+        Arguments:
+            title (str|None)
+                -- The title of the template of the query
+            seconds (float)
+                -- How long the query took to execute (s)
+            qtext (str)
+                -- The query text
+            param (list[Any])
+                -- The parameters of the query
+            batches (Iterable[list[tuple]])
+                -- The batches
+
+        Returns:
+            batches (Iterator[list[tuple]])
+                -- The same batches
+        """
+        iterator = iter(batches)
+        while True:
+            start = time.perf_counter()
+            try:
+                batch = next(iterator)
+            except StopIteration:
+                seconds += time.perf_counter() - start
+                break
+            seconds += time.perf_counter() - start
+            yield batch
+
+        self.__check_slow(title, seconds, qtext, param)
+
+    def __check_data_version(self):
+        """Forgets the cached results if another connection has committed
+
+        Other connections may be other instances of the app or the other
+        connections of backend.service.
+
+        Arguments:
+            None
+
+        Returns:
+            None
+        """
+        # PRAGMA data_version only changes when another connection commits
+        version = self.__connection.execute("PRAGMA data_version").fetchone()[0]
+        if version != self.__data_version:
+            self.__result_cache.clear()
+            self.__data_version = version
+
+    def __remember(self, key, qtext, query, columns, batches, generation):
+        """Passes on the batches of a result and then caches it
+
+        A result which is not read to the end is not cached.
+
+        Arguments:
+            key (tuple)
+                -- The text and the parameters of the query
+            qtext (str)
+                -- The query text
+            query (backend.query.Query)
+                -- The query
+            columns (list[str])
+                -- The names of the columns of the result
+            batches (Iterator[list[tuple]])
+                -- The rows of the result in batches
+            generation (int)
+                -- The generation of the result cache when the query started
+
+        Returns:
+            batches (Iterator[list[tuple]])
+                -- The same batches
+        """
+        rows = []
+        for batch in batches:
+            rows.extend(batch)
+            yield batch
+
+        self.__result_cache.put(
+            key,
+            self.__get_tables_read(qtext),
+            columns,
+            rows,
+            query.get_page_state(),
+            generation,
+        )
+
+    def __get_tables_read(self, qtext):
+        """Gets the tables named in the text of a query
+
+        Custom SQL may read tables the query does not know about, so the
+        whole text is searched.
+
+        Arguments:
+            qtext (str)
+                -- The query text
+
+        Returns:
+            tables (set[str])
+                -- The tables
+        """
+        return set(self.__table_re.findall(qtext))
+
+    def __set_limit(self, budget=None, cancel=None):
+        """Sets the time budget and cancel token of the queries
+
+        Arguments:
+            None
+
+        Keyword Arguments:
+            budget (float) default None
+                -- How many seconds the queries may run for or None for no
+                   limit
+            cancel (backend.cancel.CancelToken) default None
+                -- The token which cancels the queries
+
+        Returns:
+            None
+        """
+        # Stop the previous token interrupting later queries
+        if self.__cancel is not None:
+            self.__cancel.bind(None)
+
+        # A budget needs a token to cancel
+        if budget is not None and cancel is None:
+            cancel = backend.cancel.CancelToken()
+
+        if budget is None:
+            self.__deadline = None
+        else:
+            self.__deadline = time.monotonic() + budget
+        self.__cancel = cancel
+
+        # Let the token interrupt the query straight away
+        if self.__cancel is not None:
+            self.__cancel.bind(self.__connection.interrupt)
+
+    def __check_progress(self):
+        """Whether to stop the running query. Called by sqlite.
+
+        Arguments:
+            None
+
+        Returns:
+            stop (bool)
+                -- Whether to stop the query
+        """
+        if self.__cancel is None:
+            return False
+
+        if self.__deadline is not None and time.monotonic() > self.__deadline:
+            self.__cancel.cancel("Took too long")
+
+        return self.__cancel.is_cancelled()
+
+    def gen_cancel_token(self):
+        """Generates a token to cancel a query with
+
+        Arguments:
+            None
+
+        Returns:
+            cancel (backend.cancel.CancelToken)
+                -- The token
+        """
+        return backend.cancel.CancelToken()
+
     def commit(self):
         """Commits the database"""
-        self.__connection.commit()
+        self.__set_limit()
+        self.__retry(self.__connection.commit)
+        self.__unsaved_writes = 0
+
+        # The committed changes can still be undone after a rollback
+        self.__journal.save()
+
+    def autosave(self):
+        """Commits any changes and checkpoints the write-ahead log
+
+        Checkpointing after each commit keeps the log short, rather than
+        copying every change into the database when it is closed.
+
+        Arguments:
+            None
+
+        Returns:
+            None
+        """
+        # Nothing to save
+        if not self.__connection.in_transaction:
+            return
+
+        self.commit()
+
+        # Only copy what no reader is using, so the checkpoint never waits
+        self.__connection.execute("PRAGMA wal_checkpoint(PASSIVE)")
+
+    def get_unsaved_writes(self):
+        """Accessor method for __unsaved_writes"""
+        return self.__unsaved_writes
+
+    def release_if_idle(self, idle=IDLE_RELEASE):
+        """Commits the transaction if no change has been made for a while
+
+        This releases the write lock, so other connections can write while
+        the user is only reading.
+
+        Arguments:
+            None
+
+        Keyword Arguments:
+            idle (float) default IDLE_RELEASE
+                -- How many seconds since the last change count as idle
+
+        Returns:
+            released (bool)
+                -- Whether a transaction was committed
+        """
+        if not self.__connection.in_transaction:
+            return False
 
-        # Reset the savepoints
-        self.__current_query_id = 0
-        self.__add_savepoint()
+        if time.monotonic() - self.__last_write < idle:
+            return False
+
+        self.autosave()
+        return True
 
     def rollback(self):
         """Rolls back the database"""
+        self.__set_limit()
         self.__connection.rollback()
+        self.__unsaved_writes = 0
+        self.__result_cache.clear()
 
-        # Reset the savepoints
-
-        self.__current_query_id = 0
-        self.__add_savepoint()
+        # Forget the changes which were rolled back
+        self.__journal.restore()
 
     def close(self):
         """Closes the database"""
+        self.__set_limit()
         self.__connection.close()
+        self.__timings.close()
+        if self.__slow_log is not None:
+            self.__slow_log.close()
 
-    def __add_savepoint(self):
-        """Adds a savepoint to the database
+    def undo(self):
+        """Undoes the previous change to the database
 
         Arguments:
             None
@@ -124,32 +997,196 @@ class Backend:
         Returns:
             None
         """
-        # Increment the current query it
-        self.__current_query_id += 1
+        self.__set_limit()
 
-        # Add a savepoint of that ID (has a prefix of s as otherwise sqlite
-        # complains)
-        self.__connection.execute(f"SAVEPOINT s{self.__current_query_id}")
+        # If there is nothing to undo, do not start a transaction
+        if not self.__journal.can_undo():
+            return
 
-    def undo(self):
-        """Undoes the previous change to the database
+        # The undo is a change like any other, so it is committed or rolled
+        # back with them
+        self.__begin()
+
+        table = self.__journal.undo(self.__connection, self.__schema)
+
+        # If anything was undone, forget the results which may have read it
+        if table is not None:
+            self.__changed(table)
+            self.__count_write()
+
+    def redo(self):
+        """Redoes the most recently undone change to the database
+
+        Arguments:
+            None
+
+        Returns:
+            None
+        """
+        self.__set_limit()
+
+        # If there is nothing to redo, do not start a transaction
+        if not self.__journal.can_redo():
+            return
+
+        self.__begin()
+
+        table = self.__journal.redo(self.__connection, self.__schema)
+
+        # If anything was redone, forget the results which may have read it
+        if table is not None:
+            self.__changed(table)
+            self.__count_write()
+
+    def get_query_cache_stats(self):
+        """Gets the hit and miss counters of the query cache
+
+        Arguments:
+            None
+
+        Returns:
+            stats (dict[str:int])
+                -- The hits, misses and size of the query cache
+        """
+        return self.__query_cache.get_stats()
+
+    def get_result_cache_stats(self):
+        """Gets the counters of the result cache
+
+        Arguments:
+            None
+
+        Returns:
+            stats (dict[str:int|float])
+                -- The hits, misses, hit rate, evictions, invalidations, size
+                   and number of rows of the result cache
+        """
+        return self.__result_cache.get_stats()
+
+    def get_lock_stats(self):
+        """Gets how long was spent waiting for the write lock
+
+        Arguments:
+            None
+
+        Returns:
+            stats (dict[str:int|float])
+                -- How many times the lock was waited for, the total and
+                   longest waits (s), how many retries there were and how
+                   many times the lock could not be got
+        """
+        return dict(self.__lock_stats)
+
+    def get_slow_queries(self):
+        """Gets the latest slow queries
 
         Arguments:
             None
 
+        Returns:
+            entries (list[dict[str:Any]])
+                -- The slow queries, oldest first (see
+                   backend.slow_log.SlowQueryLog.record)
+        """
+        if self.__slow_log is None:
+            return []
+        return self.__slow_log.get_entries()
+
+    def get_timings(self):
+        """Accessor method for __timings"""
+        return self.__timings
+
+    def explain_query(self, query):
+        """Gets the plan SQLite would use to run a query
+
+        The query is compiled but not run, so this is safe for queries which
+        change the database.
+
+        Arguments:
+            query (backend.query.Query)
+                -- The query to explain
+
+        Returns:
+            plan (list[str])
+                -- Each step of the plan, indented by its depth
+        """
+        qtext, param = self.__compile(query)
+        return self.__explain(qtext, param)
+
+    def __explain(self, qtext, param):
+        """Gets the plan of a compiled query
+
+        Arguments:
+            qtext (str)
+                -- The query text
+            param (list[Any])
+                -- The parameters of the query
+
+        Returns:
+            plan (list[str])
+                -- Each step of the plan, indented by its depth
+        """
+        rows = self.__retry(
+            self.__connection.execute, "EXPLAIN QUERY PLAN " + qtext, param
+        ).fetchall()
+
+        # Each row is (id, parent, notused, detail). Indent the detail by
+        # how deep the step is
+        depths = {0: -1}
+        plan = []
+        for id_, parent, _, detail in rows:
+            depths[id_] = depths.get(parent, -1) + 1
+            plan.append("  " * depths[id_] + detail)
+        return plan
+
+    def get_profile(self):
+        """Gets the name of the tuning profile"""
+        return self.__profile
+
+    def set_profile(self, profile):
+        """Commits the database and changes the tuning profile
+
+        The journal mode and the safety level can not be changed inside a
+        transaction, so the changes so far are committed. They can still be
+        undone with the journal.
+
+        Arguments:
+            profile (str)
+                -- The name of the tuning profile
+
         Returns:
             None
         """
+        # Check the name before committing anything
+        profile = backend.profiles.get_profile_name(profile)
+        self.commit()
+        backend.profiles.apply_profile(self.__connection, profile)
+        self.__profile = profile
+
+    @contextlib.contextmanager
+    def use_profile(self, profile):
+        """Changes the tuning profile until the end of a with block
 
-        # If there have been any changes to the database
-        if self.__current_query_id > 1:
-            # Decrement it
-            self.__current_query_id -= 1
+        e.g.
+            with backend.use_profile("bulk-load"):
+                ...
 
-            # Roll back to the previous savepoint
-            self.__connection.execute(f"ROLLBACK TO s{self.__current_query_id}")
+        Arguments:
+            profile (str)
+                -- The name of the tuning profile
 
-    def gen_new_query(self, type_, limit):
+        Returns:
+            manager (ContextManager[backend.master.Backend])
+                -- Restores the previous profile on exit
+        """
+        previous = self.__profile
+        self.set_profile(profile)
+        try:
+            yield self
+        finally:
+            self.set_profile(previous)
+
+    def gen_new_query(self, type_, limit, title=None):
         """Generates a new query of type `type_`
 
         Arguments:
@@ -158,6 +1195,10 @@ class Backend:
             limit (int)
                 -- The limit of the query
 
+        Keyword Arguments:
+            title (str) default None
+                -- The title of the template the query is made from
+
         Returns:
             query (backend.query.Query)
                 -- The new query
@@ -181,6 +1222,6 @@ class Backend:
             query = backend.query.NullQuery
 
         if limit is None:
-            return query()
+            return query(title=title)
         else:
-            return query(limit=limit)
+            return query(limit=limit, title=title)
@@ -0,0 +1,207 @@
+"""The file which contains the migrations of the database schema
+
+backend/one_time_run/SQLstatements.sql creates version 0 of the schema. Each
+migration moves the schema on by one version, which is stored in
+PRAGMA user_version, so existing databases are changed in place without
+losing any data.
+
+To change the schema, add a Migration to the end of MIGRATIONS. Never change
+a migration which has already been released.
+"""
+
+import sqlite3
+import sys
+
+
+class Migration:
+    """A step from one version of the schema to the next
+
+    The indexes are built before the statements, each in its own short
+    transaction, so other connections only wait for one index at a time and
+    a build which is interrupted carries on where it stopped. The statements
+    and the new version are committed together, so a migration is either
+    fully applied or not applied at all.
+
+    Attributes:
+        Public:
+            version (int)
+                -- The version of the schema after the migration
+            description (str)
+                -- What the migration does
+        Private:
+            __statements (list[str])
+                -- The statements to execute
+            __indexes (list[(str, list[str])])
+                -- The table and columns of each index to build
+
+    Methods:
+        Magic:
+            __init__(version: int,
+                     description: str,
+                     statements: list[str]=(),
+                     indexes: list[(str, list[str])]=()) -> None
+        Public:
+            apply(conn: sqlite3.Connection) -> None
+                -- Applies the migration
+            has_indexes() -> bool
+                -- Whether the migration builds any indexes
+    """
+
+    def __init__(self, version, description, statements=(), indexes=()):
+        """The constructor for Migration
+
+        Arguments:
+            version (int)
+                -- The version of the schema after the migration
+            description (str)
+                -- What the migration does
+
+        Keyword Arguments:
+            statements (list[str]) default ()
+                -- The statements to execute
+            indexes (list[(str, list[str])]) default ()
+                -- The table and columns of each index to build
+
+        Returns:
+            None
+        """
+        self.version = version
+        self.description = description
+        self.__statements = list(statements)
+        self.__indexes = list(indexes)
+
+    def has_indexes(self):
+        """Whether the migration builds any indexes"""
+        return bool(self.__indexes)
+
+    def apply(self, conn):
+        """Applies the migration
+
+        Arguments:
+            conn (sqlite3.Connection)
+                -- The connection to the database
+
+        Returns:
+            None
+        """
+        # Imported here as the index advisor is also run on its own
+        from backend.index_advisor import gen_index_sql
+
+        # Build each index in its own transaction
+        for table, key in self.__indexes:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.execute(gen_index_sql(table, key))
+            except sqlite3.Error:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+
+        # Execute the statements and set the version in one transaction
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for statement in self.__statements:
+                conn.execute(statement)
+            conn.execute(f"PRAGMA user_version = {int(self.version)}")
+        except sqlite3.Error:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+
+MIGRATIONS = [
+    Migration(
+        1,
+        "Remove the foreign key from ChildSessions(Date) to Sessions(Date). "
+        "Sessions is keyed on (Date, SessionType), so the key could never "
+        "be enforced.",
+        statements=[
+            """CREATE TABLE ChildSessionsNew
+            (
+                MorningSession BOOLEAN DEFAULT FALSE,
+                AfternoonSession BOOLEAN DEFAULT FALSE,
+                MorningBooked BOOLEAN DEFAULT FALSE,
+                AfternoonBooked BOOLEAN DEFAULT FALSE,
+
+                ChildID INTEGER NOT NULL,
+                 --yyyy-mm-dd
+                Date CHAR(10) NOT NULL,
+
+                FOREIGN KEY (ChildID) REFERENCES Children(ChildID) ON DELETE CASCADE,
+                PRIMARY KEY (Date, ChildID)
+            )""",
+            """INSERT INTO ChildSessionsNew(
+                rowid,
+                MorningSession,
+                AfternoonSession,
+                MorningBooked,
+                AfternoonBooked,
+                ChildID,
+                Date
+            )
+            SELECT
+                rowid,
+                MorningSession,
+                AfternoonSession,
+                MorningBooked,
+                AfternoonBooked,
+                ChildID,
+                Date
+            FROM ChildSessions""",
+            "DROP TABLE ChildSessions",
+            "ALTER TABLE ChildSessionsNew RENAME TO ChildSessions",
+        ],
+    ),
+    Migration(
+        2,
+        "Add the indexes proposed by backend/index_advisor.py",
+        statements=["ANALYZE"],
+        indexes=[
+            ("Caregivers", ["ContactNumber", "Name"]),
+            ("Caregivers", ["EmailAddress", "Name"]),
+            ("Caregivers", ["Name"]),
+            ("Caregivers", ["PhysicalAddress", "Name"]),
+            ("ChildSessions", ["ChildID", "Date"]),
+            ("Children", ["CaregiverID", "ChildName"]),
+            ("Children", ["ChildName"]),
+        ],
+    ),
+]
+
+
+def get_version(conn):
+    """Gets the version of the schema of a database
+
+    Arguments:
+        conn (sqlite3.Connection)
+            -- The connection to the database
+
+    Returns:
+        version (int)
+            -- The version of the schema
+    """
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate(conn):
+    """Applies every migration the database has not had yet in order
+
+    Arguments:
+        conn (sqlite3.Connection)
+            -- The connection to the database
+
+    Returns:
+        None
+    """
+    # Finish any transaction so each migration can start its own
+    if conn.in_transaction:
+        conn.commit()
+
+    version = get_version(conn)
+    for migration in MIGRATIONS:
+        if migration.version > version:
+            print(
+                f"Migrating database to version {migration.version}",
+                file=sys.stderr,
+            )
+            migration.apply(conn)
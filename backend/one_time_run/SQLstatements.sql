@@ -1,3 +1,5 @@
+-- Version 0 of the schema. Later changes are made by backend/migrations.py
+
 DROP TABLE IF EXISTS Caregivers;
 DROP TABLE IF EXISTS Children;
 DROP TABLE IF EXISTS Sessions;
@@ -0,0 +1,421 @@
+"""Generates a database of any size for benchmarking
+
+Unlike populate_table.py, which loads one year of the mock data, this builds
+any number of caregivers, children and years of sessions from a seed, so the
+same arguments always give the same database.
+
+Each child attends on a weekly pattern (such as Monday and Thursday
+mornings), as children at a nursery do, so the attendance of a child is
+realistic across the years. Every row is inserted with executemany in one
+transaction under the bulk-load profile, and the indexes are built once the
+rows are in.
+
+For example, 2000 children over 3 years gives about 1.2 million
+ChildSessions rows:
+    python3 -m backend.one_time_run.generate_data big.db --caregivers 1200 \\
+        --children 2000 --years 3
+
+Usage:
+    python3 -m backend.one_time_run.generate_data DATABASE [--caregivers N]
+        [--children N] [--years N] [--start-year YEAR] [--attendance R]
+        [--booked R] [--seed N] [--force]
+"""
+
+import argparse
+import csv
+import datetime
+import os
+import random
+import sqlite3
+import sys
+import time
+
+import backend.migrations
+import backend.profiles
+
+DIR = os.path.split(os.path.realpath(__file__))[0]
+
+SQL_STATEMENTS = os.path.join(DIR, "SQLstatements.sql")
+CAREGIVER_CSV = os.path.join(DIR, "mock_data", "caregivers.csv")
+CHILDNAMES_CSV = os.path.join(DIR, "mock_data", "childnames.csv")
+
+CAREGIVER_INSERT_SQL = """
+INSERT INTO Caregivers(
+    CaregiverID,
+    PhysicalAddress,
+    ContactNumber,
+    EmailAddress,
+    Name
+)
+VALUES (?,?,?,?,?)
+"""
+
+CHILD_INSERT_SQL = """
+INSERT INTO Children(
+    ChildID,
+    ChildName,
+    CaregiverID
+)
+VALUES (?,?,?)
+"""
+
+SESSION_INSERT_SQL = """
+INSERT INTO Sessions(
+    SessionType,
+    Date
+)
+VALUES (?,?)
+"""
+
+CHILD_SESSION_INSERT_SQL = """
+INSERT INTO ChildSessions(
+    ChildID,
+    Date,
+    MorningSession,
+    AfternoonSession,
+    MorningBooked,
+    AfternoonBooked
+)
+VALUES (?,?,?,?,?,?)
+"""
+
+# The days the nursery is closed each year as (month, day)
+CLOSED_DAYS = [(1, 1), (12, 25), (12, 26), (12, 31)]
+
+
+def read_names():
+    """Reads the names and streets used to make up caregivers and children
+
+    Arguments:
+        None
+
+    Returns:
+        first_names (list[str])
+            -- The first names of the mock caregivers and children
+        last_names (list[str])
+            -- The last names of the mock caregivers and children
+        streets (list[str])
+            -- The streets of the mock caregivers
+    """
+    first_names, last_names, streets = set(), set(), set()
+
+    with open(CAREGIVER_CSV, "rt", newline="") as csvfile:
+        for _, address, _, _, name in csv.reader(csvfile):
+            first, _, last = name.partition(" ")
+            first_names.add(first)
+            last_names.add(last)
+            streets.add(address.partition(" ")[2])
+
+    with open(CHILDNAMES_CSV, "rt", newline="") as csvfile:
+        for _, name, _ in csv.reader(csvfile):
+            first, _, last = name.partition(" ")
+            first_names.add(first)
+            last_names.add(last)
+
+    # Sort them so the seed gives the same choices every time
+    return sorted(first_names), sorted(last_names), sorted(streets)
+
+
+def open_days(start_year, years):
+    """Generates the days the nursery is open
+
+    Arguments:
+        start_year (int)
+            -- The first year
+        years (int)
+            -- How many years
+
+    Returns:
+        days (Iterator[datetime.date])
+            -- Every weekday which is not a closed day
+    """
+    day = datetime.date(start_year, 1, 1)
+    end = datetime.date(start_year + years, 1, 1)
+    while day < end:
+        if day.weekday() < 5 and (day.month, day.day) not in CLOSED_DAYS:
+            yield day
+        day += datetime.timedelta(days=1)
+
+
+def gen_caregivers(rand, count, first_names, last_names, streets):
+    """Generates the rows of Caregivers
+
+    Arguments:
+        rand (random.Random)
+            -- The random choices
+        count (int)
+            -- How many caregivers
+        first_names (list[str])
+            -- The first names to choose from
+        last_names (list[str])
+            -- The last names to choose from
+        streets (list[str])
+            -- The streets to choose from
+
+    Returns:
+        rows (list[tuple])
+            -- The rows, in order of CaregiverID
+    """
+    rows = []
+    for caregiver in range(1, count + 1):
+        first = rand.choice(first_names)
+        last = rand.choice(last_names)
+        rows.append(
+            (
+                caregiver,
+                f"{rand.randint(1, 9999)} {rand.choice(streets)}",
+                f"+{rand.randint(1, 999)}-{rand.randint(100, 999)}"
+                f"-{rand.randint(100, 999)}-{rand.randint(1000, 9999)}",
+                f"{first[0].lower()}{last.lower()}{caregiver}@example.com",
+                f"{first} {last}",
+            )
+        )
+    return rows
+
+
+def gen_children(rand, count, first_names, surnames):
+    """Generates the rows of Children
+
+    Arguments:
+        rand (random.Random)
+            -- The random choices
+        count (int)
+            -- How many children
+        first_names (list[str])
+            -- The first names to choose from
+        surnames (list[str])
+            -- The last name of each caregiver
+
+    Returns:
+        rows (Iterator[tuple])
+            -- The rows, in order of ChildID
+    """
+    for child in range(1, count + 1):
+        caregiver = rand.randint(1, len(surnames))
+        yield (
+            child,
+            f"{rand.choice(first_names)} {surnames[caregiver - 1]}",
+            caregiver,
+        )
+
+
+def gen_patterns(rand, children, attendance):
+    """Chooses which sessions of the week each child attends
+
+    Arguments:
+        rand (random.Random)
+            -- The random choices
+        children (int)
+            -- How many children
+        attendance (float)
+            -- The chance of a child attending each session of the week
+
+    Returns:
+        patterns (list[list[(int, bool, bool)]])
+            -- For each weekday, the (ChildID, morning, afternoon) of each
+               child who attends, in order of ChildID
+    """
+    patterns = [[] for _ in range(5)]
+    for child in range(1, children + 1):
+        for weekday in range(5):
+            morning = rand.random() < attendance
+            afternoon = rand.random() < attendance
+            if morning or afternoon:
+                patterns[weekday].append((child, morning, afternoon))
+    return patterns
+
+
+def gen_child_sessions(rand, days, patterns, booked):
+    """Generates the rows of ChildSessions
+
+    The rows are in order of the primary key (Date, ChildID), so the index
+    of the key is filled in order.
+
+    Arguments:
+        rand (random.Random)
+            -- The random choices
+        days (list[datetime.date])
+            -- The days the nursery is open
+        patterns (list[list[(int, bool, bool)]])
+            -- The sessions each child attends on each weekday
+        booked (float)
+            -- The chance of a session being booked
+
+    Returns:
+        rows (Iterator[tuple])
+            -- The rows
+    """
+    for day in days:
+        date = day.isoformat()
+        for child, morning, afternoon in patterns[day.weekday()]:
+            yield (
+                child,
+                date,
+                morning,
+                afternoon,
+                morning and rand.random() < booked,
+                afternoon and rand.random() < booked,
+            )
+
+
+def generate(
+    database,
+    caregivers=150,
+    children=250,
+    years=1,
+    start_year=2023,
+    attendance=0.5,
+    booked=0.5,
+    seed=0,
+):
+    """Generates a database
+
+    Arguments:
+        database (str)
+            -- The database file to create, which must not exist
+
+    Keyword Arguments:
+        caregivers (int) default 150
+            -- How many caregivers
+        children (int) default 250
+            -- How many children
+        years (int) default 1
+            -- How many years of sessions
+        start_year (int) default 2023
+            -- The first year of sessions
+        attendance (float) default 0.5
+            -- The chance of a child attending each session of the week
+        booked (float) default 0.5
+            -- The chance of an attended session being booked
+        seed (int) default 0
+            -- The seed of the random choices
+
+    Returns:
+        counts (dict[str:int|float])
+            -- How many rows were put in each table, and how long loading
+               and indexing took (s)
+    """
+    started = time.perf_counter()
+    rand = random.Random(seed)
+    connection = sqlite3.connect(database, isolation_level=None)
+
+    # Load quickly. Nothing is lost if it crashes, as it can be generated
+    # again
+    backend.profiles.apply_profile(connection, "bulk-load")
+
+    # Create the tables and apply the migrations up to the first which
+    # builds indexes, as an index is faster to build once than to keep up to
+    # date while loading
+    with open(SQL_STATEMENTS, "rt") as f:
+        connection.executescript(f.read())
+    for migration in backend.migrations.MIGRATIONS:
+        if migration.has_indexes():
+            break
+        migration.apply(connection)
+
+    first_names, last_names, streets = read_names()
+    days = list(open_days(start_year, years))
+
+    connection.execute("BEGIN")
+
+    caregiver_rows = gen_caregivers(
+        rand, caregivers, first_names, last_names, streets
+    )
+    connection.executemany(CAREGIVER_INSERT_SQL, caregiver_rows)
+
+    # Children share the last name of their caregiver
+    surnames = [row[4].partition(" ")[2] for row in caregiver_rows]
+    connection.executemany(
+        CHILD_INSERT_SQL, gen_children(rand, children, first_names, surnames)
+    )
+    connection.executemany(
+        SESSION_INSERT_SQL,
+        ((type_, day.isoformat()) for day in days for type_ in ("M", "A")),
+    )
+
+    patterns = gen_patterns(rand, children, attendance)
+    cursor = connection.executemany(
+        CHILD_SESSION_INSERT_SQL,
+        gen_child_sessions(rand, days, patterns, booked),
+    )
+    child_sessions = cursor.rowcount
+
+    connection.execute("COMMIT")
+    loaded = time.perf_counter()
+
+    # Build the indexes and bring the schema up to date
+    backend.migrations.migrate(connection)
+    connection.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    connection.close()
+
+    return {
+        "caregivers": caregivers,
+        "children": children,
+        "sessions": len(days) * 2,
+        "child_sessions": child_sessions,
+        "load_time": loaded - started,
+        "index_time": time.perf_counter() - loaded,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Generate a seeded database of any size for benchmarking"
+    )
+    parser.add_argument("database", help="the database file to create")
+    parser.add_argument("--caregivers", type=int, default=150)
+    parser.add_argument("--children", type=int, default=250)
+    parser.add_argument("--years", type=int, default=1)
+    parser.add_argument("--start-year", type=int, default=2023)
+    parser.add_argument(
+        "--attendance",
+        type=float,
+        default=0.5,
+        help="the chance of a child attending each session of the week",
+    )
+    parser.add_argument(
+        "--booked",
+        type=float,
+        default=0.5,
+        help="the chance of an attended session being booked",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--force", action="store_true", help="replace the database if it exists"
+    )
+    args = parser.parse_args()
+
+    if os.path.exists(args.database):
+        if not args.force:
+            parser.error(f"{args.database} exists (use --force to replace it)")
+        os.remove(args.database)
+
+    # A WAL left next to the new database would be applied to it, so remove
+    # it and its index with the database
+    if args.force:
+        for path in (args.database + "-wal", args.database + "-shm"):
+            if os.path.exists(path):
+                os.remove(path)
+
+    counts = generate(
+        args.database,
+        caregivers=args.caregivers,
+        children=args.children,
+        years=args.years,
+        start_year=args.start_year,
+        attendance=args.attendance,
+        booked=args.booked,
+        seed=args.seed,
+    )
+
+    print(
+        f"{counts['caregivers']} caregivers, {counts['children']} children,"
+        f" {counts['sessions']} sessions and {counts['child_sessions']} child"
+        f" sessions loaded in {counts['load_time']:.1f}s, indexed in"
+        f" {counts['index_time']:.1f}s",
+        file=sys.stderr,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,338 @@
+"""Checks that the templates still use the indexes
+
+Every template is compiled into its SQL, once for each way it can be filled
+in, and EXPLAIN QUERY PLAN is run against the current schema. If a template
+filters by a key column (see KEY_FIELDS), its plan must not read a whole
+table or sort with a temporary B-tree (see backend.plans). This catches a
+change to the schema or to a template which silently stops a lookup using
+its index.
+
+The required inputs of a template are always filled in together. Each
+optional input is filled in on its own, as it may be the only one given.
+Templates which only add rows look none up, so they are not checked.
+
+By default the plans are checked against an empty database built from
+backend/one_time_run/SQLstatements.sql and the migrations, so the result
+does not depend on the data. The plans SQLite chooses for a real database,
+which may have statistics, can be checked with --database.
+
+Each problem has a kind:
+    SCAN Table
+        -- The plan reads every row of the table
+    TEMP B-TREE
+        -- The plan sorts or groups with a temporary B-tree
+    ERROR
+        -- The template could not be compiled or explained
+
+Some templates can not be compiled. The kinds of problem expected of each
+are listed in ALLOWED, and more can be allowed with --allow "TITLE=KIND"
+(all of a template) or --allow "TITLE: LABEL=KIND" (one way of filling it
+in). A problem which is allowed is reported without failing, but any other
+problem found in the same plan still fails.
+
+The check is run by .github/workflows/plan-check.yml on every push and pull
+request.
+
+The exit code is 1 if any plan fails and 0 otherwise.
+
+Usage:
+    python3 -m backend.plan_check [--database DB]
+                                  [--allow TITLE[: LABEL]=KIND ...]
+                                  [--verbose]
+"""
+
+import argparse
+import os
+import sqlite3
+import sys
+import tempfile
+
+import backend.master
+import backend.plans
+import backend.templates
+from backend.one_time_run import generate_data
+
+# The columns lookups by which must use an index
+KEY_FIELDS = ("ChildID", "CaregiverID", "Date", "Name", "ChildName")
+
+# The value given to each type of input so the template compiles. The plan
+# does not depend on the value
+VALUES = {
+    "entry": "x",
+    "phone": "0123 456789",
+    "email": "someone@example.com",
+    "number": "1",
+    "date": "2023-01-02",
+    "checkbox": "1",
+}
+
+# The kind of problem found when a template can not be compiled or explained
+ERROR = "ERROR"
+
+# The kinds of problem known of the templates, keyed by the title or by
+# "TITLE: LABEL" of one way of filling one in. Each should be narrow and
+# give its reason
+ALLOWED = {
+    # These templates name columns which do not exist, so they can not be
+    # compiled
+    "Add Child to Session Where It Already Attends a Day: Child Name": {ERROR},
+    "Remove Caregiver": {ERROR},
+    "Remove Child": {ERROR},
+}
+
+
+def get_value(item):
+    """Gets a value for an input
+
+    Arguments:
+        item (xml.etree.ElementTree.Element)
+            -- The input
+
+    Returns:
+        value (str)
+            -- A valid value for the input
+    """
+    # A radio button takes the value of its first choice
+    if item.tag == "radio":
+        return item[0].attrib["value"]
+    return VALUES[item.tag]
+
+
+def gen_variants(template):
+    """Generates each way a template can be filled in
+
+    Arguments:
+        template (xml.etree.ElementTree.ElementTree)
+            -- The template
+
+    Returns:
+        variants (Iterator[(str, dict[str:str], list[(str, str)])])
+            -- The label of the variant, the values of its inputs and the
+               (table, field) of each input it filters by
+    """
+    values = {}
+    required = []
+    optional = []
+
+    for item, section in backend.templates.get_inputs(template):
+        key = f"{section}:{item.attrib['table']}.{item.attrib['field']}"
+        column = (item.attrib["table"], item.attrib["field"])
+
+        # Checkboxes are never empty, so always filter
+        if section == "optional" and item.tag != "checkbox":
+            optional.append((item.attrib["label"], key, get_value(item), column))
+            continue
+
+        values[key] = get_value(item)
+        if section in ("search-data", "optional"):
+            required.append(column)
+
+    if not optional:
+        yield "required", values, required
+
+    for label, key, value, column in optional:
+        yield label, {**values, key: value}, required + [column]
+
+
+def check_template(master, template):
+    """Checks the plan of each way a template can be filled in
+
+    Arguments:
+        master (backend.master.Backend)
+            -- The backend
+        template (xml.etree.ElementTree.ElementTree)
+            -- The template
+
+    Returns:
+        results (list[(str, list[str], list[str], str|None)])
+            -- The label, plan and problems of each variant which filters by
+               a key column, and the error if it could not be explained
+    """
+    results = []
+
+    for label, values, filters in gen_variants(template):
+        if not any(field in KEY_FIELDS for _, field in filters):
+            continue
+
+        try:
+            query = backend.templates.compile_template(master, template, values)
+            plan = master.explain_query(query)
+        except (ValueError, sqlite3.Error) as err:
+            results.append((label, [], [], str(err)))
+            continue
+
+        problems = [f"SCAN {table}" for table in backend.plans.get_full_scans(plan)]
+        if backend.plans.has_temp_btree(plan):
+            problems.append("TEMP B-TREE")
+        results.append((label, plan, problems, None))
+
+    return results
+
+
+def build_schema(database):
+    """Builds an empty database with the current schema
+
+    Arguments:
+        database (str)
+            -- The database file to create
+
+    Returns:
+        None
+    """
+    generate_data.generate(database, caregivers=0, children=0, years=0)
+
+
+def get_allowed(allowed, title, name):
+    """Gets the kinds of problem allowed of one way of filling in a template
+
+    Arguments:
+        allowed (dict[str:set[str]])
+            -- The kinds of problem allowed, keyed by the title or by
+               "TITLE: LABEL"
+        title (str)
+            -- The title of the template
+        name (str)
+            -- The "TITLE: LABEL" of the way of filling it in
+
+    Returns:
+        kinds (set[str])
+            -- The kinds of problem allowed of it
+    """
+    return allowed.get(title, set()) | allowed.get(name, set())
+
+
+def parse_allow(text):
+    """Parses the value of an --allow option
+
+    Arguments:
+        text (str)
+            -- "TITLE=KIND" or "TITLE: LABEL=KIND"
+
+    Returns:
+        name (str)
+            -- The title or "TITLE: LABEL" the problem is allowed of
+        kind (str)
+            -- The kind of problem allowed
+
+    Raises:
+        ValueError
+            -- If there is no title or kind
+    """
+    name, _, kind = text.rpartition("=")
+    name = name.strip()
+    kind = kind.strip()
+    if not name or not kind:
+        raise ValueError(f"--allow should be TITLE[: LABEL]=KIND, not {text!r}")
+    return name, kind
+
+
+def run(master, templates, allowed, verbose=False):
+    """Checks every template and reports the problems
+
+    Arguments:
+        master (backend.master.Backend)
+            -- The backend
+        templates (dict[str:xml.etree.ElementTree.ElementTree])
+            -- The templates keyed by their title
+        allowed (dict[str:set[str]])
+            -- The kinds of problem allowed, keyed by the title or by
+               "TITLE: LABEL" of one way of filling a template in
+
+    Keyword Arguments:
+        verbose (bool) default False
+            -- Whether to print the plan of every variant
+
+    Returns:
+        failures (int)
+            -- How many variants failed
+    """
+    failures = 0
+
+    for title in sorted(templates):
+        template = templates[title]
+        if template.getroot().attrib["type"] == "add":
+            continue
+
+        for label, plan, problems, error in check_template(master, template):
+            name = f"{title}: {label}"
+            kinds = get_allowed(allowed, title, name)
+
+            if error is not None:
+                status = "ALLOWED" if ERROR in kinds else "ERROR"
+                detail = error
+            elif problems:
+                # Each problem must be allowed on its own, so an unexpected
+                # scan still fails a plan which is allowed to sort
+                denied = [problem for problem in problems if problem not in kinds]
+                status = "FAIL" if denied else "ALLOWED"
+                detail = ", ".join(
+                    problem if problem in denied else f"{problem} allowed"
+                    for problem in problems
+                )
+            else:
+                status = "ok"
+                detail = ""
+
+            if status in ("ERROR", "FAIL"):
+                failures += 1
+            if status != "ok" or verbose:
+                print(f"{status:7} {name}" + (f" ({detail})" if detail else ""))
+            if verbose or status == "FAIL":
+                for step in plan:
+                    print(f"            {step}")
+
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Check the templates still use the indexes"
+    )
+    parser.add_argument(
+        "--database",
+        help="check the plans of this database rather than an empty one",
+    )
+    parser.add_argument(
+        "--allow",
+        action="append",
+        default=[],
+        metavar="TITLE[: LABEL]=KIND",
+        help="allow a kind of problem (SCAN Table, TEMP B-TREE or ERROR) of a "
+        "template or one way of filling it in",
+    )
+    parser.add_argument(
+        "--verbose", action="store_true", help="print the plan of every check"
+    )
+    args = parser.parse_args()
+
+    # Add the problems allowed on the command line to those known
+    allowed = {name: set(kinds) for name, kinds in ALLOWED.items()}
+    for text in args.allow:
+        try:
+            name, kind = parse_allow(text)
+        except ValueError as err:
+            parser.error(str(err))
+        allowed.setdefault(name, set()).add(kind)
+
+    templates = backend.templates.load_templates()
+
+    with tempfile.TemporaryDirectory() as directory:
+        database = args.database
+        if database is None:
+            database = os.path.join(directory, "schema.db")
+            build_schema(database)
+
+        master = backend.master.Backend(database)
+        try:
+            failures = run(master, templates, allowed, args.verbose)
+        finally:
+            master.close()
+
+    if failures:
+        print(f"{failures} plans failed", file=sys.stderr)
+        sys.exit(1)
+    print("Every plan uses the indexes", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""The file which reads the plans SQLite chooses for the queries
+
+A plan is the list of steps given by EXPLAIN QUERY PLAN (see
+Backend.explain_query). The steps which are slow on a large database are:
+    SCAN Table [USING [COVERING] INDEX Index]
+        -- Every row of the table is read, in the order of the index if
+           there is one
+    USE TEMP B-TREE FOR ...
+        -- The rows are sorted or grouped after they are read, rather than
+           read in order from an index
+"""
+
+import re
+
+# The tables which grow with every session, so reading all of them is slow
+HOT_TABLES = ("ChildSessions", "Children", "Caregivers")
+
+# A step which reads every row of a table, rather than searching an index
+# or scanning a virtual table
+FULL_SCAN_RE = re.compile(r"^SCAN (\w+)(?: USING (?:COVERING )?INDEX \w+)?$")
+
+
+def get_full_scans(plan):
+    """Gets the tables a plan reads every row of
+
+    Arguments:
+        plan (list[str])
+            -- The steps of the plan
+
+    Returns:
+        tables (list[str])
+            -- The tables, in the order they are scanned
+    """
+    tables = []
+    for step in plan:
+        match = FULL_SCAN_RE.match(step.strip())
+        if match is not None:
+            tables.append(match.group(1))
+    return tables
+
+
+def get_hot_scans(plan):
+    """Gets the hot tables a plan reads every row of
+
+    Arguments:
+        plan (list[str])
+            -- The steps of the plan
+
+    Returns:
+        tables (list[str])
+            -- The tables of HOT_TABLES which are scanned
+    """
+    return [table for table in get_full_scans(plan) if table in HOT_TABLES]
+
+
+def has_temp_btree(plan):
+    """Whether a plan sorts or groups with a temporary B-tree
+
+    Arguments:
+        plan (list[str])
+            -- The steps of the plan
+
+    Returns:
+        has_temp_btree (bool)
+            -- Whether a temporary B-tree is used
+    """
+    return any("TEMP B-TREE" in step for step in plan)
@@ -0,0 +1,99 @@
+"""The file which contains the tuning profiles of the database connection
+
+A profile sets the PRAGMAs which trade durability and memory for speed:
+    interactive
+        -- The default for the GUI. Writes are safe once committed and reads
+           are served from a modest cache.
+    bulk-load
+        -- For importing data. Nothing is synced to disk until the end, so a
+           crash part of the way through may lose the import.
+    reporting
+        -- For large reads. The database is memory mapped and sorts are kept
+           in memory.
+
+Every profile uses write-ahead logging so readers are not blocked by the
+writer and switching profile never has to change the journal mode.
+"""
+
+import os
+
+# The environment variable used to choose the profile
+PROFILE_ENV = "SUNNYTOTS_PROFILE"
+
+# The profile used if none is chosen
+DEFAULT_PROFILE = "interactive"
+
+# The PRAGMAs each profile sets. A negative cache_size is in KiB and
+# mmap_size is in bytes.
+PROFILES = {
+    "interactive": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "cache_size": -8192,
+        "mmap_size": 0,
+        "temp_store": "MEMORY",
+    },
+    "bulk-load": {
+        "journal_mode": "WAL",
+        "synchronous": "OFF",
+        "cache_size": -65536,
+        "mmap_size": 0,
+        "temp_store": "MEMORY",
+    },
+    "reporting": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "cache_size": -32768,
+        "mmap_size": 268435456,
+        "temp_store": "MEMORY",
+    },
+}
+
+
+def get_profile_name(name=None):
+    """Gets the name of the profile to use
+
+    Arguments:
+        None
+
+    Keyword Arguments:
+        name (str) default None
+            -- The name of the profile or None to read it from the
+               environment
+
+    Returns:
+        name (str)
+            -- The name of the profile
+
+    Raises:
+        ValueError
+            -- If there is no profile with that name
+    """
+    if name is None:
+        name = os.environ.get(PROFILE_ENV, DEFAULT_PROFILE)
+
+    if name not in PROFILES:
+        raise ValueError(
+            f"Unknown profile {name}, expected one of {', '.join(PROFILES)}"
+        )
+
+    return name
+
+
+def apply_profile(conn, name):
+    """Sets the PRAGMAs of a profile on a connection
+
+    The journal mode and the safety level can not be changed inside a
+    transaction, so the connection must not be in one.
+
+    Arguments:
+        conn (sqlite3.Connection)
+            -- The connection to the database
+        name (str)
+            -- The name of the profile
+
+    Returns:
+        None
+    """
+    for pragma, value in PROFILES[get_profile_name(name)].items():
+        conn.execute(f"PRAGMA {pragma} = {value}")
@@ -5,13 +5,19 @@ import copy
 from backend.sqlescape import escape
 
 
+class JoinError(ValueError):
+    """Raised when the tables of a query are not all linked together"""
+
+    pass
+
+
 class Query:
     """The base query object
 
     Attributes:
         Protected:
-            _tables (set[str])
-                -- The tables in use
+            _tables (list[str])
+                -- The tables in use in the order they were first used
             _fields (dict[str:list[str]])
                 -- The fields of those tables
             _data (dict[str:Any])
@@ -24,18 +30,21 @@ class Query:
                 -- Any custom between SELECT and FROM
             _custom_tail (list[str])
                 -- Any custom after the WHERE
-            _links (dict[str:str])
-                -- Links between tables
-            _order_by (str)
-                -- What to order by
-            _order_asc (bool)
-                -- Whether to order ascending
+            _links (list[(str, str, str, str)])
+                -- The (table1, field1, table2, field2) links between tables
+            _order_by (list[(str, str, bool)])
+                -- The (table, field, ascending) keys to order by
             _limit (int)
                 -- What the limit to ordering is
+            _title (str)
+                -- The title of the template the query was made from
 
     Methods:
         Magic:
-            __init__(order_by:str=None, order_asc:bool=True, limit:int=1)
+            __init__(order_by:str=None,
+                     order_asc:bool=True,
+                     limit:int=1,
+                     title:str=None)
         Public:
             update_constraint(field: str, table: str, value: any) -> None
                 -- Updates a constraint
@@ -51,24 +60,58 @@ class Query:
                 -- Updates the data
             generate_query() -> (str, list[Any])
                 -- Generates the query
+            generate_text() -> str
+                -- Generates the text of the query
+            generate_params() -> list[Any]
+                -- Generates the parameters of the query
+            get_shape() -> tuple
+                -- Gets the shape of the query used to cache its text
+            get_title() -> str|None
+                -- Accessor method for _title
+            add_order(field: str, table: str, asc:bool=True) -> None
+                -- Adds a key to order by
+            get_order() -> list[(str, str, bool)]
+                -- Accessor method for _order_by
+            check_order(schema: backend.schema.Schema) -> None
+                -- Checks the keys to order by against the schema
             get_fields() -> dict[str:list[str]]
                 -- Gets the fields used
             execute(conn: sqlite3.Connection) -> sqlite3.Cursor
                 -- Executes the query
+            get_columns(cursor: sqlite3.Cursor) -> list[str]
+                -- Gets the names of the columns of the result
+            stream_rows(cursor: sqlite3.Cursor,
+                        batch_size: int) -> Iterator[list[tuple]]
+                -- Reads the result of the query in batches
             changed_db() -> bool
                 -- Whether the query has changed the database
+            get_target() -> str|None
+                -- Gets the table the query writes to
+            generate_image_query() -> (str, list[Any])|None
+                -- Generates the query reading the rows the query changes
+            get_page_state() -> Any
+                -- Gets the state of the query after reading a result
+            set_page_state(state: Any) -> None
+                -- Restores the state of the query after reading a result
         Protected:
+            _add_table(table: str) -> None
+                -- Adds a table to the tables in use
+            _plan_joins() -> (list[(str, list[str])], list[str])
+                -- Plans the order the tables are joined in
             _gen_data_query() -> str
                 -- Generates the data part of the query
             _gen_constraint_query() -> str
                 -- Generates the constraint part of the query
             _gen_table_query() -> str
                 -- Generates the table part of the query
+            _gen_target_query(target: str) -> str
+                -- Generates the part of the query choosing which rows of
+                   the target table are changed
             _gen_tail() -> str
                 -- Generates the tail of the query
     """
 
-    def __init__(self, order_by=None, order_asc=True, limit=1):
+    def __init__(self, order_by=None, order_asc=True, limit=1, title=None):
         """The constructor for Query
 
         Arguments:
@@ -76,17 +119,19 @@ class Query:
 
         Keyword Arguments:
             order_by (str) default None
-                -- What to order by
+                -- What to order by as "Table.Field"
             order_asc (bool) default True
                 -- Whether to order ascending
             limit (int) default 1
                 -- What the limit should be
+            title (str) default None
+                -- The title of the template the query is made from
 
         Returns None
         """
 
         # Initilise the various attributes
-        self._tables = set()
+        self._tables = []
         self._fields = {}
         self._data = {}
         self._constraints = {}
@@ -95,12 +140,17 @@ class Query:
         self._custom_select = []
         self._custom_tail = []
 
-        self._links = {}
+        self._links = []
+
+        self._order_by = []
+        if order_by is not None:
+            table, field = order_by.split(".", 1)
+            self.add_order(field, table, order_asc)
 
-        self._order_by = order_by
-        self._order_asc = order_asc
         self._limit = limit
 
+        self._title = title
+
     def update_constraint(self, field, table, value):
         """Updates a constraint for a table, field pair
 
@@ -116,7 +166,7 @@ class Query:
             None
         """
         self._constraints[f"{escape(table)}.{escape(field)}"] = value
-        self._tables.add(table)
+        self._add_table(table)
 
     def add_link(self, field1, field2, table1, table2):
         """Adds a link between two tables
@@ -134,12 +184,22 @@ class Query:
         Returns:
             None
         """
-        # Make sure to escape!
-        self._links[
-            f"{escape(table1)}.{escape(field1)}"
-        ] = f"{escape(table2)}.{escape(field2)}"
-        self._tables.add(table1)
-        self._tables.add(table2)
+        self._links.append((table1, field1, table2, field2))
+        self._add_table(table1)
+        self._add_table(table2)
+
+    def _add_table(self, table):
+        """Adds a table to the tables in use if it is not already in use
+
+        Arguments:
+            table (str)
+                -- The table
+
+        Returns:
+            None
+        """
+        if table not in self._tables:
+            self._tables.append(table)
 
     def add_custom_constraint(self, constraint):
         """Adds a custom constraint
@@ -205,7 +265,7 @@ class Query:
 
         # Otherwise add it to _data
         self._data[f"{escape(table)}.{escape(field)}"] = value
-        self._tables.add(table)
+        self._add_table(table)
 
     def _gen_data_query(self):
         """Generates the data part of the query
@@ -235,9 +295,9 @@ class Query:
         for field in self._constraints:
             out.append(f"{field}=?")
 
-        # Add WHERE {link1} = {link2} for each link
-        for field in self._links:
-            out.append(f"{field}={self._links[field]}")
+        # Add WHERE {link1} = {link2} for each link not used to join tables
+        _, unused_links = self._plan_joins()
+        out.extend(unused_links)
 
         # Add the custom constraints
         for constraint in self._custom_constraints:
@@ -249,6 +309,69 @@ class Query:
             out = "WHERE " + out
         return out
 
+    def _plan_joins(self):
+        """Plans the order the tables are joined in
+
+        Starting from the first table used, each table is joined on as soon as
+        a link connects it to a table which has already been joined.
+
+        Arguments:
+            None
+
+        Returns:
+            joins (list[(str, list[str])])
+                -- Each table in order with the links it is joined on
+            unused_links (list[str])
+                -- The links between tables which were already joined
+
+        Raises:
+            JoinError
+                -- If a table is not linked to the others
+        """
+        if not self._tables:
+            return [], []
+
+        joins = [(self._tables[0], [])]
+        joined = {self._tables[0]}
+        links = list(self._links)
+
+        while len(joined) < len(self._tables):
+            # Find the first link from a joined table to a new table
+            new_table = None
+            for table1, _, table2, _ in links:
+                if table1 in joined and table2 not in joined:
+                    new_table = table2
+                    break
+                if table2 in joined and table1 not in joined:
+                    new_table = table1
+                    break
+
+            # Without a link the tables would be multiplied together
+            if new_table is None:
+                missing = [table for table in self._tables if table not in joined]
+                raise JoinError(
+                    f"{', '.join(missing)} not linked to {', '.join(sorted(joined))}"
+                )
+
+            # Join the new table on every link to the joined tables
+            joined.add(new_table)
+            conditions = []
+            for link in list(links):
+                table1, field1, table2, field2 = link
+                if new_table in (table1, table2) and {table1, table2} <= joined:
+                    conditions.append(
+                        f"{escape(table1)}.{escape(field1)}"
+                        f"={escape(table2)}.{escape(field2)}"
+                    )
+                    links.remove(link)
+            joins.append((new_table, conditions))
+
+        unused_links = [
+            f"{escape(table1)}.{escape(field1)}={escape(table2)}.{escape(field2)}"
+            for table1, field1, table2, field2 in links
+        ]
+        return joins, unused_links
+
     def _gen_table_query(self):
         """Generates the table part of the query
 
@@ -259,11 +382,40 @@ class Query:
             text (str)
                 -- The table part of the query
         """
+        joins, _ = self._plan_joins()
+
         out = []
-        # Add the escaped table for each of the tables
-        for table in self._tables:
-            out.append(escape(table))
-        return ",".join(out)
+        # Add the escaped table for each of the tables with how it is joined
+        for table, conditions in joins:
+            if conditions:
+                out.append(f"INNER JOIN {escape(table)} ON {' AND '.join(conditions)}")
+            else:
+                out.append(escape(table))
+        return " ".join(out)
+
+    def _gen_target_query(self, target):
+        """Generates the part of the query choosing which rows of the target
+        table are changed
+
+        SQLite can only DELETE from or UPDATE one table. If the constraints
+        use other tables, the rows are found by joining the tables in a
+        subquery and matched on their rowid.
+
+        Arguments:
+            target (str)
+                -- The table which is changed
+
+        Returns:
+            text (str)
+                -- The constraint and tail part of the query
+        """
+        if self._tables == [target]:
+            return f"{self._gen_constraint_query()} {self._gen_tail()}"
+
+        return f"""WHERE rowid IN (
+                SELECT {escape(target)}.rowid
+                FROM {self._gen_table_query()}
+                {self._gen_constraint_query()} {self._gen_tail()})"""
 
     def generate_query(self):
         """Generates the query
@@ -277,7 +429,104 @@ class Query:
             params (list[Any])
                 -- The parameters of the query
         """
-        return "", []
+        return self.generate_text(), self.generate_params()
+
+    def generate_text(self):
+        """Generates the text of the query
+
+        Arguments:
+            None
+
+        Returns:
+            qtext (str)
+                -- The query text
+        """
+        return ""
+
+    def generate_params(self):
+        """Generates the parameters of the query
+
+        The order of the parameters only depends on the shape of the query.
+
+        Arguments:
+            None
+
+        Returns:
+            params (list[Any])
+                -- The parameters of the query
+        """
+        return []
+
+    def get_shape(self):
+        """Gets the shape of the query
+
+        Two queries with the same shape generate the same text, so the shape
+        can be used as a key to cache the text. The shape is made from
+        everything the text is generated from, so two queries made from the
+        same template only share it if they were built the same way. Queries
+        which were not made from a template have no shape.
+
+        Arguments:
+            None
+
+        Returns:
+            shape (tuple|None)
+                -- The shape of the query or None if it has no shape
+        """
+        if self._title is None:
+            return None
+
+        return (
+            type(self).__name__,
+            self._title,
+            tuple(self._tables),
+            tuple((table, tuple(fields)) for table, fields in self._fields.items()),
+            tuple(self._constraints),
+            tuple(self._data),
+            tuple(self._custom_constraints),
+            tuple(self._custom_select),
+            tuple(self._custom_tail),
+            tuple(self._links),
+            tuple(self._order_by),
+        )
+
+    def get_title(self):
+        """Accessor method for _title"""
+        return self._title
+
+    def add_order(self, field, table, asc=True):
+        """Adds a key to order by after any existing keys
+
+        Arguments:
+            field (str)
+                -- The field
+            table (str)
+                -- The table
+
+        Keyword Arguments:
+            asc (bool) default True
+                -- Whether to order ascending
+
+        Returns:
+            None
+        """
+        self._order_by.append((table, field, asc))
+
+    def get_order(self):
+        """Accessor method for _order_by"""
+        return self._order_by
+
+    def check_order(self, schema):
+        """Checks the keys to order by against the schema
+
+        Arguments:
+            schema (backend.schema.Schema)
+                -- The schema of the database
+
+        Returns:
+            None
+        """
+        pass
 
     def _gen_tail(self):
         """Generates the tail part of the query
@@ -309,6 +558,41 @@ class Query:
         qtext, param = self.generate_query()
         return conn.execute(qtext, param)
 
+    def get_columns(self, cursor):
+        """Gets the names of the columns of the result
+
+        Arguments:
+            cursor (sqlite3.Cursor)
+                -- The result of executing the query
+
+        Returns:
+            columns (list[str])
+                -- The name of each column
+        """
+        # Queries which return no rows have no description
+        if cursor.description is None:
+            return []
+        return [column[0] for column in cursor.description]
+
+    def stream_rows(self, cursor, batch_size):
+        """Reads the result of the query in batches
+
+        Arguments:
+            cursor (sqlite3.Cursor)
+                -- The result of executing the query
+            batch_size (int)
+                -- The most rows in each batch
+
+        Returns:
+            batches (Iterator[list[tuple]])
+                -- The rows of the result in batches
+        """
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                return
+            yield rows
+
     def changed_db(self):
         """Whether the query has changed the database
 
@@ -321,6 +605,62 @@ class Query:
         """
         return True
 
+    def get_target(self):
+        """Gets the table the query writes to
+
+        Arguments:
+            None
+
+        Returns:
+            target (str|None)
+                -- The first table used by the query or None if it uses none
+        """
+        if not self._tables:
+            return None
+        return self._tables[0]
+
+    def generate_image_query(self):
+        """Generates the query reading the rows the query changes
+
+        Used to remember the rows before they are changed so the change can
+        be undone. The base query changes no existing rows.
+
+        Arguments:
+            None
+
+        Returns:
+            query ((str, list[Any])|None)
+                -- The query text and parameters, reading the rowid followed
+                   by every column, or None if no existing rows are changed
+        """
+        return None
+
+    def get_page_state(self):
+        """Gets the state of the query after reading a result
+
+        The base query has no state
+
+        Arguments:
+            None
+
+        Returns:
+            state (Any)
+                -- The state
+        """
+        return None
+
+    def set_page_state(self, state):
+        """Restores the state of the query after reading a result
+
+        Arguments:
+            state (Any)
+                -- A state from get_page_state
+
+        Returns:
+            None
+        """
+        pass
+
 
 class NullQuery(Query):
     """This query does nothing.
@@ -352,6 +692,10 @@ class NullQuery(Query):
         """Does nothing"""
         return "", []
 
+    def get_shape(self):
+        """It has no shape"""
+        return None
+
     def changed_db(self):
         """It did not change the database"""
         return False
@@ -364,7 +708,8 @@ class AddQuery(Query):
         Overridden:
             _gen_data_query() -> str
             update_data(field: str, table: str, value: Any) -> None
-            generate_data() -> (str, list[Any])
+            generate_text() -> str
+            generate_params() -> list[Any]
     """
 
     def _gen_data_query(self):
@@ -407,34 +752,107 @@ class AddQuery(Query):
             None
         """
         self._data[f"{escape(field)}"] = value
-        self._tables.add(table)
+        self._add_table(table)
 
-    def generate_query(self):
+    def generate_text(self):
         # Standard INSERT INTO query
         text = f"""INSERT INTO
             {self._gen_table_query()}
             {self._gen_data_query()}
             {self._gen_tail()}"""
 
+        return text
+
+    def generate_params(self):
         params = []
         for field in self._data:
             params.append(self._data[field])
 
-        return text, params
+        return params
 
 
 class GetQuery(Query):
     """A query for getting data
 
+    Results are read one page at a time. The rows are ordered by the keys to
+    order by followed by the page key. If the page key is set and every key
+    is in the same direction, pages are found by seeking past the keys of
+    the last (or first) row of the current page, otherwise LIMIT and OFFSET
+    are used.
+
+    Attributes:
+        Protected:
+            _offset (int)
+                -- How many rows to skip when not seeking
+            _page_key (list[(str, str)])
+                -- The (table, field) pairs which uniquely order the rows
+            _page_after (tuple|None)
+                -- The keys which the page starts after
+            _page_before (tuple|None)
+                -- The keys which the page ends before
+            _first_key (tuple|None)
+                -- The keys of the first row of the current page
+            _last_key (tuple|None)
+                -- The keys of the last row of the current page
+            _has_next (bool)
+                -- Whether there is a page after the current page
+            _has_previous (bool)
+                -- Whether there is a page before the current page
+
     Methods:
         Overridden:
             _gen_data_query() -> str
+            _gen_constraint_query() -> str
             update_data(field: str, table: str, value: Any) -> None
-            generate_data() -> (str, list[Any])
+            generate_text() -> str
+            generate_params() -> list[Any]
+            get_shape() -> tuple
+            check_order(schema: backend.schema.Schema) -> None
+            get_columns(cursor: sqlite3.Cursor) -> list[str]
+            stream_rows(cursor: sqlite3.Cursor,
+                        batch_size: int) -> Iterator[list[tuple]]
+                -- Reads the current page in batches
+            get_page_state() -> tuple
+            set_page_state(state: tuple) -> None
+        Public:
+            add_page_key(field: str, table: str) -> None
+                -- Adds a field to the page key
+            get_limit() -> int
+                -- Accessor method for _limit
+            fetch_page(cursor: sqlite3.Cursor) -> list[tuple]
+                -- Reads the current page from the result of the query
+            next_page() -> None
+                -- Moves the query onto the next page
+            previous_page() -> None
+                -- Moves the query onto the previous page
+            has_next() -> bool
+                -- Whether there is a page after the current page
+            has_previous() -> bool
+                -- Whether there is a page before the current page
+        Private:
+            __gen_sort_key() -> list[(str, bool)]
+                -- Generates the escaped fields to order by and their
+                   directions
+            __gen_seek_key() -> list[str]
+                -- Generates the escaped fields to seek past
+            __is_seeking() -> bool
+                -- Whether pages are found by seeking
     """
 
-    def __init__(self, order_by=None, order_asc=True, limit=1000):
-        super().__init__(order_by=order_by, order_asc=order_asc, limit=limit)
+    def __init__(self, order_by=None, order_asc=True, limit=1000, title=None):
+        super().__init__(
+            order_by=order_by, order_asc=order_asc, limit=limit, title=title
+        )
+
+        self._offset = 0
+        self._page_key = []
+        self._page_after = None
+        self._page_before = None
+
+        self._first_key = None
+        self._last_key = None
+        self._has_next = False
+        self._has_previous = False
 
     def get_fields(self):
         """Accessor method for _fields"""
@@ -444,6 +862,120 @@ class GetQuery(Query):
             fields[" "].append(field)
         return fields
 
+    def add_page_key(self, field, table):
+        """Adds a field to the page key
+
+        The page key should uniquely order the rows so that pages can be
+        found by seeking past it.
+
+        Arguments:
+            field (str)
+                -- The field
+            table (str)
+                -- The table
+
+        Returns:
+            None
+        """
+        self._page_key.append((table, field))
+
+    def get_limit(self):
+        """Accessor method for _limit"""
+        return self._limit
+
+    def check_order(self, schema):
+        """Checks the keys to order by against the schema
+
+        Only fields of tables in the query can be ordered by. If the rows are
+        ordered by fields of one table which an index starts with, the rest of
+        that index becomes the page key so the index can give the rows in
+        order without sorting them.
+
+        Arguments:
+            schema (backend.schema.Schema)
+                -- The schema of the database
+
+        Returns:
+            None
+
+        Raises:
+            ValueError
+                -- If a key is not a field of a table in the query
+        """
+        keys = [(table, field) for table, field, _ in self._order_by]
+        for table, field in keys + self._page_key:
+            is_field = schema.has_column(table, field)
+            is_field = is_field or field == schema.get_rowid(table)
+            if table not in self._tables or not is_field:
+                raise ValueError(f"Can not order by {table}.{field}")
+
+        # Only a page key can be replaced without changing the order
+        if not self._order_by or not self._page_key:
+            return
+
+        tables = {table for table, _, _ in self._order_by}
+        directions = {asc for _, _, asc in self._order_by}
+        if len(tables) != 1 or len(directions) != 1:
+            return
+
+        table = tables.pop()
+        fields = [field for _, field, _ in self._order_by]
+        index = schema.get_unique_key(table, fields)
+        if index is not None:
+            self._page_key = [(table, field) for field in index[len(fields) :]]
+
+    def __gen_sort_key(self):
+        """Generates the escaped fields to order by and their directions
+
+        The page key comes after the keys to order by in the same direction
+        as the last key.
+
+        Arguments:
+            None
+
+        Returns:
+            sort_key (list[(str, bool)])
+                -- The escaped fields and whether they are ascending
+        """
+        sort_key = []
+        for table, field, asc in self._order_by:
+            sort_key.append((f"{escape(table)}.{escape(field)}", asc))
+
+        asc = sort_key[-1][1] if sort_key else True
+        for table, field in self._page_key:
+            field = f"{escape(table)}.{escape(field)}"
+            if field not in [key for key, _ in sort_key]:
+                sort_key.append((field, asc))
+        return sort_key
+
+    def __is_seeking(self):
+        """Whether pages are found by seeking
+
+        Arguments:
+            None
+
+        Returns:
+            is_seeking (bool)
+                -- Whether there is a page key and every key to order by is
+                   in the same direction
+        """
+        directions = {asc for _, asc in self.__gen_sort_key()}
+        return bool(self._page_key) and len(directions) == 1
+
+    def __gen_seek_key(self):
+        """Generates the escaped fields to seek past
+
+        Arguments:
+            None
+
+        Returns:
+            fields (list[str])
+                -- The escaped fields or nothing if not seeking
+        """
+        if not self.__is_seeking():
+            return []
+        return [field for field, _ in self.__gen_sort_key()]
+
     def _gen_data_query(self):
         """Generates the data part of the query
 
@@ -462,11 +994,44 @@ class GetQuery(Query):
         for _, get_text in self._custom_select:
             fields.append(get_text)
 
+        # Select the keys to seek past last so they can be split off each row
+        fields.extend(self.__gen_seek_key())
+
         fields = ",".join(fields)
         return fields
 
-    def generate_query(self):
-        """Generates the query
+    def _gen_constraint_query(self):
+        """Generates the constraint part of the query
+
+        Arguments:
+            None
+
+        Returns:
+            text (str)
+                -- The constraint part of the query
+        """
+        out = super()._gen_constraint_query()
+
+        # Seek past the keys of the current page
+        if self._page_after is not None or self._page_before is not None:
+            seek_key = self.__gen_seek_key()
+            key = ",".join(seek_key)
+            values = ",".join("?" for _ in seek_key)
+
+            # Going forwards through ascending keys means looking for bigger
+            # keys
+            asc = self.__gen_sort_key()[0][1]
+            operator = ">" if asc == (self._page_after is not None) else "<"
+            seek = f"({key}) {operator} ({values})"
+
+            if out:
+                out += f" AND {seek}"
+            else:
+                out = f"WHERE {seek}"
+        return out
+
+    def generate_text(self):
+        """Generates the text of the query
 
         Arguments:
             None
@@ -474,28 +1039,238 @@ class GetQuery(Query):
         Returns:
             qtext (str)
                 -- The query text
-            params (list[Any])
-                -- The parameters of the query
         """
         text = f"""
             SELECT {self._gen_data_query()}
             FROM {self._gen_table_query()}
             {self._gen_constraint_query()}
             {self._gen_tail()}"""
+
+        # Order by the keys, backwards if reading the previous page
+        sort_key = self.__gen_sort_key()
+        if sort_key:
+            order = []
+            for field, asc in sort_key:
+                if self._page_before is not None:
+                    asc = not asc
+                order.append(f"{field} {'ASC' if asc else 'DESC'}")
+            text += f" ORDER BY {','.join(order)}"
+
+        # Get one extra row to find out if there is another page
+        text += " LIMIT ? OFFSET ?"
+
+        return text
+
+    def generate_params(self):
+        """Generates the parameters of the query
+
+        Arguments:
+            None
+
+        Returns:
+            params (list[Any])
+                -- The parameters of the query
+        """
         params = []
 
         for field in self._constraints:
             params.append(self._constraints[field])
 
-        if self._order_by is not None:
-            text += " ORDER BY ?"
-            if self._order_asc:
-                text += "ASC"
-            else:
-                text += "DESC"
-            params.append(self._order_by)
+        if self._page_after is not None:
+            params.extend(self._page_after)
+        elif self._page_before is not None:
+            params.extend(self._page_before)
+
+        params.append(self._limit + 1)
+        params.append(self._offset)
+
+        return params
+
+    def get_shape(self):
+        """Gets the shape of the query
+
+        Arguments:
+            None
+
+        Returns:
+            shape (tuple|None)
+                -- The shape of the query or None if it has no shape
+        """
+        shape = super().get_shape()
+        if shape is None:
+            return None
+
+        return shape + (
+            tuple(self._page_key),
+            self._page_after is not None,
+            self._page_before is not None,
+        )
+
+    def get_columns(self, cursor):
+        """Gets the names of the columns of the result
 
-        return text, params
+        Arguments:
+            cursor (sqlite3.Cursor)
+                -- The result of executing the query
+
+        Returns:
+            columns (list[str])
+                -- The name of each column without the keys to seek past
+        """
+        columns = super().get_columns(cursor)
+        width = len(self.__gen_seek_key())
+        if width:
+            columns = columns[:-width]
+        return columns
+
+    def stream_rows(self, cursor, batch_size):
+        """Reads the current page from the result of the query in batches
+
+        Only the rows of the page are read from the result. Whether there
+        are other pages is known once every batch has been read.
+
+        Arguments:
+            cursor (sqlite3.Cursor)
+                -- The result of executing the query
+            batch_size (int)
+                -- The most rows in each batch
+
+        Returns:
+            batches (Iterator[list[tuple]])
+                -- The rows of the page without the keys to seek past
+        """
+        width = len(self.__gen_seek_key())
+        is_backwards = self._page_before is not None
+
+        # The rows of the page and the extra row which shows there is more
+        remaining = self._limit + 1
+        is_more = False
+        is_first = True
+        pending = []
+
+        while remaining > 0:
+            rows = cursor.fetchmany(min(batch_size, remaining))
+            if not rows:
+                break
+            remaining -= len(rows)
+
+            # The extra row is not part of the page
+            if remaining == 0:
+                is_more = True
+                rows = rows[:-1]
+                if not rows:
+                    break
+
+            # Rows of the previous page are read backwards, so the whole page
+            # has to be read before it can be put in order
+            if is_backwards:
+                pending.extend(rows)
+                continue
+
+            # Remember the keys of the first and last rows of the page
+            if width:
+                if is_first:
+                    self._first_key = tuple(rows[0][-width:])
+                self._last_key = tuple(rows[-1][-width:])
+                rows = [row[:-width] for row in rows]
+
+            is_first = False
+            yield rows
+
+        if is_backwards:
+            pending.reverse()
+            self._has_previous = is_more
+            self._has_next = True
+
+            if width and pending:
+                self._first_key = tuple(pending[0][-width:])
+                self._last_key = tuple(pending[-1][-width:])
+                pending = [row[:-width] for row in pending]
+
+            for i in range(0, len(pending), batch_size):
+                yield pending[i : i + batch_size]
+        else:
+            self._has_previous = self._page_after is not None or self._offset > 0
+            self._has_next = is_more
+
+    def fetch_page(self, cursor):
+        """Reads the current page from the result of the query
+
+        Arguments:
+            cursor (sqlite3.Cursor)
+                -- The result of executing the query
+
+        Returns:
+            rows (list[tuple])
+                -- The rows of the page without the keys to seek past
+        """
+        rows = []
+        for batch in self.stream_rows(cursor, self._limit + 1):
+            rows.extend(batch)
+        return rows
+
+    def next_page(self):
+        """Moves the query onto the next page
+
+        Arguments:
+            None
+
+        Returns:
+            None
+        """
+        if self.__is_seeking():
+            self._page_after = self._last_key
+            self._page_before = None
+        else:
+            self._offset += self._limit
+
+    def previous_page(self):
+        """Moves the query onto the previous page
+
+        Arguments:
+            None
+
+        Returns:
+            None
+        """
+        if self.__is_seeking():
+            self._page_before = self._first_key
+            self._page_after = None
+        else:
+            self._offset = max(0, self._offset - self._limit)
+
+    def get_page_state(self):
+        """Gets the state of the query after reading a page
+
+        Arguments:
+            None
+
+        Returns:
+            state (tuple)
+                -- The keys of the first and last rows and whether there are
+                   pages before and after
+        """
+        return (self._first_key, self._last_key, self._has_next, self._has_previous)
+
+    def set_page_state(self, state):
+        """Restores the state of the query after reading a page
+
+        Arguments:
+            state (tuple)
+                -- A state from get_page_state
+
+        Returns:
+            None
+        """
+        self._first_key, self._last_key, self._has_next, self._has_previous = state
+
+    def has_next(self):
+        """Accessor method for _has_next"""
+        return self._has_next
+
+    def has_previous(self):
+        """Accessor method for _has_previous"""
+        return self._has_previous
 
     def changed_db(self):
         return False
@@ -504,15 +1279,19 @@ class GetQuery(Query):
 class RemoveQuery(Query):
     """A query for removing
 
+    Rows are removed from the first table used by the query.
+
     Methods:
         Overridden:
             _gen_data_query() -> str
             update_data(field: str, table: str, value: Any) -> None
-            generate_data() -> (str, list[Any])
+            generate_text() -> str
+            generate_params() -> list[Any]
+            generate_image_query() -> (str, list[Any])
     """
 
-    def generate_query(self):
-        """Generates the query
+    def generate_text(self):
+        """Generates the text of the query
 
         Arguments:
             None
@@ -520,30 +1299,78 @@ class RemoveQuery(Query):
         Returns:
             qtext (str)
                 -- The query text
+        """
+        target = self.get_target()
+        text = f"""
+            DELETE FROM {escape(target)}
+            {self._gen_target_query(target)}"""
+
+        return text
+
+    def generate_params(self):
+        """Generates the parameters of the query
+
+        Arguments:
+            None
+
+        Returns:
             params (list[Any])
                 -- The parameters of the query
         """
-        text = f"""
-            DELETE FROM {self._gen_table_query()}
-            {self._gen_constraint_query()} {self._gen_tail()}"""
         params = []
 
         for field in self._constraints:
             params.append(self._constraints[field])
 
-        return text, params
+        return params
+
+    def generate_image_query(self):
+        """Generates the query reading the rows the query changes
+
+        Arguments:
+            None
+
+        Returns:
+            query ((str, list[Any]))
+                -- The query text and parameters
+        """
+        target = self.get_target()
+        text = f"""
+            SELECT rowid, * FROM {escape(target)}
+            {self._gen_target_query(target)}"""
+
+        return text, list(self._constraints.values())
 
 
 class ChangeQuery(Query):
     """A query for changing data
 
+    Rows are changed in the table of the first data set.
+
+    Attributes:
+        Protected:
+            _target (str)
+                -- The table which is changed
+
     Methods:
         Overridden:
             _gen_data_query() -> str
             update_data(field: str, table: str, value: Any) -> None
-            generate_data() -> (str, list[Any])
+            generate_text() -> str
+            generate_params() -> list[Any]
+            generate_image_query() -> (str, list[Any])
+        Public:
+            get_target() -> str
+                -- Gets the table which is changed
     """
 
+    def __init__(self, order_by=None, order_asc=True, limit=1, title=None):
+        super().__init__(
+            order_by=order_by, order_asc=order_asc, limit=limit, title=title
+        )
+
+        self._target = None
+
     def update_data(self, field, table, value=None):
         """Generates the data part of the query
 
@@ -555,7 +1382,23 @@ class ChangeQuery(Query):
                 -- The data part of the query
         """
         self._data[f"{escape(field)}"] = value
-        self._tables.add(table)
+        self._add_table(table)
+
+        # The first table with data set is the one which is changed
+        if self._target is None:
+            self._target = table
+
+    def get_target(self):
+        """Gets the table which is changed
+
+        Arguments:
+            None
+
+        Returns:
+            target (str)
+                -- The table
+        """
+        return self._target
 
     def _gen_data_query(self):
         """Generates the data part of the query
@@ -573,8 +1416,8 @@ class ChangeQuery(Query):
         out = ", ".join(out)
         return out
 
-    def generate_query(self):
-        """Generates the query
+    def generate_text(self):
+        """Generates the text of the query
 
         Arguments:
             None
@@ -582,14 +1425,25 @@ class ChangeQuery(Query):
         Returns:
             qtext (str)
                 -- The query text
-            params (list[Any])
-                -- The parameters of the query
         """
+        target = self.get_target()
         text = f"""
-            UPDATE {self._gen_table_query()}
+            UPDATE {escape(target)}
             SET {self._gen_data_query()}
-            {self._gen_constraint_query()}
-            {self._gen_tail()}"""
+            {self._gen_target_query(target)}"""
+
+        return text
+
+    def generate_params(self):
+        """Generates the parameters of the query
+
+        Arguments:
+            None
+
+        Returns:
+            params (list[Any])
+                -- The parameters of the query
+        """
         params = []
 
         for field in self._data:
@@ -598,4 +1452,21 @@ class ChangeQuery(Query):
         for field in self._constraints:
             params.append(self._constraints[field])
 
-        return text, params
+        return params
+
+    def generate_image_query(self):
+        """Generates the query reading the rows the query changes
+
+        Arguments:
+            None
+
+        Returns:
+            query ((str, list[Any]))
+                -- The query text and parameters
+        """
+        target = self.get_target()
+        text = f"""
+            SELECT rowid, * FROM {escape(target)}
+            {self._gen_target_query(target)}"""
+
+        return text, list(self._constraints.values())
@@ -0,0 +1,109 @@
+"""The file which contains the cache of compiled query shapes"""
+
+import collections
+
+
+class QueryCache:
+    """A cache of the text of compiled queries keyed by their shape
+
+    Queries with the same shape (see backend.query.Query.get_shape) generate
+    the same text, so only the parameters need to be generated when a shape
+    has been seen before. Keeping the text identical also lets sqlite3 reuse
+    its prepared statement.
+
+    Attributes:
+        Private:
+            __max_size (int)
+                -- The maximum number of shapes to remember
+            __cache (collections.OrderedDict[tuple:str])
+                -- The text of each shape, least recently used first
+            __hits (int)
+                -- How many times a shape was found in the cache
+            __misses (int)
+                -- How many times a shape had to be compiled
+
+    Methods:
+        Magic:
+            __init__(max_size:int=256) -> None
+        Public:
+            compile(query: backend.query.Query) -> (str, list[Any])
+                -- Compiles a query into its text and parameters
+            get_stats() -> dict[str:int]
+                -- Gets the hit and miss counters
+            clear() -> None
+                -- Empties the cache
+    """
+
+    def __init__(self, max_size=256):
+        """The constructor for QueryCache
+
+        Arguments:
+            None
+
+        Keyword Arguments:
+            max_size (int) default 256
+                -- The maximum number of shapes to remember
+
+        Returns:
+            None
+        """
+        self.__max_size = max_size
+        self.__cache = collections.OrderedDict()
+        self.__hits = 0
+        self.__misses = 0
+
+    def compile(self, query):
+        """Compiles a query into its text and parameters
+
+        Arguments:
+            query (backend.query.Query)
+                -- The query to compile
+
+        Returns:
+            qtext (str)
+                -- The query text
+            params (list[Any])
+                -- The parameters of the query
+        """
+        shape = query.get_shape()
+
+        # Queries without a shape can not be cached
+        if shape is None:
+            return query.generate_query()
+
+        # If the shape has been seen, only the parameters are needed
+        if shape in self.__cache:
+            self.__hits += 1
+            self.__cache.move_to_end(shape)
+            return self.__cache[shape], query.generate_params()
+
+        # Otherwise generate the text and remember it
+        self.__misses += 1
+        qtext, params = query.generate_query()
+        self.__cache[shape] = qtext
+
+        # Forget the least recently used shape if the cache is too big
+        if len(self.__cache) > self.__max_size:
+            self.__cache.popitem(last=False)
+
+        return qtext, params
+
+    def get_stats(self):
+        """Gets the hit and miss counters
+
+        Arguments:
+            None
+
+        Returns:
+            stats (dict[str:int])
+                -- The hits, misses and size of the cache
+        """
+        return {
+            "hits": self.__hits,
+            "misses": self.__misses,
+            "size": len(self.__cache),
+        }
+
+    def clear(self):
+        """Empties the cache"""
+        self.__cache.clear()
@@ -0,0 +1,193 @@
+"""The file which contains the cache of the results of queries"""
+
+import collections
+
+
+class ResultCache:
+    """A cache of the rows read by queries keyed by their text and parameters
+
+    Each result remembers the tables it read, so a change to a table only
+    forgets the results which read that table.
+
+    Attributes:
+        Private:
+            __max_size (int)
+                -- The maximum number of results to remember
+            __max_rows (int)
+                -- The maximum number of rows to remember in total
+            __cache (collections.OrderedDict[tuple:tuple])
+                -- The tables, columns, rows and page state of each result,
+                   least recently used first
+            __rows (int)
+                -- How many rows are remembered in total
+            __generation (int)
+                -- Counts the changes to the database, so results read
+                   across a change are not remembered
+            __hits (int)
+                -- How many times a result was found in the cache
+            __misses (int)
+                -- How many times a result had to be read
+            __evictions (int)
+                -- How many results were forgotten to make room
+            __invalidations (int)
+                -- How many results were forgotten because a table changed
+
+    Methods:
+        Magic:
+            __init__(max_size:int=128, max_rows:int=50000) -> None
+        Public:
+            get(key: tuple) -> (list[str], list[tuple], Any)|None
+                -- Gets a remembered result
+            get_generation() -> int
+                -- Accessor method for __generation
+            put(key: tuple,
+                tables: Iterable[str],
+                columns: list[str],
+                rows: list[tuple],
+                state: Any,
+                generation: int) -> None
+                -- Remembers a result
+            invalidate(tables: Iterable[str]) -> None
+                -- Forgets the results which read any of the tables
+            clear() -> None
+                -- Forgets every result
+            get_stats() -> dict[str:int|float]
+                -- Gets the counters of the cache
+    """
+
+    def __init__(self, max_size=128, max_rows=50000):
+        """The constructor for ResultCache
+
+        Arguments:
+            None
+
+        Keyword Arguments:
+            max_size (int) default 128
+                -- The maximum number of results to remember
+            max_rows (int) default 50000
+                -- The maximum number of rows to remember in total
+
+        Returns:
+            None
+        """
+        self.__max_size = max_size
+        self.__max_rows = max_rows
+        self.__cache = collections.OrderedDict()
+        self.__rows = 0
+        self.__generation = 0
+        self.__hits = 0
+        self.__misses = 0
+        self.__evictions = 0
+        self.__invalidations = 0
+
+    def get(self, key):
+        """Gets a remembered result
+
+        Arguments:
+            key (tuple)
+                -- The text and the parameters of the query
+
+        Returns:
+            result ((list[str], list[tuple], Any)|None)
+                -- The columns, rows and page state of the result or None if
+                   it is not remembered
+        """
+        if key not in self.__cache:
+            self.__misses += 1
+            return None
+
+        self.__hits += 1
+        self.__cache.move_to_end(key)
+        _, columns, rows, state = self.__cache[key]
+        return columns, rows, state
+
+    def get_generation(self):
+        """Accessor method for __generation"""
+        return self.__generation
+
+    def put(self, key, tables, columns, rows, state, generation):
+        """Remembers a result
+
+        Arguments:
+            key (tuple)
+                -- The text and the parameters of the query
+            tables (Iterable[str])
+                -- The tables the query read
+            columns (list[str])
+                -- The names of the columns of the result
+            rows (list[tuple])
+                -- The rows of the result
+            state (Any)
+                -- The page state of the query after reading the result
+            generation (int)
+                -- The generation when the query started
+
+        Returns:
+            None
+        """
+        # The database changed while the result was read, so it may be stale
+        if generation != self.__generation:
+            return
+
+        # Results bigger than the whole cache are not remembered
+        if len(rows) > self.__max_rows:
+            return
+
+        if key in self.__cache:
+            self.__rows -= len(self.__cache.pop(key)[2])
+
+        self.__cache[key] = (frozenset(tables), columns, rows, state)
+        self.__rows += len(rows)
+
+        # Forget the least recently used results if the cache is too big
+        while len(self.__cache) > self.__max_size or self.__rows > self.__max_rows:
+            _, (_, _, old_rows, _) = self.__cache.popitem(last=False)
+            self.__rows -= len(old_rows)
+            self.__evictions += 1
+
+    def invalidate(self, tables):
+        """Forgets the results which read any of the tables
+
+        Arguments:
+            tables (Iterable[str])
+                -- The tables which have changed
+
+        Returns:
+            None
+        """
+        tables = frozenset(tables)
+        self.__generation += 1
+
+        stale = [key for key, entry in self.__cache.items() if entry[0] & tables]
+        for key in stale:
+            self.__rows -= len(self.__cache.pop(key)[2])
+        self.__invalidations += len(stale)
+
+    def clear(self):
+        """Forgets every result"""
+        self.__generation += 1
+        self.__invalidations += len(self.__cache)
+        self.__cache.clear()
+        self.__rows = 0
+
+    def get_stats(self):
+        """Gets the counters of the cache
+
+        Arguments:
+            None
+
+        Returns:
+            stats (dict[str:int|float])
+                -- The hits, misses, hit rate, evictions, invalidations,
+                   size and number of rows of the cache
+        """
+        lookups = self.__hits + self.__misses
+        return {
+            "hits": self.__hits,
+            "misses": self.__misses,
+            "hit_rate": self.__hits / lookups if lookups else 0.0,
+            "evictions": self.__evictions,
+            "invalidations": self.__invalidations,
+            "size": len(self.__cache),
+            "rows": self.__rows,
+        }
@@ -0,0 +1,48 @@
+"""The file which contains the stream of the results of a query"""
+
+
+class ResultStream:
+    """The result of a query read in batches
+
+    Iterating over the stream yields lists of rows, so only one batch is
+    held in memory at a time.
+
+    Attributes:
+        Private:
+            __columns (list[str])
+                -- The name of each column
+            __batches (Iterator[list[tuple]])
+                -- The rows of the result in batches
+
+    Methods:
+        Magic:
+            __init__(columns: list[str],
+                     batches: Iterator[list[tuple]]) -> None
+            __iter__() -> Iterator[list[tuple]]
+        Public:
+            get_columns() -> list[str]
+                -- Accessor method for __columns
+    """
+
+    def __init__(self, columns, batches):
+        """The constructor for ResultStream
+
+        Arguments:
+            columns (list[str])
+                -- The name of each column
+            batches (Iterator[list[tuple]])
+                -- The rows of the result in batches
+
+        Returns:
+            None
+        """
+        self.__columns = columns
+        self.__batches = batches
+
+    def __iter__(self):
+        """Iterates over the batches of rows"""
+        return iter(self.__batches)
+
+    def get_columns(self):
+        """Accessor method for __columns"""
+        return self.__columns
@@ -0,0 +1,216 @@
+"""The file which contains the description of the database schema"""
+
+from backend.sqlescape import escape
+
+
+class Schema:
+    """The tables, columns and indexes of a database
+
+    Attributes:
+        Private:
+            __columns (dict[str:list[str]])
+                -- The columns of each table
+            __rowids (dict[str:str])
+                -- The name of the rowid of each table
+            __indexes (dict[str:list[(list[str], bool)]])
+                -- The columns of each index of each table and whether the
+                   index is unique
+            __references (dict[str:list[str]])
+                -- The tables each table has a foreign key to
+
+    Methods:
+        Magic:
+            __init__(conn: sqlite3.Connection) -> None
+        Public:
+            get_tables() -> list[str]
+                -- Gets the names of the tables
+            get_columns(table: str) -> list[str]
+                -- Gets the columns of a table
+            has_column(table: str, field: str) -> bool
+                -- Whether a table has a column
+            get_rowid(table: str) -> str
+                -- Gets the name of the rowid of a table
+            get_indexes(table: str) -> list[(list[str], bool)]
+                -- Gets the indexes of a table
+            is_indexed(table: str, fields: list[str]) -> bool
+                -- Whether an index starts with the fields
+            get_unique_key(table: str, fields: list[str]) -> list[str]
+                -- Gets the columns of an index which starts with the fields
+                   and uniquely orders the rows
+            get_dependents(table: str) -> set[str]
+                -- Gets the tables which have a foreign key to the table,
+                   directly or through other tables
+        Private:
+            __read_table(conn: sqlite3.Connection, table: str) -> None
+                -- Reads the columns and indexes of a table
+    """
+
+    def __init__(self, conn):
+        """The constructor for Schema
+
+        Arguments:
+            conn (sqlite3.Connection)
+                -- The connection to the database
+
+        Returns:
+            None
+        """
+        self.__columns = {}
+        self.__rowids = {}
+        self.__indexes = {}
+        self.__references = {}
+
+        tables = conn.execute(
+            "SELECT name FROM sqlite_master "
+            "WHERE type='table' AND name NOT LIKE 'sqlite_%'"
+        ).fetchall()
+        for (table,) in tables:
+            self.__read_table(conn, table)
+
+    def __read_table(self, conn, table):
+        """Reads the columns and indexes of a table
+
+        Arguments:
+            conn (sqlite3.Connection)
+                -- The connection to the database
+            table (str)
+                -- The table to read
+
+        Returns:
+            None
+        """
+        info = conn.execute(f"PRAGMA table_info({escape(table)})").fetchall()
+        self.__columns[table] = [column[1] for column in info]
+
+        # An INTEGER PRIMARY KEY on its own is an alias for the rowid
+        primary_key = [column for column in info if column[5]]
+        if len(primary_key) == 1 and primary_key[0][2].upper() == "INTEGER":
+            rowid = primary_key[0][1]
+        else:
+            rowid = "rowid"
+        self.__rowids[table] = rowid
+
+        # The rowid is always a unique index
+        self.__indexes[table] = [([rowid], True)]
+
+        for index in conn.execute(f"PRAGMA index_list({escape(table)})").fetchall():
+            name, unique = index[1], bool(index[2])
+            index_info = conn.execute(f"PRAGMA index_info({escape(name)})").fetchall()
+            columns = [column[2] for column in sorted(index_info)]
+            self.__indexes[table].append((columns, unique))
+
+        # The tables this table has a foreign key to
+        foreign_keys = conn.execute(
+            f"PRAGMA foreign_key_list({escape(table)})"
+        ).fetchall()
+        self.__references[table] = sorted({key[2] for key in foreign_keys})
+
+    def get_tables(self):
+        """Gets the names of the tables"""
+        return list(self.__columns)
+
+    def get_columns(self, table):
+        """Gets the columns of a table"""
+        return self.__columns.get(table, [])
+
+    def has_column(self, table, field):
+        """Whether a table has a column
+
+        Arguments:
+            table (str)
+                -- The table
+            field (str)
+                -- The column
+
+        Returns:
+            has_column (bool)
+                -- Whether the table has that column
+        """
+        return field in self.get_columns(table)
+
+    def get_rowid(self, table):
+        """Gets the name of the rowid of a table"""
+        return self.__rowids.get(table, "rowid")
+
+    def get_indexes(self, table):
+        """Gets the indexes of a table
+
+        Arguments:
+            table (str)
+                -- The table
+
+        Returns:
+            indexes (list[(list[str], bool)])
+                -- The columns of each index and whether it is unique
+        """
+        return self.__indexes.get(table, [])
+
+    def is_indexed(self, table, fields):
+        """Whether an index starts with the fields
+
+        Arguments:
+            table (str)
+                -- The table
+            fields (list[str])
+                -- The fields in order
+
+        Returns:
+            is_indexed (bool)
+                -- Whether an index of the table starts with the fields
+        """
+        fields = list(fields)
+        for columns, _ in self.get_indexes(table):
+            if columns[: len(fields)] == fields:
+                return True
+        return False
+
+    def get_unique_key(self, table, fields):
+        """Gets the columns of an index which starts with the fields and
+        uniquely orders the rows
+
+        Every index is ordered by the rowid after its columns, so the rowid
+        is added to the end of an index which is not unique.
+
+        Arguments:
+            table (str)
+                -- The table
+            fields (list[str])
+                -- The fields the index must start with
+
+        Returns:
+            key (list[str]|None)
+                -- The columns of the index or None if there is no index
+        """
+        fields = list(fields)
+        for columns, unique in self.get_indexes(table):
+            if columns[: len(fields)] == fields:
+                if unique:
+                    return columns
+                return columns + [self.get_rowid(table)]
+        return None
+
+    def get_dependents(self, table):
+        """Gets the tables which have a foreign key to the table, directly or
+        through other tables
+
+        These are the tables which a change to the table may cascade to.
+
+        Arguments:
+            table (str)
+                -- The table
+
+        Returns:
+            dependents (set[str])
+                -- The dependent tables
+        """
+        dependents = set()
+        pending = [table]
+        while pending:
+            parent = pending.pop()
+            for child, parents in self.__references.items():
+                if parent in parents and child not in dependents:
+                    dependents.add(child)
+                    pending.append(child)
+
+        dependents.discard(table)
+        return dependents
@@ -0,0 +1,516 @@
+"""A local JSON-over-HTTP service which runs the templates
+
+Desks and kiosks can run the templates through this service rather than
+each opening the database themselves. Lookups are spread over a pool of
+read connections and every change goes through a single writer, one at a
+time, so changes never wait for each other's locks.
+
+Requests:
+    GET /templates
+        -- The title and type of every template
+    POST /query {"title": str, "values": {...}, "page": int}
+        -- Runs a template. The values are described in backend.templates.
+           Lookups return {"columns", "rows", "has_next"} for the page
+           (default 0) and changes return {"changed"}, committed straight away
+    GET /stats
+        -- The lock statistics of the writer
+
+Usage:
+    python3 -m backend.service [--host HOST] [--port PORT] [--readers N]
+                               [database]
+"""
+
+import argparse
+import asyncio
+import concurrent.futures
+import contextlib
+import json
+import sqlite3
+import traceback
+
+import backend.cancel
+import backend.master
+import backend.templates
+
+# How many read connections to open
+READERS = 4
+
+# How long a lookup may run for before it is cancelled (s)
+QUERY_BUDGET = 30
+
+# The largest request body accepted (bytes)
+MAX_BODY = 1 << 20
+
+# The reason phrase of each status used
+REASONS = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    409: "Conflict",
+    413: "Payload Too Large",
+    500: "Internal Server Error",
+    503: "Service Unavailable",
+    504: "Gateway Timeout",
+}
+
+
+class HTTPError(Exception):
+    """Raised to answer a request with an error status
+
+    Attributes:
+        Public:
+            status (int)
+                -- The HTTP status
+    """
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+async def read_request(stream):
+    """Reads a request from a connection
+
+    Arguments:
+        stream (asyncio.StreamReader)
+            -- The connection
+
+    Returns:
+        request ((str, str, dict[str:str], bytes)|None)
+            -- The method, path, headers and body or None if the connection
+               was closed
+
+    Raises:
+        HTTPError
+            -- If the request can not be read
+    """
+    line = await stream.readline()
+    if not line:
+        return None
+
+    try:
+        method, path, _ = line.decode("latin-1").split()
+    except ValueError:
+        raise HTTPError(400, "Malformed request line") from None
+
+    headers = {}
+    while True:
+        line = await stream.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+
+    try:
+        length = int(headers.get("content-length", 0))
+    except ValueError:
+        raise HTTPError(400, "Malformed Content-Length") from None
+    if length < 0:
+        raise HTTPError(400, "Malformed Content-Length")
+    if length > MAX_BODY:
+        raise HTTPError(413, "Request body too large")
+    body = await stream.readexactly(length) if length else b""
+
+    return method, path, headers, body
+
+
+async def write_response(stream, status, payload, keep_alive):
+    """Writes a JSON response to a connection
+
+    Arguments:
+        stream (asyncio.StreamWriter)
+            -- The connection
+        status (int)
+            -- The HTTP status
+        payload (Any)
+            -- What to send as JSON
+        keep_alive (bool)
+            -- Whether the connection stays open
+
+    Returns:
+        None
+    """
+    body = json.dumps(payload, default=str).encode("utf-8")
+    head = (
+        f"HTTP/1.1 {status} {REASONS[status]}\r\n"
+        f"Content-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+    )
+    stream.write(head.encode("latin-1") + body)
+    await stream.drain()
+
+
+def run_lookup(master, template, values, page):
+    """Runs a template which reads the database. Runs on a reader thread.
+
+    Arguments:
+        master (backend.master.Backend)
+            -- The read connection
+        template (xml.etree.ElementTree.ElementTree)
+            -- The template
+        values (dict[str:Any])
+            -- The values of the inputs
+        page (int)
+            -- The page to return, starting at 0
+
+    Returns:
+        result (dict[str:Any])
+            -- The headings, the rows and whether there is another page
+    """
+    query = backend.templates.compile_template(master, template, values)
+
+    # Move past the earlier pages. Seeking needs the keys of each page.
+    for _ in range(page):
+        for _ in master.stream_query(query, budget=QUERY_BUDGET):
+            pass
+        if not query.has_next():
+            return {
+                "columns": backend.templates.gen_headings(query),
+                "rows": [],
+                "has_next": False,
+            }
+        query.next_page()
+
+    rows = []
+    for batch in master.stream_query(query, budget=QUERY_BUDGET):
+        rows.extend(batch)
+
+    return {
+        "columns": backend.templates.gen_headings(query),
+        "rows": rows,
+        "has_next": query.has_next(),
+    }
+
+
+def run_change(master, template, values):
+    """Runs a template which changes the database and commits it. Runs on
+    the writer thread.
+
+    Arguments:
+        master (backend.master.Backend)
+            -- The write connection
+        template (xml.etree.ElementTree.ElementTree)
+            -- The template
+        values (dict[str:Any])
+            -- The values of the inputs
+
+    Returns:
+        result (dict[str:int])
+            -- How many rows were changed
+    """
+    query = backend.templates.compile_template(master, template, values)
+    try:
+        changed = max(master.handle_query(query).rowcount, 0)
+        master.commit()
+    except Exception:
+        master.rollback()
+        raise
+    return {"changed": changed}
+
+
+class Service:
+    """The service
+
+    Attributes:
+        Private:
+            __templates (dict[str:xml.etree.ElementTree.ElementTree])
+                -- The templates keyed by their title
+            __writer (backend.master.Backend)
+                -- The only connection which changes the database
+            __write_executor (concurrent.futures.ThreadPoolExecutor)
+                -- The thread which runs every change, one at a time
+            __readers (list[backend.master.Backend])
+                -- The read connections
+            __idle_readers (asyncio.Queue[backend.master.Backend])
+                -- The read connections which are not in use
+            __read_executor (concurrent.futures.ThreadPoolExecutor)
+                -- The threads which run the lookups
+
+    Methods:
+        Magic:
+            __init__(db_name:str=backend.master.DB_NAME,
+                     readers:int=READERS) -> None
+        Public:
+            handle_connection(stream_in: asyncio.StreamReader,
+                              stream_out: asyncio.StreamWriter) -> None
+                -- Answers the requests on a connection
+            route(method: str, path: str, body: bytes) -> Any
+                -- Answers a request
+            close() -> None
+                -- Closes every connection
+        Private:
+            __lookup(template: xml.etree.ElementTree.ElementTree,
+                     values: dict[str:Any],
+                     page: int) -> dict[str:Any]
+                -- Runs a lookup on an idle reader
+            __change(template: xml.etree.ElementTree.ElementTree,
+                     values: dict[str:Any]) -> dict[str:int]
+                -- Runs a change on the writer
+    """
+
+    def __init__(self, db_name=backend.master.DB_NAME, readers=READERS):
+        """The constructor for Service. Must be called inside the event loop.
+
+        Arguments:
+            None
+
+        Keyword Arguments:
+            db_name (str) default backend.master.DB_NAME
+                -- The name of the database
+            readers (int) default READERS
+                -- How many read connections to open
+
+        Returns:
+            None
+        """
+        self.__templates = backend.templates.load_templates()
+
+        # The writer is opened first so it runs any migrations
+        self.__writer = backend.master.Backend(db_name)
+        self.__write_executor = concurrent.futures.ThreadPoolExecutor(
+            1, thread_name_prefix="service-writer"
+        )
+
+        self.__readers = [backend.master.Backend(db_name) for _ in range(readers)]
+        self.__idle_readers = asyncio.Queue()
+        for reader in self.__readers:
+            self.__idle_readers.put_nowait(reader)
+        self.__read_executor = concurrent.futures.ThreadPoolExecutor(
+            readers, thread_name_prefix="service-reader"
+        )
+
+    async def handle_connection(self, stream_in, stream_out):
+        """Answers the requests on a connection until it is closed
+
+        A request which fails unexpectedly is answered with a 500 and the
+        connection is closed.
+
+        Arguments:
+            stream_in (asyncio.StreamReader)
+                -- Reads from the connection
+            stream_out (asyncio.StreamWriter)
+                -- Writes to the connection
+
+        Returns:
+            None
+        """
+        try:
+            while True:
+                try:
+                    request = await read_request(stream_in)
+                except HTTPError as err:
+                    await write_response(
+                        stream_out, err.status, {"error": str(err)}, False
+                    )
+                    break
+                if request is None:
+                    break
+
+                method, path, headers, body = request
+                keep_alive = headers.get("connection", "").lower() != "close"
+
+                try:
+                    status, payload = 200, await self.route(method, path, body)
+                except HTTPError as err:
+                    status, payload = err.status, {"error": str(err)}
+                except Exception as err:
+                    # Print the traceback for whoever runs the service, as
+                    # this is a bug rather than a bad request
+                    traceback.print_exc()
+                    status, payload = 500, {"error": str(err)}
+                    keep_alive = False
+
+                await write_response(stream_out, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except Exception as err:
+            traceback.print_exc()
+            with contextlib.suppress(Exception):
+                await write_response(stream_out, 500, {"error": str(err)}, False)
+        finally:
+            stream_out.close()
+
+    async def route(self, method, path, body):
+        """Answers a request
+
+        Arguments:
+            method (str)
+                -- The HTTP method
+            path (str)
+                -- The path requested
+            body (bytes)
+                -- The body of the request
+
+        Returns:
+            payload (Any)
+                -- What to send back as JSON
+
+        Raises:
+            HTTPError
+                -- If the request fails
+        """
+        if path == "/templates":
+            if method != "GET":
+                raise HTTPError(405, "Use GET")
+            return [
+                {"title": title, "type": template.getroot().attrib["type"]}
+                for title, template in sorted(self.__templates.items())
+            ]
+
+        if path == "/stats":
+            if method != "GET":
+                raise HTTPError(405, "Use GET")
+            return {"writer": self.__writer.get_lock_stats()}
+
+        if path != "/query":
+            raise HTTPError(404, f"No such path {path}")
+        if method != "POST":
+            raise HTTPError(405, "Use POST")
+
+        try:
+            request = json.loads(body or b"{}")
+            if not isinstance(request, dict):
+                raise TypeError("expected a JSON object")
+            title = request["title"]
+            if not isinstance(title, str):
+                raise TypeError("title should be a string")
+            values = request.get("values", {})
+            if not isinstance(values, dict):
+                raise TypeError("values should be a JSON object")
+            page = int(request.get("page", 0))
+            if page < 0:
+                raise ValueError("page should not be negative")
+        except (ValueError, KeyError, TypeError) as err:
+            raise HTTPError(400, f"Bad request body: {err}") from None
+
+        if title not in self.__templates:
+            raise HTTPError(404, f"No such template {title!r}")
+        template = self.__templates[title]
+
+        # Turn the errors of the backend into statuses
+        try:
+            if template.getroot().attrib["type"] == "get":
+                return await self.__lookup(template, values, page)
+            return await self.__change(template, values)
+        except backend.cancel.QueryCancelled as err:
+            raise HTTPError(504, str(err)) from None
+        except sqlite3.IntegrityError as err:
+            raise HTTPError(409, str(err)) from None
+        except sqlite3.OperationalError as err:
+            if backend.master.is_busy(err):
+                raise HTTPError(503, "Database busy, try again") from None
+            raise HTTPError(500, str(err)) from None
+        except ValueError as err:
+            raise HTTPError(400, str(err)) from None
+
+    async def __lookup(self, template, values, page):
+        """Runs a lookup on an idle reader
+
+        Arguments:
+            template (xml.etree.ElementTree.ElementTree)
+                -- The template
+            values (dict[str:Any])
+                -- The values of the inputs
+            page (int)
+                -- The page to return
+
+        Returns:
+            result (dict[str:Any])
+                -- The result of run_lookup
+        """
+        reader = await self.__idle_readers.get()
+        try:
+            return await asyncio.get_running_loop().run_in_executor(
+                self.__read_executor, run_lookup, reader, template, values, page
+            )
+        finally:
+            self.__idle_readers.put_nowait(reader)
+
+    async def __change(self, template, values):
+        """Runs a change on the writer
+
+        Arguments:
+            template (xml.etree.ElementTree.ElementTree)
+                -- The template
+            values (dict[str:Any])
+                -- The values of the inputs
+
+        Returns:
+            result (dict[str:int])
+                -- The result of run_change
+        """
+        return await asyncio.get_running_loop().run_in_executor(
+            self.__write_executor, run_change, self.__writer, template, values
+        )
+
+    def close(self):
+        """Closes every connection
+
+        Arguments:
+            None
+
+        Returns:
+            None
+        """
+        self.__read_executor.shutdown()
+        self.__write_executor.shutdown()
+        for reader in self.__readers:
+            reader.close()
+        self.__writer.close()
+
+
+async def serve(db_name, host, port, readers, ready=None):
+    """Runs the service until it is cancelled
+
+    Arguments:
+        db_name (str)
+            -- The name of the database
+        host (str)
+            -- The address to listen on
+        port (int)
+            -- The port to listen on (0 for any free port)
+        readers (int)
+            -- How many read connections to open
+
+    Keyword Arguments:
+        ready (Callable[[int], None]) default None
+            -- Called with the port once the service is listening
+
+    Returns:
+        None
+    """
+    service = Service(db_name, readers)
+    server = await asyncio.start_server(service.handle_connection, host, port)
+    try:
+        port = server.sockets[0].getsockname()[1]
+        if ready is not None:
+            ready(port)
+        async with server:
+            await server.serve_forever()
+    finally:
+        service.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Run the templates as a local JSON-over-HTTP service"
+    )
+    parser.add_argument("database", nargs="?", default=backend.master.DB_NAME)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--readers", type=int, default=READERS)
+    args = parser.parse_args()
+
+    def ready(port):
+        print(f"Listening on http://{args.host}:{port}", flush=True)
+
+    with contextlib.suppress(KeyboardInterrupt):
+        asyncio.run(serve(args.database, args.host, args.port, args.readers, ready))
+
+
+if __name__ == "__main__":
+    main()
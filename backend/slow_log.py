@@ -0,0 +1,248 @@
+"""The file which logs the queries that take too long
+
+A query is slow if running it and reading its rows takes longer than the
+threshold. Each slow query is logged with:
+    the title of its template and how long it took
+    its text and parameters
+    every statement SQLite ran for it (from the trace callback of the
+        connection), with the parameters filled in
+    the plan SQLite chose for it (see backend.plans), flagging any full scan
+        of a hot table, which shows which templates need indexes
+
+The latest slow queries are kept in memory. Each is also written as a line
+of JSON to the log file, which is rotated once it is large, or to stderr if
+there is no log file.
+"""
+
+import collections
+import datetime
+import json
+import logging
+import logging.handlers
+import os
+import sys
+
+import backend.plans
+
+# The environment variables giving the threshold (ms) and the log file
+THRESHOLD_ENV = "SUNNYTOTS_SLOW_QUERY_MS"
+LOG_ENV = "SUNNYTOTS_SLOW_QUERY_LOG"
+
+# The threshold used if none is given (ms)
+DEFAULT_THRESHOLD = 250
+
+# How large the log may grow before it is rotated (bytes) and how many old
+# logs are kept
+LOG_MAX_BYTES = 1048576
+LOG_BACKUPS = 3
+
+# How many slow queries to keep in memory
+DEPTH = 100
+
+# The longest a logged statement may be (characters). The statements which
+# read the rows a change touched can list thousands of rowids
+STATEMENT_LENGTH = 2000
+
+
+def get_threshold(threshold=None):
+    """Gets the threshold of a slow query
+
+    Arguments:
+        None
+
+    Keyword Arguments:
+        threshold (float) default None
+            -- The threshold (ms), or None to read it from the environment
+
+    Returns:
+        threshold (float|None)
+            -- The threshold (ms), or None if slow queries are not logged
+
+    Raises:
+        ValueError
+            -- If the threshold in the environment is not a number or "off"
+    """
+    if threshold is None:
+        value = os.environ.get(THRESHOLD_ENV, "").strip().lower()
+        if value == "off":
+            return None
+        elif value == "":
+            return float(DEFAULT_THRESHOLD)
+        try:
+            threshold = float(value)
+        except ValueError:
+            raise ValueError(
+                f"{THRESHOLD_ENV} should be a number of ms or off, not {value!r}"
+            ) from None
+
+    return float(threshold)
+
+
+def get_log_file(path=None):
+    """Gets the file to log the slow queries to
+
+    Arguments:
+        None
+
+    Keyword Arguments:
+        path (str) default None
+            -- The file, or None to read it from the environment
+
+    Returns:
+        path (str|None)
+            -- The file, or None to log to stderr
+    """
+    if path is None:
+        path = os.environ.get(LOG_ENV) or None
+    return path
+
+
+class SlowQueryLog:
+    """The queries which took longer than the threshold
+
+    Attributes:
+        Private:
+            __threshold (float)
+                -- How long a query may take before it is slow (s)
+            __entries (collections.deque[dict[str:Any]])
+                -- The latest slow queries
+            __log (logging.handlers.RotatingFileHandler|None)
+                -- Appends the slow queries to the log, or None to print them
+                   to stderr
+
+    Methods:
+        Magic:
+            __init__(threshold: float,
+                     log_file: str=None,
+                     max_bytes: int=LOG_MAX_BYTES,
+                     backups: int=LOG_BACKUPS,
+                     depth: int=DEPTH) -> None
+        Public:
+            get_threshold() -> float
+                -- Gets the threshold (ms)
+            is_slow(seconds: float) -> bool
+                -- Whether a query which took this long is slow
+            record(title: str|None,
+                   seconds: float,
+                   qtext: str,
+                   param: list[Any],
+                   statements: list[str],
+                   plan: list[str]) -> dict[str:Any]
+                -- Logs a slow query
+            get_entries() -> list[dict[str:Any]]
+                -- Gets the latest slow queries, oldest first
+            close() -> None
+                -- Closes the log
+    """
+
+    def __init__(
+        self,
+        threshold,
+        log_file=None,
+        max_bytes=LOG_MAX_BYTES,
+        backups=LOG_BACKUPS,
+        depth=DEPTH,
+    ):
+        """The constructor for SlowQueryLog
+
+        Arguments:
+            threshold (float)
+                -- How long a query may take before it is slow (ms)
+
+        Keyword Arguments:
+            log_file (str) default None
+                -- The file to append the slow queries to, or None to print
+                   them to stderr
+            max_bytes (int) default LOG_MAX_BYTES
+                -- How large the log may grow before it is rotated (bytes)
+            backups (int) default LOG_BACKUPS
+                -- How many old logs to keep
+            depth (int) default DEPTH
+                -- How many slow queries to keep in memory
+
+        Returns:
+            None
+        """
+        self.__threshold = threshold / 1000
+        self.__entries = collections.deque(maxlen=depth)
+
+        self.__log = None
+        if log_file is not None:
+            self.__log = logging.handlers.RotatingFileHandler(
+                log_file, maxBytes=max_bytes, backupCount=backups, encoding="utf-8"
+            )
+
+    def get_threshold(self):
+        """Gets the threshold (ms)"""
+        return self.__threshold * 1000
+
+    def is_slow(self, seconds):
+        """Whether a query which took this long is slow
+
+        Arguments:
+            seconds (float)
+                -- How long the query took (s)
+
+        Returns:
+            is_slow (bool)
+                -- Whether it took longer than the threshold
+        """
+        return seconds >= self.__threshold
+
+    def record(self, title, seconds, qtext, param, statements, plan):
+        """Logs a slow query
+
+        Arguments:
+            title (str|None)
+                -- The title of the template, or None if there is none
+            seconds (float)
+                -- How long the query took (s)
+            qtext (str)
+                -- The query text
+            param (list[Any])
+                -- The parameters of the query
+            statements (list[str])
+                -- The statements SQLite ran for the query
+            plan (list[str])
+                -- The plan of the query (see Backend.explain_query)
+
+        Returns:
+            entry (dict[str:Any])
+                -- What was logged
+        """
+        entry = {
+            "time": datetime.datetime.now().isoformat(timespec="milliseconds"),
+            "template": title,
+            "ms": round(seconds * 1000, 3),
+            "sql": " ".join(qtext.split()),
+            "params": list(param),
+            "statements": [
+                statement
+                if len(statement) <= STATEMENT_LENGTH
+                else statement[:STATEMENT_LENGTH] + "..."
+                for statement in statements
+            ],
+            "plan": list(plan),
+            "hot_scans": backend.plans.get_hot_scans(plan),
+            "temp_btree": backend.plans.has_temp_btree(plan),
+        }
+        self.__entries.append(entry)
+
+        line = json.dumps(entry, default=str)
+        if self.__log is not None:
+            # The handler rotates the file and has its own lock
+            self.__log.handle(logging.makeLogRecord({"msg": line}))
+        else:
+            print(f"Slow query: {line}", file=sys.stderr)
+
+        return entry
+
+    def get_entries(self):
+        """Gets the latest slow queries, oldest first"""
+        return list(self.__entries)
+
+    def close(self):
+        """Closes the log"""
+        if self.__log is not None:
+            self.__log.close()
+            self.__log = None
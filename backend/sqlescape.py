@@ -3,6 +3,8 @@
 Escapes strings for use in sql
 """
 
+import functools
+
 ERROR = object()
 
 
@@ -56,9 +58,13 @@ def __sanitise_characters(string, replace_invalid_with=ERROR):
             yield character
 
 
+@functools.lru_cache(maxsize=1024)
 def escape(identifier, replace_invalid_with=""):
     """Escapes a string
 
+    The result is cached as the same few identifiers are escaped for every
+    query.
+
     Argument:
         identifier (str)
             -- The literal to escape
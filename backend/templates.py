@@ -0,0 +1,345 @@
+"""Compiles the XML templates into queries without the GUI
+
+The values are checked (is_valid), converted (convert) and ordered
+(apply_ordering) by the same functions the inputs in gui.input.input_field
+use, so a template gives the same query here as it does when filled in on
+screen.
+
+Each input is given its value by the first of these keys which is set:
+    "section:Table.Field" -- such as "set-data:Children.ChildName", for
+                             templates which use a field more than once
+    "Table.Field"
+    the label of the input
+"""
+
+import datetime
+import re
+
+# The tags of the inputs which take a value
+INPUT_TAGS = ("entry", "phone", "email", "number", "radio", "date", "checkbox")
+
+# The values which tick a checkbox
+TICKED = ("1", "true", "yes", "y", "on")
+
+
+def load_templates():
+    """Loads every template
+
+    Arguments:
+        None
+
+    Returns:
+        templates (dict[str:xml.etree.ElementTree.ElementTree])
+            -- The templates keyed by their title
+    """
+    # Imported here as the templates belong to the GUI
+    import gui.input.input_xml_cache
+
+    xml_cache = gui.input.input_xml_cache.XMLCache()
+    templates = {}
+    for cache in (
+        xml_cache.add_cache,
+        xml_cache.get_cache,
+        xml_cache.chg_cache,
+        xml_cache.rem_cache,
+    ):
+        templates.update(cache)
+
+    return templates
+
+
+def convert(value, dtype):
+    """Converts a value to the data type of an input
+
+    Used by both get_value and the radio buttons and checkboxes of
+    gui.input.input_field.
+
+    Arguments:
+        value (str)
+            -- The value
+        dtype (str)
+            -- The data type ("int", "bool", "float" or "str")
+
+    Returns:
+        value (Any)
+            -- The converted value
+    """
+    # If the datatype is an int, convert it to an int but default to 0
+    if dtype == "int":
+        try:
+            return int(value)
+        except ValueError:
+            return 0
+
+    # If the data type is bool, check if it is the literal "true"
+    elif dtype == "bool":
+        return value.lower() == "true"
+
+    # If the data type is float, convert it to a float but default to 0
+    elif dtype == "float":
+        try:
+            return float(value)
+        except ValueError:
+            return 0.0
+
+    # Otherwise don't change it
+    return value
+
+
+def is_valid(tag, value):
+    """Validates the value of an input
+
+    Used by both get_value and gui.input.input_field.Input.
+
+    Arguments:
+        tag (str)
+            -- The tag of the input
+        value (str)
+            -- The value
+
+    Returns:
+        is_valid (bool)
+            -- Whether the value is valid (an empty value always is)
+    """
+    if value == "":
+        return True
+
+    if tag == "phone":
+        # \+? -- The number may start with a plus
+        # ((\(?\d+\)?)(-|\s+))+ -- It is followed by at least one:
+        #     (\(?\d+\)?)? -- Maybe some digits which might be in brackets
+        #     (-|\s+) -- a hyphen or some whitespace
+        # e.g.
+        #   +44 1865 242191
+        #   01865 253432
+        #   +1 (201) 4132-7351
+        #   +389-326-385-0068
+        return bool(re.match(r"^\+?((\(?\d+\)?)?(-|\s+)?)+$", value))
+    elif tag == "email":
+        # The only way to validate an email without sending a confirmation
+        # message or excluding valid emails
+        return "@" in value
+    elif tag == "number":
+        # Only digits
+        return value.isnumeric()
+    elif tag == "date":
+        try:
+            datetime.date.fromisoformat(value)
+        except ValueError:
+            return False
+
+    return True
+
+
+def get_value(item, section, values):
+    """Gets the value of an input
+
+    Arguments:
+        item (xml.etree.ElementTree.Element)
+            -- The input
+        section (str)
+            -- The section of the template the input is in ("search-data",
+               "optional", "set-data" or "constraints")
+        values (dict[str:Any])
+            -- The values of the inputs
+
+    Returns:
+        value (Any)
+            -- The value of the input, converted like the GUI does
+    """
+    attrib = item.attrib
+    column = f"{attrib['table']}.{attrib['field']}"
+
+    # Find the value by the most specific key
+    value = ""
+    for key in (f"{section}:{column}", column, attrib.get("label")):
+        if key in values and values[key] is not None:
+            value = str(values[key])
+            break
+
+    # A checkbox gives one of two values
+    if item.tag == "checkbox":
+        if value.strip().lower() in TICKED:
+            value = attrib["tickedvalue"]
+        else:
+            value = attrib["defaultvalue"]
+        return convert(value, attrib.get("dtype", "str"))
+
+    if item.tag == "radio":
+        return convert(value, attrib["dtype"])
+
+    return value
+
+
+def apply_ordering(query, root):
+    """Adds the keys to order by and the page key of a template to a query
+
+    Used by both compile_template and gui.input.input_field, so a template
+    is ordered the same way with or without the GUI.
+
+    Arguments:
+        query (backend.query.Query)
+            -- The query
+        root (xml.etree.ElementTree.Element)
+            -- The root of the template
+
+    Returns:
+        None
+    """
+    # Add the keys to order by ("Table.Field [ASC|DESC], ...") if there are
+    # any
+    if "order-by" in root.attrib:
+        for key in root.attrib["order-by"].split(","):
+            column, *direction = key.split()
+            table, field = column.split(".")
+            asc = not direction or direction[0].upper() != "DESC"
+            query.add_order(field, table, asc)
+
+    # Add the page key ("Table.Field Table.Field ...") if there is one
+    if "page-key" in root.attrib:
+        for column in root.attrib["page-key"].split():
+            table, field = column.split(".")
+            query.add_page_key(field, table)
+
+
+def compile_template(master, template, values):
+    """Compiles a template into a query
+
+    Arguments:
+        master (backend.master.Backend)
+            -- The backend which generates the query
+        template (xml.etree.ElementTree.ElementTree)
+            -- The template
+        values (dict[str:Any])
+            -- The values of the inputs (see the top of this file)
+
+    Returns:
+        query (backend.query.Query)
+            -- The query
+
+    Raises:
+        ValueError
+            -- If a value is missing or not valid
+    """
+    root = template.getroot()
+
+    if "limit" in root.attrib:
+        limit = int(root.attrib["limit"])
+    else:
+        limit = None
+
+    query = master.gen_new_query(root.attrib["type"], limit, root.attrib["title"])
+    apply_ordering(query, root)
+
+    # The labels of the inputs which are missing or not valid
+    errors = []
+
+    def add(item, section):
+        attrib = item.attrib
+
+        if item.tag == "link":
+            query.add_link(
+                item[0].attrib["field"],
+                item[1].attrib["field"],
+                item[0].attrib["table"],
+                item[1].attrib["table"],
+            )
+        elif item.tag == "get-data":
+            query.update_data(attrib["field"], attrib["table"])
+        elif item.tag == "custom-constraint":
+            query.add_custom_constraint(item.text)
+        elif item.tag == "custom-select":
+            query.add_custom_select(attrib["label"], item.text)
+        elif item.tag == "custom-tail":
+            query.add_custom_tail(item.text)
+        elif item.tag in INPUT_TAGS:
+            value = get_value(item, section, values)
+
+            if isinstance(value, str) and not is_valid(item.tag, value):
+                errors.append(f"{attrib['label']} is not valid")
+
+            # Optional inputs are left out when empty
+            if section == "optional":
+                if value != "":
+                    query.update_constraint(attrib["field"], attrib["table"], value)
+                return
+
+            if value == "":
+                errors.append(f"{attrib['label']} is missing")
+
+            if section == "search-data":
+                query.update_constraint(attrib["field"], attrib["table"], value)
+            else:
+                query.update_data(attrib["field"], attrib["table"], value)
+
+    def walk(node, section):
+        for item in node:
+            if item.tag == "horizontal":
+                walk(item, section)
+            elif item.tag == "optional":
+                walk(item, "optional")
+            else:
+                add(item, section)
+
+    for item in root:
+        if item.tag in ("search-data", "set-data", "constraints"):
+            walk(item, item.tag)
+
+    if errors:
+        raise ValueError(", ".join(errors))
+
+    return query
+
+
+def get_inputs(template):
+    """Gets the inputs of a template which take a value
+
+    Arguments:
+        template (xml.etree.ElementTree.ElementTree)
+            -- The template
+
+    Returns:
+        inputs (list[(xml.etree.ElementTree.Element, str)])
+            -- Each input and the section of the template it is in, in the
+               order they are shown
+    """
+    inputs = []
+
+    def walk(node, section):
+        for item in node:
+            if item.tag == "horizontal":
+                walk(item, section)
+            elif item.tag == "optional":
+                walk(item, "optional")
+            elif item.tag in INPUT_TAGS:
+                inputs.append((item, section))
+
+    for item in template.getroot():
+        if item.tag in ("search-data", "set-data", "constraints"):
+            walk(item, item.tag)
+
+    return inputs
+
+
+def gen_headings(query):
+    """Generates the heading of each column of the output of a query
+
+    Arguments:
+        query (backend.query.Query)
+            -- The query
+
+    Returns:
+        headings (list[str])
+            -- "Table.Field" for each column, or just the label of a custom
+               select
+    """
+    headings = []
+    fields = query.get_fields() or {}
+    for table in fields:
+        for field in fields[table]:
+            # Custom selects are kept under a blank table
+            if table.strip():
+                headings.append(f"{table}.{field}")
+            else:
+                headings.append(field)
+    return headings
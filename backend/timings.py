@@ -0,0 +1,357 @@
+"""The file which times the steps of running the queries of each template
+
+Every query is timed in these steps:
+    generate
+        -- Compiling the query into SQL
+    execute
+        -- Running the SQL
+    fetch
+        -- Reading the rows of the result
+    render
+        -- Showing the rows in the GUI
+    total
+        -- From the query being submitted in the GUI until its output is shown
+
+The timings are kept in a histogram for each template and step, so the
+slow front-desk operations can be seen in the GUI. If a log file is given,
+every timing is also appended to it as a line of JSON, and the file is
+rotated once it is large.
+"""
+
+import contextlib
+import datetime
+import json
+import logging
+import logging.handlers
+import os
+import threading
+import time
+
+# The environment variable giving the file to log the timings to
+LOG_ENV = "SUNNYTOTS_TIMINGS_LOG"
+
+# How large the log may grow before it is rotated (bytes) and how many old
+# logs are kept
+LOG_MAX_BYTES = 1048576
+LOG_BACKUPS = 3
+
+# The steps, in the order they happen
+STEPS = ("generate", "execute", "fetch", "render", "total")
+
+# The upper bound of each bucket of the histograms (ms). Anything slower
+# goes in one more bucket
+BUCKETS = (
+    0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000
+)
+
+# The title used for queries which were not made from a template
+UNTITLED = "(no template)"
+
+
+def get_log_file(path=None):
+    """Gets the file to log the timings to
+
+    Arguments:
+        None
+
+    Keyword Arguments:
+        path (str) default None
+            -- The file, or None to read it from the environment
+
+    Returns:
+        path (str|None)
+            -- The file, or None to not log the timings
+    """
+    if path is None:
+        path = os.environ.get(LOG_ENV) or None
+    return path
+
+
+class Histogram:
+    """The timings of one step of one template
+
+    Attributes:
+        Private:
+            __counts (list[int])
+                -- How many timings are in each bucket
+            __count (int)
+                -- How many timings there are
+            __total (float)
+                -- The sum of the timings (ms)
+            __max (float)
+                -- The slowest timing (ms)
+
+    Methods:
+        Magic:
+            __init__() -> None
+        Public:
+            record(ms: float) -> None
+                -- Adds a timing
+            get_percentile(fraction: float) -> float
+                -- Estimates a percentile of the timings
+            get_stats() -> dict[str:int|float]
+                -- Gets a summary of the timings
+    """
+
+    def __init__(self):
+        """The constructor for Histogram
+
+        Arguments:
+            None
+
+        Returns:
+            None
+        """
+        self.__counts = [0] * (len(BUCKETS) + 1)
+        self.__count = 0
+        self.__total = 0.0
+        self.__max = 0.0
+
+    def record(self, ms):
+        """Adds a timing
+
+        Arguments:
+            ms (float)
+                -- The timing (ms)
+
+        Returns:
+            None
+        """
+        # Find the first bucket the timing fits in
+        bucket = 0
+        while bucket < len(BUCKETS) and ms > BUCKETS[bucket]:
+            bucket += 1
+
+        self.__counts[bucket] += 1
+        self.__count += 1
+        self.__total += ms
+        self.__max = max(self.__max, ms)
+
+    def get_percentile(self, fraction):
+        """Estimates a percentile of the timings
+
+        The estimate is the upper bound of the bucket the percentile falls
+        in, but never more than the slowest timing.
+
+        Arguments:
+            fraction (float)
+                -- The percentile as a fraction (0.5 for the median)
+
+        Returns:
+            ms (float)
+                -- The estimate (ms), or 0 if there are no timings
+        """
+        if self.__count == 0:
+            return 0.0
+
+        wanted = max(1, round(self.__count * fraction))
+        seen = 0
+        for bucket, count in enumerate(self.__counts):
+            seen += count
+            if seen >= wanted and bucket < len(BUCKETS):
+                return min(BUCKETS[bucket], self.__max)
+        return self.__max
+
+    def get_stats(self):
+        """Gets a summary of the timings
+
+        Arguments:
+            None
+
+        Returns:
+            stats (dict[str:int|float|list[int]])
+                -- The count, mean, p50, p95 and max (ms) of the timings and
+                   the count of each bucket
+        """
+        return {
+            "count": self.__count,
+            "mean_ms": self.__total / self.__count if self.__count else 0.0,
+            "p50_ms": self.get_percentile(0.50),
+            "p95_ms": self.get_percentile(0.95),
+            "max_ms": self.__max,
+            "buckets": list(self.__counts),
+        }
+
+
+class Timings:
+    """The timings of the steps of every template
+
+    Timings may be recorded from any thread, as the backend runs on the
+    worker of the GUI while the GUI renders on its own thread.
+
+    Attributes:
+        Private:
+            __lock (threading.Lock)
+                -- Stops two threads changing the histograms at once
+            __histograms (dict[(str, str):backend.timings.Histogram])
+                -- The histograms keyed by (title, step)
+            __log (logging.handlers.RotatingFileHandler|None)
+                -- Appends the timings to the log, or None to not log them
+
+    Methods:
+        Magic:
+            __init__(log_file: str=None,
+                     max_bytes: int=LOG_MAX_BYTES,
+                     backups: int=LOG_BACKUPS) -> None
+        Public:
+            record(title: str|None, step: str, seconds: float) -> None
+                -- Records how long a step took
+            time(title: str|None, step: str) -> ContextManager[None]
+                -- Times a step until the end of a with block
+            time_batches(title: str|None,
+                         batches: Iterable[list[tuple]])
+                         -> Iterator[list[tuple]]
+                -- Passes on the batches of a result, timing how long they
+                   take to read
+            get_stats() -> dict[str:dict[str:dict]]
+                -- Gets a summary of the timings of every template
+            reset() -> None
+                -- Forgets every timing
+            close() -> None
+                -- Closes the log
+    """
+
+    def __init__(self, log_file=None, max_bytes=LOG_MAX_BYTES, backups=LOG_BACKUPS):
+        """The constructor for Timings
+
+        Arguments:
+            None
+
+        Keyword Arguments:
+            log_file (str) default None
+                -- The file to append the timings to, or None to not log them
+            max_bytes (int) default LOG_MAX_BYTES
+                -- How large the log may grow before it is rotated (bytes)
+            backups (int) default LOG_BACKUPS
+                -- How many old logs to keep
+
+        Returns:
+            None
+        """
+        self.__lock = threading.Lock()
+        self.__histograms = {}
+
+        self.__log = None
+        if log_file is not None:
+            self.__log = logging.handlers.RotatingFileHandler(
+                log_file, maxBytes=max_bytes, backupCount=backups, encoding="utf-8"
+            )
+
+    def record(self, title, step, seconds):
+        """Records how long a step took
+
+        Arguments:
+            title (str|None)
+                -- The title of the template, or None if there is none
+            step (str)
+                -- The step (one of STEPS)
+            seconds (float)
+                -- How long the step took (s)
+
+        Returns:
+            None
+        """
+        if title is None:
+            title = UNTITLED
+        ms = seconds * 1000
+
+        with self.__lock:
+            key = (title, step)
+            if key not in self.__histograms:
+                self.__histograms[key] = Histogram()
+            self.__histograms[key].record(ms)
+
+        if self.__log is not None:
+            line = json.dumps(
+                {
+                    "time": datetime.datetime.now().isoformat(timespec="milliseconds"),
+                    "template": title,
+                    "step": step,
+                    "ms": round(ms, 3),
+                }
+            )
+            # The handler rotates the file and has its own lock
+            self.__log.handle(logging.makeLogRecord({"msg": line}))
+
+    @contextlib.contextmanager
+    def time(self, title, step):
+        """Times a step until the end of a with block
+
+        Nothing is recorded if the block raises an error.
+
+        e.g.
+            with timings.time(title, "execute"):
+                ...
+
+        Arguments:
+            title (str|None)
+                -- The title of the template, or None if there is none
+            step (str)
+                -- The step (one of STEPS)
+
+        Returns:
+            manager (ContextManager[None])
+                -- Records the time on exit
+        """
+        start = time.perf_counter()
+        yield
+        self.record(title, step, time.perf_counter() - start)
+
+    def time_batches(self, title, batches):
+        """Passes on the batches of a result, timing how long they take to
+        read
+
+        Only the time spent reading is counted, not the time the caller
+        spends on each batch. It is recorded once every batch has been read.
+
+        Arguments:
+            title (str|None)
+                -- The title of the template, or None if there is none
+            batches (Iterable[list[tuple]])
+                -- The batches
+
+        Returns:
+            batches (Iterator[list[tuple]])
+                -- The same batches
+        """
+        iterator = iter(batches)
+        elapsed = 0.0
+        while True:
+            start = time.perf_counter()
+            try:
+                batch = next(iterator)
+            except StopIteration:
+                elapsed += time.perf_counter() - start
+                break
+            elapsed += time.perf_counter() - start
+            yield batch
+
+        self.record(title, "fetch", elapsed)
+
+    def get_stats(self):
+        """Gets a summary of the timings of every template
+
+        Arguments:
+            None
+
+        Returns:
+            stats (dict[str:dict[str:dict]])
+                -- The summary of each step (see Histogram.get_stats) keyed
+                   by title and then step
+        """
+        stats = {}
+        with self.__lock:
+            for (title, step), histogram in sorted(self.__histograms.items()):
+                stats.setdefault(title, {})[step] = histogram.get_stats()
+        return stats
+
+    def reset(self):
+        """Forgets every timing"""
+        with self.__lock:
+            self.__histograms.clear()
+
+    def close(self):
+        """Closes the log"""
+        if self.__log is not None:
+            self.__log.close()
+            self.__log = None
@@ -0,0 +1,2 @@
+# Tools which measure how the backend performs. They are run as modules,
+# for example `python3 -m benchmarks.load_test`
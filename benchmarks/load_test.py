@@ -0,0 +1,200 @@
+"""Simulates several clerks using the database at once
+
+Each clerk is a separate process with its own Backend, as if it were
+another front-desk PC sharing the database file. Clerks look up children by
+caregiver and rename children, committing after every few changes, and
+report how long they waited for the write lock.
+
+The database is copied first so the real one is not changed, unless
+--in-place is given.
+
+Usage:
+    python3 -m benchmarks.load_test [--clerks N] [--operations N]
+                                    [--write-ratio R] [--in-place] [database]
+"""
+
+import argparse
+import multiprocessing
+import os
+import random
+import shutil
+import sqlite3
+import tempfile
+import time
+
+import backend.master
+
+
+def run_clerk(database, clerk, operations, write_ratio, autosave_writes, seed, start_at):
+    """Runs one clerk. Runs in its own process.
+
+    Arguments:
+        database (str)
+            -- The database file
+        clerk (int)
+            -- The number of the clerk
+        operations (int)
+            -- How many queries to run
+        write_ratio (float)
+            -- The fraction of the queries which change the database
+        autosave_writes (int)
+            -- How many changes to make before committing
+        seed (int)
+            -- The seed for the random choices of the clerk
+        start_at (float)
+            -- When to start (time.time), so every clerk starts together
+
+    Returns:
+        stats (dict[str:Any])
+            -- The counts, latencies and lock statistics of the clerk
+    """
+    rand = random.Random(seed + clerk)
+
+    # Find the range of ids to pick from
+    connection = sqlite3.connect(database)
+    max_child, max_caregiver = connection.execute(
+        "SELECT (SELECT MAX(ChildID) FROM Children),"
+        " (SELECT MAX(CaregiverID) FROM Caregivers)"
+    ).fetchone()
+    connection.close()
+
+    master = backend.master.Backend(database, autosave_writes=autosave_writes)
+
+    # Wait for the other clerks
+    time.sleep(max(0.0, start_at - time.time()))
+
+    reads = writes = failures = 0
+    latencies = []
+    started = time.perf_counter()
+    for _ in range(operations):
+        start = time.perf_counter()
+        try:
+            if rand.random() < write_ratio:
+                # Rename a child
+                query = master.gen_new_query("change", None)
+                query.update_data(
+                    "ChildName", "Children", f"Clerk {clerk} {rand.randrange(1000)}"
+                )
+                query.update_constraint(
+                    "ChildID", "Children", rand.randint(1, max_child)
+                )
+                master.handle_query(query)
+                writes += 1
+            else:
+                # Look up the children of a caregiver
+                query = master.gen_new_query("get", 20)
+                query.update_data("ChildID", "Children")
+                query.update_data("ChildName", "Children")
+                query.update_constraint(
+                    "CaregiverID", "Children", rand.randint(1, max_caregiver)
+                )
+                query.fetch_page(master.handle_query(query))
+                reads += 1
+        except sqlite3.OperationalError as err:
+            # The lock could not be got even after retrying
+            if not backend.master.is_busy(err):
+                raise
+            failures += 1
+        latencies.append(time.perf_counter() - start)
+
+    # Save whatever is left
+    master.commit()
+    elapsed = time.perf_counter() - started
+    master.close()
+
+    latencies.sort()
+    return {
+        "clerk": clerk,
+        "reads": reads,
+        "writes": writes,
+        "failures": failures,
+        "p50": latencies[len(latencies) // 2] if latencies else 0.0,
+        "max": latencies[-1] if latencies else 0.0,
+        "elapsed": elapsed,
+        "lock": master.get_lock_stats(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Run several simulated clerks against one database"
+    )
+    parser.add_argument("database", nargs="?", default=backend.master.DB_NAME)
+    parser.add_argument("--clerks", type=int, default=4)
+    parser.add_argument("--operations", type=int, default=200)
+    parser.add_argument(
+        "--write-ratio",
+        type=float,
+        default=0.3,
+        help="the fraction of queries which change the database",
+    )
+    parser.add_argument(
+        "--autosave-writes",
+        type=int,
+        default=1,
+        help="how many changes each clerk makes before committing",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--in-place",
+        action="store_true",
+        help="use the database itself rather than a copy",
+    )
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        database = args.database
+        if not args.in_place:
+            database = os.path.join(directory, "load_test.db")
+            shutil.copy(args.database, database)
+
+        # Bring the copy up to date once, rather than in every clerk
+        backend.master.Backend(database).close()
+
+        start_at = time.time() + 1
+        jobs = [
+            (
+                database,
+                clerk,
+                args.operations,
+                args.write_ratio,
+                args.autosave_writes,
+                args.seed,
+                start_at,
+            )
+            for clerk in range(args.clerks)
+        ]
+
+        with multiprocessing.Pool(args.clerks) as pool:
+            results = pool.starmap(run_clerk, jobs)
+
+    # The clerks start together, so the slowest one took the whole time
+    elapsed = max(result["elapsed"] for result in results)
+
+    # Report each clerk and then the totals
+    print(
+        f"{'clerk':>5} {'reads':>6} {'writes':>6} {'failed':>6} {'p50 ms':>8}"
+        f" {'max ms':>8} {'waits':>6} {'wait s':>8} {'max wait':>8} {'retries':>7}"
+    )
+    for result in results:
+        lock = result["lock"]
+        print(
+            f"{result['clerk']:>5} {result['reads']:>6} {result['writes']:>6}"
+            f" {result['failures']:>6} {result['p50'] * 1000:>8.2f}"
+            f" {result['max'] * 1000:>8.2f} {lock['waits']:>6}"
+            f" {lock['wait_time']:>8.3f} {lock['max_wait']:>8.3f}"
+            f" {lock['retries']:>7}"
+        )
+
+    operations = sum(result["reads"] + result["writes"] for result in results)
+    wait_time = sum(result["lock"]["wait_time"] for result in results)
+    print(
+        f"\n{operations} queries in {elapsed:.2f}s"
+        f" ({operations / max(elapsed, 1e-9):.0f}/s),"
+        f" {wait_time:.3f}s waiting for the write lock,"
+        f" {sum(result['failures'] for result in results)} failed"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,224 @@
+"""Measures how many requests backend.service answers per second
+
+Several connections send requests at once, each waiting for its answer
+before sending the next. Most requests look up the sessions of a child and
+the rest rename a child.
+
+With --spawn, the service is started on a copy of the database, so the real
+one is not changed.
+
+Usage:
+    python3 -m benchmarks.service_client [--spawn] [--port PORT]
+                                         [--connections N] [--requests N]
+                                         [--write-ratio R]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import shutil
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+
+import backend.master
+
+
+async def send(stream_in, stream_out, host, title, values):
+    """Sends one request and reads its answer
+
+    Arguments:
+        stream_in (asyncio.StreamReader)
+            -- Reads from the connection
+        stream_out (asyncio.StreamWriter)
+            -- Writes to the connection
+        host (str)
+            -- The host of the service
+        title (str)
+            -- The title of the template
+        values (dict[str:Any])
+            -- The values of the inputs
+
+    Returns:
+        status (int)
+            -- The HTTP status of the answer
+    """
+    body = json.dumps({"title": title, "values": values}).encode("utf-8")
+    stream_out.write(
+        f"POST /query HTTP/1.1\r\nHost: {host}\r\n"
+        f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n"
+        .encode("latin-1")
+        + body
+    )
+    await stream_out.drain()
+
+    status = int((await stream_in.readline()).split()[1])
+    length = 0
+    while True:
+        line = await stream_in.readline()
+        if line in (b"\r\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        if name.strip().lower() == "content-length":
+            length = int(value)
+    await stream_in.readexactly(length)
+    return status
+
+
+async def run_connection(host, port, requests, write_ratio, max_child, rand):
+    """Sends requests one after another over one connection
+
+    Arguments:
+        host (str)
+            -- The host of the service
+        port (int)
+            -- The port of the service
+        requests (int)
+            -- How many requests to send
+        write_ratio (float)
+            -- The fraction of the requests which change the database
+        max_child (int)
+            -- The largest ChildID
+        rand (random.Random)
+            -- The random choices of the connection
+
+    Returns:
+        results (list[(float, int)])
+            -- The latency (s) and status of each request
+    """
+    stream_in, stream_out = await asyncio.open_connection(host, port)
+    results = []
+    try:
+        for _ in range(requests):
+            child = rand.randint(1, max_child)
+            if rand.random() < write_ratio:
+                title = "Change Child Name"
+                values = {
+                    "Children.ChildID": child,
+                    "set-data:Children.ChildName": f"Child {rand.randrange(1000)}",
+                }
+            else:
+                title = "Get Sessions A Child Attends"
+                values = {"Children.ChildID": child}
+
+            start = time.perf_counter()
+            status = await send(stream_in, stream_out, host, title, values)
+            results.append((time.perf_counter() - start, status))
+    finally:
+        stream_out.close()
+    return results
+
+
+async def run(args, port, max_child):
+    """Runs every connection at once
+
+    Arguments:
+        args (argparse.Namespace)
+            -- The command line arguments
+        port (int)
+            -- The port of the service
+        max_child (int)
+            -- The largest ChildID
+
+    Returns:
+        results (list[(float, int)])
+            -- The latency (s) and status of each request
+        elapsed (float)
+            -- How long every request took (s)
+    """
+    per_connection = max(1, args.requests // args.connections)
+    started = time.perf_counter()
+    batches = await asyncio.gather(
+        *(
+            run_connection(
+                args.host,
+                port,
+                per_connection,
+                args.write_ratio,
+                max_child,
+                random.Random(args.seed + connection),
+            )
+            for connection in range(args.connections)
+        )
+    )
+    elapsed = time.perf_counter() - started
+    return [result for batch in batches for result in batch], elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark backend.service")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument(
+        "--spawn",
+        action="store_true",
+        help="start the service on a copy of the database",
+    )
+    parser.add_argument("--database", default=backend.master.DB_NAME)
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--connections", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--write-ratio", type=float, default=0.1)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    connection = sqlite3.connect(args.database)
+    max_child = connection.execute("SELECT MAX(ChildID) FROM Children").fetchone()[0]
+    connection.close()
+
+    with tempfile.TemporaryDirectory() as directory:
+        process = None
+        port = args.port
+        if args.spawn:
+            database = os.path.join(directory, "service.db")
+            shutil.copy(args.database, database)
+            process = subprocess.Popen(
+                [
+                    sys.executable,
+                    "-m",
+                    "backend.service",
+                    database,
+                    "--host",
+                    args.host,
+                    "--port",
+                    "0",
+                    "--readers",
+                    str(args.readers),
+                ],
+                stdout=subprocess.PIPE,
+                text=True,
+            )
+            # Wait for "Listening on http://host:port"
+            port = int(process.stdout.readline().rsplit(":", 1)[1])
+
+        try:
+            results, elapsed = asyncio.run(run(args, port, max_child))
+        finally:
+            if process is not None:
+                process.terminate()
+                process.wait()
+
+    latencies = sorted(latency for latency, _ in results)
+    statuses = {}
+    for _, status in results:
+        statuses[status] = statuses.get(status, 0) + 1
+
+    def percentile(fraction):
+        return latencies[min(len(latencies) - 1, int(len(latencies) * fraction))]
+
+    print(f"{len(results)} requests over {args.connections} connections")
+    print(f"{len(results) / elapsed:.0f} requests per second")
+    print(
+        f"p50 {percentile(0.50) * 1000:.2f} ms,"
+        f" p99 {percentile(0.99) * 1000:.2f} ms,"
+        f" max {latencies[-1] * 1000:.2f} ms"
+    )
+    print("statuses:", ", ".join(f"{k}: {v}" for k, v in sorted(statuses.items())))
+
+
+if __name__ == "__main__":
+    main()
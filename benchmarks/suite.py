@@ -0,0 +1,474 @@
+"""Benchmarks every template against small, medium and large databases
+
+The databases are made by backend.one_time_run.generate_data and kept in
+--data-dir, so later runs with the same seed reuse them.
+
+Each template is filled in with values taken from random rows of the
+database, the way a clerk would look up someone who exists, and run through
+backend.master.Backend many times. Changes are rolled back after each run, so
+the database is never changed. Reads fetch their first page, which is what
+the GUI shows.
+
+For each template and size the results give the p50 and p95 latency, the
+rows returned (or changed), the plan SQLite uses and whether that plan scans
+a whole table or sorts with a temporary B-tree. They are written as JSON, so
+the results of two commits can be compared.
+
+Usage:
+    python3 -m benchmarks.suite [--sizes SIZE ...] [--iterations N]
+                                [--warmup N] [--template TITLE ...]
+                                [--data-dir DIR] [--regenerate] [--seed N]
+                                [--output FILE]
+"""
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+
+import backend.master
+import backend.plans
+import backend.templates
+from backend.one_time_run import generate_data
+
+# The arguments of generate_data for each size of database
+SIZES = {
+    "small": {"caregivers": 150, "children": 250, "years": 1},
+    "medium": {"caregivers": 600, "children": 1000, "years": 2},
+    "large": {"caregivers": 1200, "children": 2000, "years": 3},
+}
+
+# The tables the values of the templates are taken from
+TABLES = ("Caregivers", "Children", "Sessions", "ChildSessions")
+
+
+def get_database(size, data_dir, seed, regenerate=False):
+    """Gets the database of a size, generating it if it does not exist
+
+    Arguments:
+        size (str)
+            -- The size of the database (a key of SIZES)
+        data_dir (str)
+            -- The directory the databases are kept in
+        seed (int)
+            -- The seed of the database
+
+    Keyword Arguments:
+        regenerate (bool) default False
+            -- Whether to generate the database even if it exists
+
+    Returns:
+        database (str)
+            -- The database file
+    """
+    os.makedirs(data_dir, exist_ok=True)
+    database = os.path.join(data_dir, f"{size}-{seed}.db")
+
+    if os.path.exists(database) and not regenerate:
+        return database
+
+    # Generate it under another name, so a run which is stopped half way
+    # does not leave a database which looks finished
+    partial = database + ".partial"
+    for path in (partial, partial + "-wal", partial + "-shm"):
+        if os.path.exists(path):
+            os.remove(path)
+
+    print(f"Generating the {size} database...", file=sys.stderr)
+    generate_data.generate(partial, seed=seed, **SIZES[size])
+
+    # A WAL left by the database being replaced would be applied to the new
+    # one
+    for path in (database + "-wal", database + "-shm"):
+        if os.path.exists(path):
+            os.remove(path)
+    os.replace(partial, database)
+    return database
+
+
+class Sampler:
+    """Takes the values of the templates from random rows of the database
+
+    Attributes:
+        Private:
+            __connection (sqlite3.Connection)
+                -- A read only connection to the database
+            __rand (random.Random)
+                -- The random choices
+            __max_rowids (dict[str:int])
+                -- The largest rowid of each table
+            __last_date (datetime.date)
+                -- The date of the last session
+            __serial (int)
+                -- How many sets of values have been made
+
+    Methods:
+        Magic:
+            __init__(database: str, seed: int) -> None
+        Public:
+            gen_values(template: xml.etree.ElementTree.ElementTree)
+                -> dict[str:Any]
+                -- Generates the values of the inputs of a template
+            close() -> None
+                -- Closes the connection
+        Private:
+            __sample(table: str) -> dict[str:Any]
+                -- Reads a random row of a table
+    """
+
+    def __init__(self, database, seed):
+        """The constructor for Sampler
+
+        Arguments:
+            database (str)
+                -- The database file
+            seed (int)
+                -- The seed of the random choices
+
+        Returns:
+            None
+        """
+        self.__connection = sqlite3.connect(
+            f"file:{database}?mode=ro", uri=True, check_same_thread=False
+        )
+        self.__connection.row_factory = sqlite3.Row
+        self.__rand = random.Random(seed)
+
+        self.__max_rowids = {}
+        for table in TABLES:
+            self.__max_rowids[table] = self.__connection.execute(
+                f"SELECT MAX(rowid) FROM {table}"
+            ).fetchone()[0] or 0
+
+        last_date = self.__connection.execute(
+            "SELECT MAX(Date) FROM Sessions"
+        ).fetchone()[0]
+        self.__last_date = datetime.date.fromisoformat(last_date)
+        self.__serial = 0
+
+    def __sample(self, table):
+        """Reads a random row of a table
+
+        Arguments:
+            table (str)
+                -- The table
+
+        Returns:
+            row (dict[str:Any])
+                -- The row, or an empty dict if the table is empty
+        """
+        if not self.__max_rowids.get(table):
+            return {}
+
+        row = self.__connection.execute(
+            f"SELECT * FROM {table} WHERE rowid >= ? ORDER BY rowid LIMIT 1",
+            (self.__rand.randint(1, self.__max_rowids[table]),),
+        ).fetchone()
+        return dict(row) if row is not None else {}
+
+    def gen_values(self, template):
+        """Generates the values of the inputs of a template
+
+        Inputs which search are given the values of one random row of their
+        table, so they find it. Only the first optional input is filled in,
+        as a clerk searches by one thing at a time. Inputs which set data
+        are given the values of another random row, with dates moved after
+        the last session so new rows do not clash with existing ones.
+
+        Arguments:
+            template (xml.etree.ElementTree.ElementTree)
+                -- The template
+
+        Returns:
+            values (dict[str:Any])
+                -- The values keyed by "section:Table.Field" (see
+                   backend.templates)
+        """
+        self.__serial += 1
+        searched = {}
+        set_ = {}
+        optional_filled = False
+        values = {}
+
+        for item, section in backend.templates.get_inputs(template):
+            table = item.attrib["table"]
+            field = item.attrib["field"]
+
+            # Each section takes its values from one row of each table
+            rows = set_ if section == "set-data" else searched
+            if table not in rows:
+                rows[table] = self.__sample(table)
+            value = rows[table].get(field)
+
+            # Inputs with no such column are left out, so the template
+            # reports them as missing
+            if value is None:
+                continue
+
+            if section == "optional" and item.tag != "checkbox":
+                if optional_filled:
+                    continue
+                optional_filled = True
+
+            if section == "set-data" and item.tag == "date":
+                value = self.__last_date + datetime.timedelta(days=self.__serial)
+
+            values[f"{section}:{table}.{field}"] = value
+
+        return values
+
+    def close(self):
+        """Closes the connection"""
+        self.__connection.close()
+
+
+def percentile(values, fraction):
+    """Gets a percentile of some values
+
+    Arguments:
+        values (list[float])
+            -- The values, sorted
+        fraction (float)
+            -- The percentile as a fraction (0.5 for the median)
+
+    Returns:
+        value (float|None)
+            -- The percentile, or None if there are no values
+    """
+    if not values:
+        return None
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def run_template(master, sampler, template, iterations, warmup):
+    """Runs a template many times
+
+    Arguments:
+        master (backend.master.Backend)
+            -- The backend
+        sampler (benchmarks.suite.Sampler)
+            -- Makes the values of the template
+        template (xml.etree.ElementTree.ElementTree)
+            -- The template
+        iterations (int)
+            -- How many runs to time
+        warmup (int)
+            -- How many runs to make first without timing them
+
+    Returns:
+        result (dict[str:Any])
+            -- The latencies, rows, plan and errors of the template
+    """
+    latencies = []
+    rows = []
+    errors = {}
+    plan = None
+
+    for run in range(warmup + iterations):
+        values = sampler.gen_values(template)
+
+        start = time.perf_counter()
+        try:
+            query = backend.templates.compile_template(master, template, values)
+            cursor = master.handle_query(query)
+            if query.changed_db():
+                count = max(cursor.rowcount, 0)
+            else:
+                count = len(query.fetch_page(cursor))
+            elapsed = time.perf_counter() - start
+
+            if plan is None:
+                plan = master.explain_query(query)
+
+        # A clash with an existing row depends on the values, so try again.
+        # Any other error happens every time, so stop
+        except (ValueError, sqlite3.Error) as err:
+            errors[str(err)] = errors.get(str(err), 0) + 1
+            master.rollback()
+            if isinstance(err, sqlite3.IntegrityError):
+                continue
+            break
+
+        # Leave the database as it was for the next run
+        if query.changed_db():
+            master.rollback()
+
+        if run >= warmup:
+            latencies.append(elapsed)
+            rows.append(count)
+
+    latencies.sort()
+    rows.sort()
+    plan = plan or []
+
+    def to_ms(seconds):
+        return None if seconds is None else round(seconds * 1000, 3)
+
+    return {
+        "type": template.getroot().attrib["type"],
+        "runs": len(latencies),
+        "p50_ms": to_ms(percentile(latencies, 0.50)),
+        "p95_ms": to_ms(percentile(latencies, 0.95)),
+        "max_ms": to_ms(latencies[-1] if latencies else None),
+        "rows": percentile(rows, 0.50),
+        "plan": plan,
+        "full_scans": backend.plans.get_full_scans(plan),
+        "temp_btree": backend.plans.has_temp_btree(plan),
+        "errors": errors,
+    }
+
+
+def run_size(database, templates, iterations, warmup, seed):
+    """Runs every template against one database
+
+    Arguments:
+        database (str)
+            -- The database file
+        templates (dict[str:xml.etree.ElementTree.ElementTree])
+            -- The templates keyed by their title
+        iterations (int)
+            -- How many runs of each template to time
+        warmup (int)
+            -- How many runs of each template to make first
+        seed (int)
+            -- The seed of the values of the templates
+
+    Returns:
+        results (dict[str:dict[str:Any]])
+            -- The result of each template keyed by its title
+    """
+    master = backend.master.Backend(database)
+    sampler = Sampler(database, seed)
+    results = {}
+    try:
+        for title in sorted(templates):
+            results[title] = run_template(
+                master, sampler, templates[title], iterations, warmup
+            )
+    finally:
+        sampler.close()
+        master.close()
+    return results
+
+
+def count_rows(database):
+    """Counts the rows of each table of a database
+
+    Arguments:
+        database (str)
+            -- The database file
+
+    Returns:
+        counts (dict[str:int])
+            -- The number of rows keyed by table
+    """
+    connection = sqlite3.connect(database)
+    try:
+        return {
+            table: connection.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+            for table in TABLES
+        }
+    finally:
+        connection.close()
+
+
+def print_results(size, results):
+    """Prints the results of one size as a table
+
+    Arguments:
+        size (str)
+            -- The size of the database
+        results (dict[str:dict[str:Any]])
+            -- The result of each template keyed by its title
+
+    Returns:
+        None
+    """
+
+    def show(ms):
+        return "-" if ms is None else f"{ms:.2f}"
+
+    print(f"\n{size}")
+    print(f"{'Template':52} {'p50 ms':>8} {'p95 ms':>8} {'Rows':>6}  Plan")
+    for title, result in results.items():
+        notes = [f"SCAN {table}" for table in result["full_scans"]]
+        if result["temp_btree"]:
+            notes.append("TEMP B-TREE")
+        if result["errors"]:
+            notes.append(f"{sum(result['errors'].values())} errors")
+        print(
+            f"{title[:52]:52} {show(result['p50_ms']):>8}"
+            f" {show(result['p95_ms']):>8} {result['rows'] or 0:>6}"
+            f"  {', '.join(notes) or 'ok'}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark every template")
+    parser.add_argument(
+        "--sizes", nargs="+", choices=list(SIZES), default=list(SIZES)
+    )
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--warmup", type=int, default=2)
+    parser.add_argument(
+        "--template",
+        action="append",
+        metavar="TITLE",
+        help="only run this template (may be given more than once)",
+    )
+    parser.add_argument(
+        "--data-dir",
+        default=os.path.join(tempfile.gettempdir(), "sunnytots-benchmarks"),
+        help="where the generated databases are kept",
+    )
+    parser.add_argument(
+        "--regenerate",
+        action="store_true",
+        help="generate the databases even if they exist",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="benchmark-results.json")
+    args = parser.parse_args()
+
+    templates = backend.templates.load_templates()
+    if args.template is not None:
+        unknown = set(args.template) - set(templates)
+        if unknown:
+            parser.error(f"unknown templates: {', '.join(sorted(unknown))}")
+        templates = {title: templates[title] for title in args.template}
+
+    report = {
+        "created": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "iterations": args.iterations,
+        "warmup": args.warmup,
+        "seed": args.seed,
+        "sizes": {},
+    }
+
+    for size in args.sizes:
+        database = get_database(size, args.data_dir, args.seed, args.regenerate)
+        results = run_size(
+            database, templates, args.iterations, args.warmup, args.seed
+        )
+        report["sizes"][size] = {
+            "parameters": SIZES[size],
+            "rows": count_rows(database),
+            "templates": results,
+        }
+        print_results(size, results)
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, default=str)
+    print(f"\nResults written to {args.output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,17 @@
 # Import only the GUI class from the file gui/master.py to prevent
-# sunnytots_run.py having too much access to various elements
+# sunnytots_run.py having too much access to various elements. It is imported
+# when it is first used, so tools which only read the templates (such as
+# backend.batch) do not load tkinter
 
-from gui.master import Gui
+import sys
 
-print(f"Initilising GUI {Gui}")
+
+def __getattr__(name):
+    """Imports the Gui class when it is first used"""
+    if name == "Gui":
+        from gui.master import Gui
+
+        print(f"Initilising GUI {Gui}", file=sys.stderr)
+        return Gui
+
+    raise AttributeError(f"module 'gui' has no attribute '{name}'")
@@ -0,0 +1,52 @@
+"""This file contains the class used to show that a query is running"""
+
+import tkinter as tk
+from tkinter import ttk
+
+import gui.templates
+
+
+class BusyIndicator(gui.templates.HideablePage):
+    """Shows that the database is busy
+
+    Inherits from gui.templates.HideablePage
+
+    Tkinter Widgets:
+        __label (tkinter.Label)
+            -- The text saying the database is busy
+        __progress (tkinter.ttk.Progressbar)
+            -- The bar which moves while the database is busy
+
+    Methods:
+        Overridden:
+            _init_elements() -> None
+            show() -> None
+                -- Shows the indicator and starts the bar moving
+            hide() -> None
+                -- Hides the indicator and stops the bar moving
+    """
+
+    def _init_elements(self):
+        """Initilises the label and the bar
+
+        Arguments:
+            None
+
+        Returns:
+            None
+        """
+        self.__label = tk.Label(self, text="Running...")
+        self.__progress = ttk.Progressbar(self, mode="indeterminate", length=100)
+
+        self.__label.grid(column=0, row=0)
+        self.__progress.grid(column=1, row=0)
+
+    def show(self):
+        """Shows the indicator and starts the bar moving"""
+        super().show()
+        self.__progress.start()
+
+    def hide(self):
+        """Hides the indicator and stops the bar moving"""
+        self.__progress.stop()
+        super().hide()
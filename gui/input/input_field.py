@@ -1,10 +1,18 @@
 """Deals with the input box"""
 
+import collections
+import datetime
 import tkinter as tk
 import tkcalendar
 
+import backend.templates
 import gui.templates
-import re
+
+# The date the calendars start at
+START_DATE = datetime.date(2023, 1, 1)
+
+# How many built forms to keep. The inputs of older forms are reused.
+MAX_FORMS = 10
 
 
 class InputField(gui.templates.Page):
@@ -18,6 +26,12 @@ class InputField(gui.templates.Page):
                 -- The query for querying
             __template
                 -- The template of the inputfield
+            __forms (collections.OrderedDict[str:list[gui.input.input_field.Input]])
+                -- The inputs of the forms which have been built, keyed by
+                   the title of their template, least recently used first
+            __pool (dict[(type, gui.templates.Page):list[gui.input.input_field.Input]])
+                -- The hidden inputs of forms which are no longer kept,
+                   keyed by their class and their parent
 
         Tkinter Widgets:
             __searchdata (gui.input.input_field.SearchData)
@@ -30,6 +44,10 @@ class InputField(gui.templates.Page):
                 -- The input elements of the input field
             __title (tkinter.Label)
                 -- The title of the input field
+            __submit_button (gui.input.input_field.SubmitButton)
+                -- The button which submits the query
+            __cancel_button (gui.input.input_field.CancelButton)
+                -- The button which cancels the running queries
 
     Methods:
         Overridden:
@@ -44,7 +62,18 @@ class InputField(gui.templates.Page):
                    encountered in the process.
             submit_query() -> None
                 -- Submits the query for execution
+            cancel_query() -> None
+                -- Relay from CancelButton to gui.master.Gui
         Private:
+            __new_query(root: xml.etree.ElementTree.Element) -> None
+                -- Generates a new query for the template
+            __new_input(class_: type,
+                        parent: gui.templates.Page,
+                        item: xml.etree.ElementTree.Element,
+                        row: int,
+                        column: int,
+                        tag: str) -> gui.input.input_field.Input
+                -- Reuses a pooled input or creates a new one
             __check_empty_widgets() -> None
                 -- Checks if the widgets are empty and hides them if so
             __set_elements(parent: gui.templates.Page,
@@ -80,13 +109,17 @@ class InputField(gui.templates.Page):
         self.__title = tk.Label(self)
         self.__query = None
         self.__submit_button = SubmitButton(self)
+        self.__cancel_button = CancelButton(self)
         self.__template = None
+        self.__forms = collections.OrderedDict()
+        self.__pool = {}
 
         # Grid them
         self.__title.grid(column=0, row=0)
         self.__searchdata.grid(column=0, columnspan=3, row=1, pady=5)
         self.__setdata.grid(column=0, columnspan=3, row=2, pady=5)
         self.__submit_button.grid(column=1000, row=3)
+        self.__cancel_button.grid(column=1001, row=3)
         self.__optionalbox.grid(column=1, columnspan=100, row=100, pady=2)
 
         # Hide the empty widgets
@@ -95,6 +128,9 @@ class InputField(gui.templates.Page):
     def set_template(self, template):
         """Sets the template to template
 
+        The form of each template is only built once and is hidden when
+        another template is shown.
+
         Arguments:
             template (xml.etree.ElementTree.Element)
                 -- The template to set to
@@ -105,38 +141,78 @@ class InputField(gui.templates.Page):
 
         self.__template = template
 
-        # Destroy all existing elements
+        # Hide the current form
         for item in self.__elements:
-            item.destroy()
-        self.__elements = []
+            item.hide()
 
         # Get the root and set the title
         root = template.getroot()
-        self.__title["text"] = root.attrib["title"]
+        title = root.attrib["title"]
+        self.__title["text"] = title
 
-        if "limit" in root.attrib:
-            limit = int(root.attrib["limit"])
+        # Generate a new query
+        self.__new_query(root)
+
+        # If the form has been built, clear it and show it
+        if title in self.__forms:
+            self.__forms.move_to_end(title)
+            self.__elements = self.__forms[title]
+            for item in self.__elements:
+                item.reset()
+                item.show()
+
+        # Otherwise build it
         else:
-            limit = None
+            self.__elements = []
 
-        # Delete the old query and generate a new one
-        del self.__query
-        self.__query = self._parent.gen_new_query(root.attrib["type"], limit)
+            # Iterate through the items in the root
+            for item in root:
+                if item.tag == "search-data":
+                    self.__set_elements(self.__searchdata, item, item.tag)
 
-        # Iterate through the items in the root
-        for item in root:
-            if item.tag == "search-data":
-                self.__set_elements(self.__searchdata, item, item.tag)
+                elif item.tag == "set-data":
+                    self.__set_elements(self.__setdata, item, item.tag)
 
-            elif item.tag == "set-data":
-                self.__set_elements(self.__setdata, item, item.tag)
+                elif item.tag == "constraints":
+                    self.__set_elements(self, item, item.tag)
 
-            elif item.tag == "constraints":
-                self.__set_elements(self, item, item.tag)
+            self.__forms[title] = self.__elements
+
+            # Put the inputs of the least recently used form in the pool
+            if len(self.__forms) > MAX_FORMS:
+                _, elements = self.__forms.popitem(last=False)
+                for item in elements:
+                    key = (type(item), item.get_parent())
+                    self.__pool.setdefault(key, []).append(item)
 
         # Hide the empty widgets
         self.__check_empty_widgets()
 
+    def __new_query(self, root):
+        """Generates a new query for the template
+
+        Arguments:
+            root (xml.etree.ElementTree.Element)
+                -- The root of the template
+
+        Returns:
+            None
+        """
+        if "limit" in root.attrib:
+            limit = int(root.attrib["limit"])
+        else:
+            limit = None
+
+        # Delete the old query and generate a new one
+        del self.__query
+        self.__query = self._parent.gen_new_query(
+            root.attrib["type"], limit, root.attrib["title"]
+        )
+
+        # Add the keys to order by and the page key, the same way as
+        # templates run without the GUI
+        backend.templates.apply_ordering(self.__query, root)
+
     def __check_empty_widgets(self):
         """Checks if the widgets are empty and hides them if they are
 
@@ -192,7 +268,9 @@ class InputField(gui.templates.Page):
             # If it switches to horizontal mode, parse it horizontally
             if item.tag == "horizontal":
                 # Add the label
-                self.__elements.append(Label(parent, item, row, column, tag))
+                self.__elements.append(
+                    self.__new_input(Label, parent, item, row, column, tag)
+                )
 
                 # Recursion!
                 self.__set_elements(parent, item, tag, mode="horizontal", row=row)
@@ -245,35 +323,75 @@ class InputField(gui.templates.Page):
         if tag is None:
             tag = root.tag
 
+        # The class of the input, if the tag has one
+        class_ = None
+
         # This is basically a match statement but ifs and elifs because this
         # is made in python 3.8 and designed to be compatible with 3.6 and
         # match was introduced in 3.10
         if item.tag == "entry":
-            self.__elements.append(Entry(parent, item, row, column, tag))
+            class_ = Entry
         elif item.tag == "phone":
-            self.__elements.append(PhoneNum(parent, item, row, column, tag))
+            class_ = PhoneNum
         elif item.tag == "email":
-            self.__elements.append(Email(parent, item, row, column, tag))
+            class_ = Email
         elif item.tag == "radio":
-            self.__elements.append(Radio(parent, item, row, column, tag))
+            class_ = Radio
         elif item.tag == "date":
-            self.__elements.append(Date(parent, item, row, column, tag))
+            class_ = Date
         elif item.tag == "link":
-            self.__elements.append(Link(parent, item, row, column, tag))
+            class_ = Link
         elif item.tag == "get-data":
-            self.__elements.append(Data(parent, item, row, column, tag))
+            class_ = Data
         elif item.tag == "checkbox":
-            self.__elements.append(Checkbox(parent, item, row, column, tag))
+            class_ = Checkbox
         elif item.tag == "number":
-            self.__elements.append(Number(parent, item, row, column, tag))
+            class_ = Number
         elif item.tag == "label":
-            self.__elements.append(Label(parent, item, row, column, tag))
+            class_ = Label
         elif item.tag == "custom-constraint":
-            self.__elements.append(CustomConstraint(parent, item, row, column, tag))
+            class_ = CustomConstraint
         elif item.tag == "custom-select":
-            self.__elements.append(CustomSelect(parent, item, row, column, tag))
+            class_ = CustomSelect
         elif item.tag == "custom-tail":
-            self.__elements.append(CustomTail(parent, item, row, column, tag))
+            class_ = CustomTail
+
+        # Unknown tags are ignored
+        if class_ is not None:
+            self.__elements.append(
+                self.__new_input(class_, parent, item, row, column, tag)
+            )
+
+    def __new_input(self, class_, parent, item, row, column, tag):
+        """Reuses a pooled input or creates a new one
+
+        Arguments:
+            class_ (type)
+                -- The class of the input
+            parent (gui.templates.Page)
+                -- The parent to the input
+            item (xml.etree.ElementTree.Element)
+                -- The item that is being added
+            row (int)
+                -- The row of the input
+            column (int)
+                -- The column of the input
+            tag (str)
+                -- The tag of the root element
+
+        Returns:
+            input_ (gui.input.input_field.Input)
+                -- The input
+        """
+        pool = self.__pool.get((class_, parent))
+
+        # Reuse a pooled input if there is one
+        if pool:
+            input_ = pool.pop()
+            input_.reuse(item, row, column, tag)
+            return input_
+
+        return class_(parent, item, row, column, tag)
 
     def set_query(self):
         """Sets the query and returns errors if they are encountered
@@ -315,8 +433,14 @@ class InputField(gui.templates.Page):
         # Submit the query to the parent
         self._parent.submit_query(self.__query)
 
-        # Reset the input field
-        self.set_template(self.__template)
+        # Reset the input field, keeping the form
+        self.__new_query(self.__template.getroot())
+        for item in self.__elements:
+            item.reset()
+
+    def cancel_query(self):
+        """Relay from CancelButton to gui.master.Gui"""
+        self._parent.cancel_query()
 
 
 class SearchData(gui.templates.HollowPage, gui.templates.HideablePage):
@@ -342,15 +466,24 @@ class SearchData(gui.templates.HollowPage, gui.templates.HideablePage):
             is_empty (bool)
                 -- Whether the box is empty
         """
-        # If there is 1 child and that child is an optionalbox
-        if len(self.winfo_children()) == 1 and isinstance(
-            self.winfo_children()[0], OptionalBox
-        ):
-            # Return true if that box is empty, otherwise return false
-            return self.winfo_children()[0].is_empty()
+        # The children which are gridded, except the optionalbox which may
+        # be hidden while it has inputs
+        children = [
+            child
+            for child in self.winfo_children()
+            if child.winfo_manager() and not isinstance(child, OptionalBox)
+        ]
+
+        # If there are none, return true if the optionalbox is empty
+        if not children:
+            return all(
+                child.is_empty()
+                for child in self.winfo_children()
+                if isinstance(child, OptionalBox)
+            )
 
-        # Otherwise, return if there are no elements in this box
-        return len(self.winfo_children()) == 0
+        # Otherwise, the box is not empty
+        return False
 
 
 class SetData(gui.templates.HollowPage, gui.templates.HideablePage):
@@ -379,8 +512,9 @@ class SetData(gui.templates.HollowPage, gui.templates.HideablePage):
                     -- Whether the box is empty
         """
 
-        # Return true if there are no children in this box
-        return len(self.winfo_children()) == 0
+        # Return true if there are no gridded children in this box. The
+        # inputs of hidden forms are not gridded
+        return not any(child.winfo_manager() for child in self.winfo_children())
 
 
 class OptionalBox(gui.templates.HollowPage, gui.templates.HideablePage):
@@ -414,8 +548,8 @@ class OptionalBox(gui.templates.HollowPage, gui.templates.HideablePage):
             is_empty (bool)
                 -- Whether the box is empty
         """
-        # Return true if there is only the label in the box
-        return len(self.winfo_children()) <= 1
+        # Return true if there is only the label gridded in the box
+        return sum(1 for child in self.winfo_children() if child.winfo_manager()) <= 1
 
 
 class Input:
@@ -461,9 +595,28 @@ class Input:
                 -- Gets the value of the string
             set_query() -> Exception
                 -- Sets the query
+            get_parent() -> gui.templates.Page
+                -- Accessor method for _parent
+            hide() -> None
+                -- Hides the widgets of the input
+            show() -> None
+                -- Shows the widgets of the input
+            reset() -> None
+                -- Clears the value of the input
+            reuse(item: xml.etree.ElementTree.Element,
+                  row: int,
+                  column: int,
+                  type_: str) -> None
+                -- Makes the input represent another item
         Protected:
             _validate() -> bool
                 -- Checks if the input is valid
+            _grid() -> None
+                -- Grids the widgets of the input
+            _get_widgets() -> list[tkinter.Widget]
+                -- Gets the widgets of the input
+            _configure() -> None
+                -- Updates the widgets to match _item
 
     """
 
@@ -512,9 +665,106 @@ class Input:
         self._entry = tk.Entry(self._parent, textvariable=self._entryvar)
 
         # Grid them
+        self._grid()
+
+    def _grid(self):
+        """Grids the widgets of the input
+
+        Arguments:
+            None
+
+        Returns:
+            None
+        """
         self._label.grid(column=self._column + 1, row=self._row, sticky=tk.E)
         self._entry.grid(column=self._column + 2, row=self._row)
 
+    def _get_widgets(self):
+        """Gets the widgets of the input
+
+        Arguments:
+            None
+
+        Returns:
+            widgets (list[tkinter.Widget])
+                -- The widgets which are gridded
+        """
+        return [self._label, self._entry]
+
+    def _configure(self):
+        """Updates the widgets to match _item
+
+        Arguments:
+            None
+
+        Returns:
+            None
+        """
+        self._label.config(text=self._item.attrib["label"])
+
+    def get_parent(self):
+        """Accessor method for _parent"""
+        return self._parent
+
+    def hide(self):
+        """Hides the widgets of the input
+
+        Arguments:
+            None
+
+        Returns:
+            None
+        """
+        for widget in self._get_widgets():
+            widget.grid_remove()
+
+    def show(self):
+        """Shows the widgets of the input"""
+        self._grid()
+
+    def reset(self):
+        """Clears the value of the input
+
+        Arguments:
+            None
+
+        Returns:
+            None
+        """
+        self._entryvar.set("")
+
+        # Clear any error shown by the last submission
+        self._label.config(fg="#000")
+
+    def reuse(self, item, row, column, type_):
+        """Makes the input represent another item
+
+        Tkinter widgets can not move to another parent, so the input must
+        already be in the right parent.
+
+        Arguments:
+            item (xml.etree.ElementTree.Element)
+                -- The item which this is now an input from
+            row (int)
+                -- The row of the input
+            column (int)
+                -- The column of the input
+            type_ (str)
+                -- The tag of the parent node
+
+        Returns:
+            None
+        """
+        self._item = item
+        self._type = type_
+        self._row = row
+        self._column = column
+
+        # Update, clear and show the widgets
+        self._configure()
+        self.reset()
+        self.show()
+
     def destroy(self):
         """Destroys the input
 
@@ -630,8 +880,9 @@ class Input:
                 -- whether the input is valid
         """
 
-        # All possible inputs to the basic input are valid
-        return True
+        # Validate by the tag of the input, the same way as templates run
+        # without the GUI
+        return backend.templates.is_valid(self._item.tag, self._entryvar.get())
 
 
 class Entry(Input):
@@ -646,6 +897,9 @@ class Label(Input):
     Methods:
         Overridden:
             _init_elements() -> None
+            _grid() -> None
+            _get_widgets() -> list[tkinter.Widget]
+            reset() -> None
             get() -> str
             set_query() -> None
             destroy() -> None
@@ -667,8 +921,20 @@ class Label(Input):
         self._label = tk.Label(self._parent, text=attrib["label"])
 
         # Grid it
+        self._grid()
+
+    def _grid(self):
+        """Grids the label"""
         self._label.grid(column=self._column + 1, row=self._row, sticky=tk.E)
 
+    def _get_widgets(self):
+        """Gets the label"""
+        return [self._label]
+
+    def reset(self):
+        """There is no value to clear"""
+        pass
+
     def get(self):
         """Gets the relevent data"""
 
@@ -690,97 +956,31 @@ class Label(Input):
 class PhoneNum(Input):
     """A phone number input field.
 
-    Inherits from Input
-
-    Methods:
-        Overriden:
-            _validate() -> bool
+    Inherits from Input. It is validated as a "phone" (see
+    backend.templates.is_valid)
     """
 
-    def _validate(self):
-        """Validates the input box.
-
-        Arguments:
-            None
-
-        Returns:
-            is_valid (bool)
-                -- Whether the phone number is valid
-        """
-        # Get the text
-        text = self._entryvar.get()
-
-        # \+? -- The number may start with a plus
-        # ((\(?\d+\)?)(-|\s+))+ -- It is followed by at least one:
-        #     (\(?\d+\)?)? -- Maybe some digits which might be in brackets
-        #     (-|\s+) -- a hyphen or some whitespace
-        # e.g.
-        #   +44 1865 242191
-        #   01865 253432
-        #   +1 (201) 4132-7351
-        #   +389-326-385-0068
-
-        # If the regular expression matches return True
-        if re.match(r"^\+?((\(?\d+\)?)?(-|\s+)?)+$", text):
-            return True
-        # If there is other text return False
-        elif text:
-            return False
-        # If it is empty return True
-        else:
-            return True
+    pass
 
 
 class Email(Input):
     """An email input field.
 
-    Inherits from Input
-
-    Methods:
-        Overriden:
-            _validate() -> bool
+    Inherits from Input. It is validated as an "email" (see
+    backend.templates.is_valid)
     """
 
-    def _validate(self):
-        """Validates the input box.
-
-        Arguments:
-            None
-
-        Returns:
-            is_valid (bool)
-                -- Whether the phone number is valid
-        """
-        # The only way to validate an email without sending a confirmation
-        # message or excluding valid emails.
-
-        # Return true if and only if it is either empty or there is an @
-        return "@" in self._entryvar.get() or self._entryvar.get() == ""
+    pass
 
 
 class Number(Input):
-    """An email input field.
+    """A number input field.
 
-    Inherits from Input
-
-    Methods:
-        Overriden:
-            _validate() -> bool
+    Inherits from Input. It is validated as a "number" (see
+    backend.templates.is_valid)
     """
 
-    def _validate(self):
-        """Validates the input box.
-
-        Arguments:
-            None
-
-        Returns:
-            is_valid (bool)
-                -- Whether the phone number is valid
-        """
-        # Return true if and only if it is either empty or there are only
-        # digits
-        return self._entryvar.get().isnumeric() or self._entryvar.get() == ""
+    pass
 
 
 class Radio(Input):
@@ -793,6 +993,9 @@ class Radio(Input):
     Methods:
         Overridden:
             _init_elements() -> None
+            _grid() -> None
+            _get_widgets() -> list[tkinter.Widget]
+            _configure() -> None
             get() -> str
             destroy() -> None
     """
@@ -816,11 +1019,27 @@ class Radio(Input):
         # Create the label for the radio button
         self._label = tk.Label(self._parent, text=attrib["label"])
 
-        # Grid it
-        self._label.grid(row=self._row, column=self._column)
+        # Create the radio buttons
+        self._radios = []
+        self._configure()
 
-        # Start at column the column + 1 (1 for the label)
-        column = self._column + 1
+        # Grid them
+        self._grid()
+
+    def _configure(self):
+        """Updates the label and remakes the radio buttons to match _item
+
+        Arguments:
+            None
+
+        Returns:
+            None
+        """
+        self._label.config(text=self._item.attrib["label"])
+
+        # The options may be different, so remake the radio buttons
+        for radio in self._radios:
+            radio.destroy()
         self._radios = []
 
         # For each child of _item
@@ -834,15 +1053,33 @@ class Radio(Input):
                 self._parent, text=item.text, variable=self._entryvar, value=value,
             )
 
-            # Grid it
-            radio.grid(row=self._row, column=column)
-
             # Append it to _radios
             self._radios.append(radio)
 
+    def _grid(self):
+        """Grids the label and the radio buttons
+
+        Arguments:
+            None
+
+        Returns:
+            None
+        """
+        self._label.grid(row=self._row, column=self._column)
+
+        # Start at column the column + 1 (1 for the label)
+        column = self._column + 1
+
+        for radio in self._radios:
+            radio.grid(row=self._row, column=column)
+
             # Increment the column
             column += 1
 
+    def _get_widgets(self):
+        """Gets the label and the radio buttons"""
+        return [self._label] + self._radios
+
     def get(self):
         """Gets the data in the radio
 
@@ -854,30 +1091,10 @@ class Radio(Input):
                 -- The data in the radio
         """
 
-        # Get the value and the datatype
-        value = self._entryvar.get()
-        dtype = self._item.attrib["dtype"]
-
-        # If the datatype is an int, convert it to an int but default to 0
-        if dtype == "int":
-            try:
-                value = int(value)
-            except ValueError:
-                value = 0
-
-        # If the data type is bool, check if it is the literal "true"
-        elif dtype == "bool":
-            value = value.lower() == "true"
-
-        # If the data type is float, convert it to a float but default to 0
-        elif dtype == "float":
-            try:
-                value = float(value)
-            except ValueError:
-                value = 0.0
-
-        # Otherwise don't change it
-        return value
+        # Convert the value to the datatype
+        return backend.templates.convert(
+            self._entryvar.get(), self._item.attrib["dtype"]
+        )
 
     def destroy(self):
         """Destroys the elements inside this Input.
@@ -906,6 +1123,9 @@ class Date(Input):
     Methods:
         Overridden:
             _init_elements() -> None
+            _grid() -> None
+            _get_widgets() -> list[tkinter.Widget]
+            reset() -> None
             get() -> str
             destroy() -> None
     """
@@ -922,9 +1142,8 @@ class Date(Input):
         # Get the attributes of the XML item
         attrib = self._item.attrib
 
-        # Create and grid the label
+        # Create the label
         self._label = tk.Label(self._parent, text=attrib["label"])
-        self._label.grid(row=self._row, column=self._column + 1)
 
         # The variable used to store the data in the calendar
         self._entryvar = tk.StringVar()
@@ -932,15 +1151,30 @@ class Date(Input):
         # The calendar
         self._calendar = tkcalendar.Calendar(
             self._parent,
-            year=2023,  # Start at 2023-01-01
-            month=1,
-            day=1,
+            year=START_DATE.year,
+            month=START_DATE.month,
+            day=START_DATE.day,
             date_pattern="y-mm-dd",  # Actually yyyy-mm-dd
             variable=self._entryvar,
         )
-        # Grid the calendar
+
+        # Grid the label and the calendar
+        self._grid()
+
+    def _grid(self):
+        """Grids the label and the calendar"""
+        self._label.grid(row=self._row, column=self._column + 1)
         self._calendar.grid(row=self._row, column=self._column + 2, pady=10, padx=10)
 
+    def _get_widgets(self):
+        """Gets the label and the calendar"""
+        return [self._label, self._calendar]
+
+    def reset(self):
+        """Moves the calendar back to the date it starts at"""
+        self._calendar.selection_set(START_DATE)
+        self._label.config(fg="#000")
+
     def get(self):
         """gets the data of the calendar
 
@@ -974,6 +1208,10 @@ class Checkbox(Input):
     Methods:
         Overridden:
             _init_elements() -> None
+            _grid() -> None
+            _get_widgets() -> list[tkinter.Widget]
+            _configure() -> None
+            reset() -> None
             destroy() -> None
             get() -> str
     """
@@ -1001,8 +1239,24 @@ class Checkbox(Input):
         )
 
         # Grid it
+        self._grid()
+
+    def _grid(self):
+        """Grids the tick box"""
         self._entry.grid(column=self._column + 2, row=self._row)
 
+    def _get_widgets(self):
+        """Gets the tick box"""
+        return [self._entry]
+
+    def _configure(self):
+        """Updates the text of the tick box to match _item"""
+        self._entry.config(text=self._item.attrib["label"])
+
+    def reset(self):
+        """Unticks the tick box"""
+        self._entryvar.set(0)
+
     def destroy(self):
         """Destroys the entry.
 
@@ -1034,55 +1288,58 @@ class Checkbox(Input):
         else:
             value = self._item.attrib["defaultvalue"]
 
-        # Get the dtype of the value (default string)
-        try:
-            dtype = self._item.attrib["dtype"]
-        except KeyError:
-            dtype = "str"
+        # Convert it to the dtype of the value (default string)
+        return backend.templates.convert(value, self._item.attrib.get("dtype", "str"))
 
-        # If the datatype is int, make it an int default 0
-        if dtype == "int":
-            try:
-                value = int(value)
-            except ValueError:
-                value = 0
 
-        # If it is a bool, check if it is the literal "true"
-        elif dtype == "bool":
-            value = value.lower() == "true"
+class HiddenInput(Input):
+    """An input without any widgets, which only changes the query
 
-        # If it is a float, make it a float default 0.0
-        elif dtype == "float":
-            try:
-                value = float(value)
-            except ValueError:
-                value = 0.0
-
-        # Otherwise, keep it a string
-        return value
-
-
-class CustomConstraint(Input):
-    """A custom constraint.
+    Inherits from Input
 
     Methods:
         Overridden:
             _init_elements() -> None
-            set_query() -> None
+            _grid() -> None
+            _get_widgets() -> list[tkinter.Widget]
+            _configure() -> None
+            reset() -> None
             destroy() -> None
     """
 
     def _init_elements(self):
-        """Intilise the elements
+        """There are no elements"""
+        pass
 
-        Arguments:
-            None
+    def _grid(self):
+        """There is nothing to grid"""
+        pass
 
-        Returns:
-            None
-        """
+    def _get_widgets(self):
+        """There are no widgets"""
+        return []
+
+    def _configure(self):
+        """There are no widgets to update"""
+        pass
+
+    def reset(self):
+        """There is no value to clear"""
         pass
 
+    def destroy(self):
+        """There is nothing to destroy"""
+        pass
+
+
+class CustomConstraint(HiddenInput):
+    """A custom constraint.
+
+    Methods:
+        Overridden:
+            set_query() -> None
+    """
+
     def set_query(self):
         """Sets the query.
 
@@ -1096,39 +1353,15 @@ class CustomConstraint(Input):
         query = self._parent.get_query()
         query.add_custom_constraint(self._item.text)
 
-    def destroy(self):
-        """Destroys all the non-existant elements inside the input
 
-        Arguments:
-            None
-
-        Returns:
-            None
-        """
-        pass
-
-
-class CustomSelect(Input):
+class CustomSelect(HiddenInput):
     """A custom select.
 
     Methods:
         Overridden:
-            _init_elements() -> None
             set_query() -> None
-            destroy() -> None
     """
 
-    def _init_elements(self):
-        """Intilise the elements
-
-        Arguments:
-            None
-
-        Returns:
-            None
-        """
-        pass
-
     def set_query(self):
         """Sets the query.
 
@@ -1142,39 +1375,15 @@ class CustomSelect(Input):
         query = self._parent.get_query()
         query.add_custom_select(self._item.attrib["label"], self._item.text)
 
-    def destroy(self):
-        """Destroys all the non-existant elements inside the input
-
-        Arguments:
-            None
 
-        Returns:
-            None
-        """
-        pass
-
-
-class CustomTail(Input):
+class CustomTail(HiddenInput):
     """A custom constraint.
 
     Methods:
         Overridden:
-            _init_elements() -> None
             set_query() -> None
-            destroy() -> None
     """
 
-    def _init_elements(self):
-        """Intilise the elements
-
-        Arguments:
-            None
-
-        Returns:
-            None
-        """
-        pass
-
     def set_query(self):
         """Sets the query.
 
@@ -1188,39 +1397,15 @@ class CustomTail(Input):
         query = self._parent.get_query()
         query.add_custom_tail(self._item.text)
 
-    def destroy(self):
-        """Destroys all the non-existant elements inside the input
 
-        Arguments:
-            None
-
-        Returns:
-            None
-        """
-        pass
-
-
-class Link(Input):
+class Link(HiddenInput):
     """Links (otherwise known as joins) two tables together
 
     Methods:
         Overridden:
-            _init_elements() -> None
             set_query() -> None
-            destroy() -> None
     """
 
-    def _init_elements(self):
-        """Intilise the elements
-
-        Arguments:
-            None
-
-        Returns:
-            None
-        """
-        pass
-
     def set_query(self):
         """Sets the query.
 
@@ -1241,39 +1426,15 @@ class Link(Input):
         # Add the link based on these attributes
         query.add_link(field1, field2, table1, table2)
 
-    def destroy(self):
-        """Destroys all the non-existant elements inside the input
-
-        Arguments:
-            None
 
-        Returns:
-            None
-        """
-        pass
-
-
-class Data(Input):
+class Data(HiddenInput):
     """Sets which data fields to get.
 
     Methods:
         Overridden:
-            _init_elements() -> None
             set_query() -> None
-            destroy() -> None
     """
 
-    def _init_elements(self):
-        """Intilise the elements
-
-        Arguments:
-            None
-
-        Returns:
-            None
-        """
-        pass
-
     def set_query(self):
         """Sets the query.
 
@@ -1289,8 +1450,31 @@ class Data(Input):
 
         query.update_data(field, table)
 
-    def destroy(self):
-        """Destroys all the non-existant elements inside the input
+
+class SubmitButton(gui.templates.Button):
+    """The button used when submitting a query
+
+    Inherits from gui.templates.Button
+
+    Methods:
+        Overridden:
+            _get_text() -> str
+            _command() -> None
+    """
+
+    def _get_text(self):
+        """Gets the text displayed on the button.
+
+        Arguments:
+            None
+        Returns:
+            text (str)
+                -- The text displayed on the button
+        """
+        return "Submit"
+
+    def _command(self):
+        """The command that is run when the button is pressed
 
         Arguments:
             None
@@ -1298,11 +1482,13 @@ class Data(Input):
         Returns:
             None
         """
-        pass
 
+        # Submits the query
+        self._parent.submit_query()
 
-class SubmitButton(gui.templates.Button):
-    """The button used when submitting a query
+
+class CancelButton(gui.templates.Button):
+    """The button used when cancelling the running queries
 
     Inherits from gui.templates.Button
 
@@ -1321,7 +1507,7 @@ class SubmitButton(gui.templates.Button):
             text (str)
                 -- The text displayed on the button
         """
-        return "Submit"
+        return "Cancel"
 
     def _command(self):
         """The command that is run when the button is pressed
@@ -1333,5 +1519,5 @@ class SubmitButton(gui.templates.Button):
             None
         """
 
-        # Submits the query
-        self._parent.submit_query()
+        # Cancels the queries
+        self._parent.cancel_query()
@@ -9,6 +9,7 @@ import tkinter as tk
 import tkinter.messagebox as tkmessagebox
 from tkinter import ttk
 import sqlite3
+import time
 
 # Import all the widgets in from the different files in the gui
 import gui.templates
@@ -18,6 +19,24 @@ import gui.tabbar
 import gui.input.input_xml_cache
 import gui.undo
 import gui.output
+import gui.pager
+import gui.stats
+import gui.busy
+import gui.worker
+
+# How often to check for finished queries (ms)
+POLL_INTERVAL = 50
+
+# How long a query may run for before it is cancelled (s)
+QUERY_BUDGET = 30
+
+# How often to commit the changes to the database when autosaving (ms), if
+# autosaving is turned on
+AUTOSAVE_INTERVAL = 60000
+
+# How often to check whether the write transaction is idle when autosaving
+# (ms)
+IDLE_CHECK_INTERVAL = 1000
 
 
 class Gui(gui.templates.Page):
@@ -38,6 +57,19 @@ class Gui(gui.templates.Page):
             __input_is_empty (bool)
                 -- Whether the input field is empty for use in hiding the input
                    field.
+            __page_query (backend.query.GetQuery)
+                -- The most recent query with output, used to change page
+            __shown_query (backend.query.Query)
+                -- The query whose rows are being added to the output
+            __worker (gui.worker.Worker)
+                -- The thread which runs every call to the backend
+            __cancel_tokens (set[backend.cancel.CancelToken])
+                -- The tokens of the queries which have not finished
+            __autosave_interval (int|None)
+                -- How often to commit the changes (ms) or None to only
+                   commit when asked
+            __timings (backend.timings.Timings)
+                -- How long each step of each template took
         Tkinter Elements:
             __tabbar (gui.tabbar.TabBar)
                 -- The bar which holds the buttons to visit the various tabs
@@ -48,12 +80,21 @@ class Gui(gui.templates.Page):
                 -- The field in which the input exists
             __output (gui.output.OutputBox)
                 -- The box which holds the output from the queries
-            __undo_button (gui.undo.UndoButton)
-                -- The undo button
+            __undo_bar (gui.undo.UndoBar)
+                -- The save, undo and redo buttons
+            __pager (gui.pager.Pager)
+                -- The buttons to change the page of the output
+            __busy (gui.busy.BusyIndicator)
+                -- Shows that a query is running
+            __stats_button (gui.stats.StatsButton)
+                -- Opens the timings window
+            __stats_window (gui.stats.StatsWindow|None)
+                -- The timings window, if it has been opened
 
     Methods:
         Overriden:
-            __init__(backend: backend.master.Backend) -> None
+            __init__(backend: backend.master.Backend,
+                     autosave_interval: int=None) -> None
 
             _init_elements() -> None
                 -- Initilises the tkinter elements
@@ -65,32 +106,88 @@ class Gui(gui.templates.Page):
                 -- Changes the tab to the tab specified by `tab`
             change_input(template: xml.etree.ElementTree) -> None
                 -- Changes the input field to the one specified by `template`
-            gen_new_query(type_: str) -> backend.query.Query
+            gen_new_query(type_: str, limit: int, title: str) -> backend.query.Query
                 -- Generates a new query as speficied by `type_`
             submit_query(query: backend.query.Query) -> None
                 -- Submits a query to the backend for execution
+            cancel_query() -> None
+                -- Cancels the queries which have not finished
+            next_page() -> None
+                -- Shows the next page of the output
+            previous_page() -> None
+                -- Shows the previous page of the output
             commit() -> None
                 -- Commits the changes to the database
+            save() -> None
+                -- Commits the changes to the database in the background
             rollback() -> None
                 -- Rolls back the changes to the database to the last commit
+            is_autosaving() -> bool
+                -- Whether the changes are committed every so often
             close() -> None
                 -- Closes the database
             undo() -> None
                 -- Undoes the previous change to the database
+            redo() -> None
+                -- Redoes the most recently undone change to the database
+            show_stats() -> None
+                -- Opens the timings window
+            get_timing_stats() -> dict[str:dict[str:dict]]
+                -- Gets how long each step of each template took
             mainloop() -> None
                 -- Runs the mainloop of the tkinter root
+
+        Private:
+            __run_query(query: backend.query.Query,
+                        cancel: backend.cancel.CancelToken)
+                        -> Iterable[list[tuple]]
+                -- Runs a query on the worker and streams its output
+            __show_rows(query: backend.query.Query,
+                        fields: dict[str:list[str]],
+                        rows: list[tuple],
+                        timing: dict[str:float]) -> None
+                -- Adds a batch of rows to the output of a query
+            __show_output(query: backend.query.Query,
+                          fields: dict[str:list[str]],
+                          cancel: backend.cancel.CancelToken,
+                          timing: dict[str:float]) -> None
+                -- Finishes showing the output of a query
+            __show_error(cancel: backend.cancel.CancelToken,
+                         err: Exception) -> None
+                -- Shows why a query failed
+            __poll() -> None
+                -- Handles the queries which have finished
+            __autosave() -> None
+                -- Commits the changes to the database every so often
+            __release_if_idle() -> None
+                -- Commits the changes to the database once no more are
+                   being made
     """
 
-    def __init__(self, backend):
+    def __init__(self, backend, autosave_interval=None):
         """Initilises the GUI
 
         Arguments:
             backend (backend.master.Backend)
                 -- The backend for the database
+
+        Keyword Arguments:
+            autosave_interval (int) default None
+                -- How often to commit the changes (ms), such as
+                   AUTOSAVE_INTERVAL, or None to only commit when asked
         Returns:
             None
         """
         self.__backend = backend  # The backend
+        self.__autosave_interval = autosave_interval
+
+        # The rendering of the output is timed along with the backend
+        self.__timings = backend.get_timings()
+
+        # The thread which runs every call to the backend so a slow query
+        # does not freeze the window
+        self.__worker = gui.worker.Worker()
+        self.__cancel_tokens = set()
         self.__root = GuiRoot(self)  # Generates the root of the program
 
         # Generates a cache for the xml data to format the input field
@@ -121,8 +218,20 @@ class Gui(gui.templates.Page):
         # The output box
         self.__output = gui.output.OutputBox(self)
 
-        # The undo button
-        self.__undo_buton = gui.undo.UndoButton(self)
+        # The undo and redo buttons
+        self.__undo_bar = gui.undo.UndoBar(self)
+
+        # The buttons to change the page of the output
+        self.__pager = gui.pager.Pager(self)
+        self.__page_query = None
+        self.__shown_query = None
+
+        # Shows that a query is running
+        self.__busy = gui.busy.BusyIndicator(self)
+
+        # Opens the window showing how long the queries take
+        self.__stats_button = gui.stats.StatsButton(self)
+        self.__stats_window = None
 
         # Create seperators between the TabBar and the Tabs; between
         # the Tabs and the InputField and between the InputField and the
@@ -141,13 +250,30 @@ class Gui(gui.templates.Page):
         self.__tabbar.grid(column=0, row=0, sticky=tk.W)
         self.__tabs.grid(column=0, row=1, pady=5, sticky=tk.W)
         self.__input.grid(column=0, row=3)
-        self.__undo_buton.grid(column=0, row=5, sticky=tk.W)
+        self.__undo_bar.grid(column=0, row=5, sticky=tk.W)
+        self.__busy.grid(column=0, row=5, sticky=tk.E)
         self.__output.grid(column=0, row=7)
+        self.__pager.grid(column=0, row=8, sticky=tk.W)
+        self.__stats_button.grid(column=0, row=8, sticky=tk.E)
 
         # Ungrid the input as it is empty. It will be regridded when it is not
         # emtpy
         self.__input.grid_remove()
 
+        # Hide the pager until there is output
+        self.__pager.hide()
+
+        # Hide the busy indicator until a query runs and start checking for
+        # finished queries
+        self.__busy.hide()
+        self.after(POLL_INTERVAL, self.__poll)
+
+        # Start committing the changes every so often and once the user
+        # stops making them
+        if self.__autosave_interval is not None:
+            self.after(self.__autosave_interval, self.__autosave)
+            self.after(IDLE_CHECK_INTERVAL, self.__release_if_idle)
+
         # Clear the tabs for the time being
         self.change_tab()
 
@@ -177,6 +303,9 @@ class Gui(gui.templates.Page):
                 -- The tab to change to
         """
 
+        # The output of the old tab is no longer wanted
+        self.cancel_query()
+
         # Pass the request onto tabs
         self.__tabs.change_tab(tab)
 
@@ -191,6 +320,9 @@ class Gui(gui.templates.Page):
             None
         """
 
+        # The output of the old template is no longer wanted
+        self.cancel_query()
+
         # If the input is empty, grid it and set __input_is_empty to True
         if self.__input_is_empty:
             self.__input.grid()
@@ -199,7 +331,7 @@ class Gui(gui.templates.Page):
         # Set the input field to the template
         self.__input.set_template(template)
 
-    def gen_new_query(self, type_, limit):
+    def gen_new_query(self, type_, limit, title=None):
         """Get a new query of type `type_`
 
         Arguments:
@@ -208,15 +340,20 @@ class Gui(gui.templates.Page):
             limit (int)
                 -- The limit of the query
 
+        Keyword Arguments:
+            title (str) default None
+                -- The title of the template the query is made from
+
         Returns:
             query (backend.query.Query)
                 -- The empty query
         """
         # Get the query from the backend
-        return self.__backend.gen_new_query(type_, limit)
+        return self.__backend.gen_new_query(type_, limit, title)
 
     def submit_query(self, query):
-        """Submits a query to the backend and handles the output
+        """Submits a query to the backend and handles the output when it
+        has finished
 
         Arguments:
             query (backend.query.Query)
@@ -226,18 +363,224 @@ class Gui(gui.templates.Page):
             None
         """
         fields = query.get_fields()
-        try:
-            data = self.__backend.handle_query(query)
+
+        # How long the output takes to render and to arrive in full
+        timing = {"start": time.perf_counter(), "render": 0.0}
+
+        # The token to cancel the query with
+        cancel = self.__backend.gen_cancel_token()
+        self.__cancel_tokens.add(cancel)
+
+        # The page can not change until the query has finished
+        self.__pager.set_state(False, False)
+        self.__busy.show()
+
+        self.__worker.submit(
+            self.__run_query,
+            query,
+            cancel,
+            item_callback=lambda rows: self.__show_rows(query, fields, rows, timing),
+            callback=lambda _: self.__show_output(query, fields, cancel, timing),
+            error_callback=lambda err: self.__show_error(cancel, err),
+        )
+
+    def cancel_query(self):
+        """Cancels the queries which have not finished
+
+        Arguments:
+            None
+
+        Returns:
+            None
+        """
+        for cancel in self.__cancel_tokens:
+            cancel.cancel()
+
+    def __run_query(self, query, cancel):
+        """Runs a query and streams its output. Runs on the worker.
+
+        Arguments:
+            query (backend.query.Query)
+                -- The query
+            cancel (backend.cancel.CancelToken)
+                -- The token to cancel the query with
+
+        Returns:
+            batches (Iterable[list[tuple]])
+                -- The rows of the output in batches, read on the worker
+        """
+        # Queries without output are not streamed
+        if not query.get_fields():
+            self.__backend.handle_query(query, QUERY_BUDGET, cancel)
+            return []
+
+        return self.__backend.stream_query(
+            query, budget=QUERY_BUDGET, cancel=cancel
+        )
+
+    def __show_rows(self, query, fields, rows, timing):
+        """Adds a batch of rows to the output of a query
+
+        Arguments:
+            query (backend.query.Query)
+                -- The query
+            fields (dict[str:list[str]])
+                -- The fields of the output
+            rows (list[tuple])
+                -- The rows to add
+            timing (dict[str:float])
+                -- When the query was submitted and how long its output has
+                   taken to render so far (s)
+
+        Returns:
+            None
+        """
+        start = time.perf_counter()
+
+        # Replace the previous output when the first batch arrives
+        if self.__shown_query is not query:
+            self.__output.reset()
+            self.__output.set_headers(fields)
+            self.__shown_query = query
+
+        self.__output.add_data(rows)
+
+        timing["render"] += time.perf_counter() - start
+
+    def __show_output(self, query, fields, cancel, timing):
+        """Finishes showing the output of a query
+
+        Arguments:
+            query (backend.query.Query)
+                -- The query
+            fields (dict[str:list[str]])
+                -- The fields of the output
+            cancel (backend.cancel.CancelToken)
+                -- The token to cancel the query with
+            timing (dict[str:float])
+                -- When the query was submitted and how long its output has
+                   taken to render so far (s)
+
+        Returns:
+            None
+        """
+        start = time.perf_counter()
+        self.__cancel_tokens.discard(cancel)
+
+        if fields:
+            # Show the headers even if there were no rows
+            if self.__shown_query is not query:
+                self.__output.reset()
+                self.__output.set_headers(fields)
+            self.__shown_query = None
+
+            # Remember the query so the page can be changed
+            self.__page_query = query
+            self.__pager.set_state(query.has_previous(), query.has_next())
+            self.__pager.show()
+
+        # Otherwise let the page of the previous output change again
+        elif self.__page_query is not None:
+            self.__pager.set_state(
+                self.__page_query.has_previous(), self.__page_query.has_next()
+            )
+
+        # Record how long the output took to render and to arrive in full
+        end = time.perf_counter()
+        title = query.get_title()
+        self.__timings.record(title, "render", timing["render"] + end - start)
+        self.__timings.record(title, "total", end - timing["start"])
+
+    def __show_error(self, cancel, err):
+        """Shows why a query failed
+
+        Arguments:
+            cancel (backend.cancel.CancelToken)
+                -- The token to cancel the query with
+            err (Exception)
+                -- The error raised by the query
+
+        Returns:
+            None
+        """
+        self.__cancel_tokens.discard(cancel)
+        self.__shown_query = None
+
+        # Check if the query was cancelled or ran out of time and say so
+        if isinstance(err, sqlite3.OperationalError) and cancel.is_cancelled():
+            self.__output.reset()
+            self.__output.set_headers({f"ERROR: {cancel.get_reason()}": [""]})
+            self.__pager.hide()
+
+        # Check if another instance of the app held the database for too long
+        elif isinstance(err, sqlite3.OperationalError) and "locked" in str(err):
+            self.__output.reset()
+            self.__output.set_headers({"ERROR: Database Busy, Try Again": [""]})
+            self.__pager.hide()
 
         # Check if a UNIQUE constraint has failed and give an appropriate error
-        except sqlite3.IntegrityError as err:
+        elif isinstance(err, sqlite3.IntegrityError):
             self.__output.reset()
             if err.args[0].startswith("UNIQUE constraint failed"):
                 self.__output.set_headers({"ERROR: Already Exists": [""]})
-        if fields:
+            self.__pager.hide()
+
+        # Check if the query could not be made (for example if its tables are
+        # not linked together) and show why
+        elif isinstance(err, ValueError):
             self.__output.reset()
-            self.__output.set_headers(fields)
-            self.__output.set_data(data)
+            self.__output.set_headers({f"ERROR: {err}": [""]})
+            self.__pager.hide()
+
+        # Any other error is a bug, so let tkinter report it
+        else:
+            raise err
+
+    def __poll(self):
+        """Handles the queries which have finished
+
+        Arguments:
+            None
+
+        Returns:
+            None
+        """
+        # Check again later, even if handling a query fails
+        self.after(POLL_INTERVAL, self.__poll)
+
+        self.__worker.poll()
+
+        # Only show the busy indicator while there are queries left
+        if self.__worker.is_busy():
+            self.__busy.show()
+        else:
+            self.__busy.hide()
+
+    def next_page(self):
+        """Shows the next page of the output
+
+        Arguments:
+            None
+
+        Returns:
+            None
+        """
+        if self.__page_query is not None and not self.__worker.is_busy():
+            self.__page_query.next_page()
+            self.submit_query(self.__page_query)
+
+    def previous_page(self):
+        """Shows the previous page of the output
+
+        Arguments:
+            None
+
+        Returns:
+            None
+        """
+        if self.__page_query is not None and not self.__worker.is_busy():
+            self.__page_query.previous_page()
+            self.submit_query(self.__page_query)
 
     def commit(self):
         """Commits the changes to the database so far
@@ -248,7 +591,55 @@ class Gui(gui.templates.Page):
         Returns:
             None
         """
-        self.__backend.commit()
+        # Wait for it as it is used when closing
+        self.__worker.call(self.__backend.commit)
+
+    def save(self):
+        """Commits the changes to the database in the background
+
+        Arguments:
+            None
+
+        Returns:
+            None
+        """
+        self.__worker.submit(self.__backend.autosave)
+
+    def __autosave(self):
+        """Commits the changes to the database every so often
+
+        The commit runs on the worker after any queries already submitted,
+        so the write lock is only held between autosaves.
+
+        Arguments:
+            None
+
+        Returns:
+            None
+        """
+        # Save again later
+        self.after(self.__autosave_interval, self.__autosave)
+
+        self.__worker.submit(self.__backend.autosave)
+
+    def __release_if_idle(self):
+        """Commits the changes to the database once no more are being made
+
+        This keeps the write lock from being held while the user is only
+        reading.
+
+        Arguments:
+            None
+
+        Returns:
+            None
+        """
+        # Check again later
+        self.after(IDLE_CHECK_INTERVAL, self.__release_if_idle)
+
+        # Do not queue checks behind a running query
+        if not self.__worker.is_busy():
+            self.__worker.submit(self.__backend.release_if_idle)
 
     def rollback(self):
         """Rolls back the changes to the database to the previous commit
@@ -259,7 +650,12 @@ class Gui(gui.templates.Page):
         Returns:
             None
         """
-        self.__backend.rollback()
+        # Wait for it as it is used when closing
+        self.__worker.call(self.__backend.rollback)
+
+    def is_autosaving(self):
+        """Whether the changes are committed every so often"""
+        return self.__autosave_interval is not None
 
     def undo(self):
         """Undoes the previous change to the database
@@ -270,15 +666,54 @@ class Gui(gui.templates.Page):
         Returns:
             None
         """
-        self.__backend.undo()
+        self.__worker.submit(self.__backend.undo)
+
+    def redo(self):
+        """Redoes the most recently undone change to the database
+
+        Arguments:
+            None
+
+        Returns:
+            None
+        """
+        self.__worker.submit(self.__backend.redo)
+
+    def show_stats(self):
+        """Opens the timings window, or raises it if it is open
+
+        Arguments:
+            None
+
+        Returns:
+            None
+        """
+        if self.__stats_window is not None and self.__stats_window.winfo_exists():
+            self.__stats_window.lift()
+        else:
+            self.__stats_window = gui.stats.StatsWindow(self)
+
+    def get_timing_stats(self):
+        """Gets how long each step of each template took
+
+        Arguments:
+            None
+
+        Returns:
+            stats (dict[str:dict[str:dict]])
+                -- The summary of each step keyed by title and then step
+                   (see backend.timings.Timings.get_stats)
+        """
+        return self.__timings.get_stats()
 
     def mainloop(self, *args, **kwargs):
         """Runs the mainloop of the root."""
         self.__root.mainloop(*args, **kwargs)
 
     def close(self):
-        """Close the database"""
-        self.__backend.close()
+        """Close the database and stop the worker"""
+        self.__worker.call(self.__backend.close)
+        self.__worker.stop()
 
 
 class GuiRoot(tk.Tk):
@@ -326,10 +761,17 @@ class GuiRoot(tk.Tk):
             None
         """
 
-        # Ask if the user wants to save changes to the database
-        answer = tkmessagebox.askyesnocancel(
-            title="Exiting", message="Do you want to save changes to the database?"
-        )
+        # Ask if the user wants to save changes to the database. When
+        # autosaving, only the changes since the last autosave can be
+        # discarded
+        if self.__gui.is_autosaving():
+            message = (
+                "Changes are saved automatically. Do you want to save the "
+                "changes made since the last autosave?"
+            )
+        else:
+            message = "Do you want to save changes to the database?"
+        answer = tkmessagebox.askyesnocancel(title="Exiting", message=message)
 
         # If the user answers cancel, abort destruction
         if answer is None:
@@ -340,8 +782,8 @@ class GuiRoot(tk.Tk):
         elif answer:
             self.__gui.commit()
 
-        # If the user answers no, rollback changes to the database and
-        # destroy self
+        # If the user answers no, rollback changes to the database since the
+        # last commit and destroy self
         else:
             self.__gui.rollback()
 
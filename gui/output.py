@@ -1,18 +1,32 @@
 """The file that holds the object to do with the output box"""
 
 import tkinter as tk
+import tkinter.font as tkfont
 from tkinter import ttk
 
 import gui.templates
 
+# How many rows of the output are visible at once
+VISIBLE_ROWS = 20
+
+# The narrowest a column can be (pixels)
+MIN_COLUMN_WIDTH = 80
+
 
 class OutputBox(gui.templates.HideablePage):
     """The box which holds the output
 
+    The output is shown in a ttk.Treeview, which only draws the rows that
+    are visible, so showing more rows does not slow it down.
+
     Attributes:
         Tkinter widgets:
-            __elements (list[tkinter.Seperator|tkinter.Label])
-                -- The elements in the output box
+            __table (tkinter.ttk.Treeview)
+                -- The table of the output
+            __y_scrollbar (tkinter.ttk.Scrollbar)
+                -- Scrolls the table up and down
+            __x_scrollbar (tkinter.ttk.Scrollbar)
+                -- Scrolls the table left and right
 
     Methods:
         Overridden:
@@ -22,6 +36,10 @@ class OutputBox(gui.templates.HideablePage):
                 -- Sets the header of the output table
             set_data(data: list[][]) -> None
                 -- Sets the data in the table to that specified by data
+            add_data(data: list[][]) -> None
+                -- Adds rows to the end of the data in the table
+            reset() -> None
+                -- Reset the output box
     """
 
     def _init_elements(self):
@@ -33,7 +51,25 @@ class OutputBox(gui.templates.HideablePage):
         Returns:
             None
         """
-        self.__elements = []
+        # The table, showing only the headings and not the tree column
+        self.__table = ttk.Treeview(self, show="headings", height=VISIBLE_ROWS)
+
+        # The scrollbars
+        self.__y_scrollbar = ttk.Scrollbar(
+            self, orient=tk.VERTICAL, command=self.__table.yview
+        )
+        self.__x_scrollbar = ttk.Scrollbar(
+            self, orient=tk.HORIZONTAL, command=self.__table.xview
+        )
+        self.__table.configure(
+            yscrollcommand=self.__y_scrollbar.set,
+            xscrollcommand=self.__x_scrollbar.set,
+        )
+
+        # Grid them
+        self.__table.grid(column=0, row=0, sticky=tk.NSEW)
+        self.__y_scrollbar.grid(column=1, row=0, sticky=tk.NS)
+        self.__x_scrollbar.grid(column=0, row=1, sticky=tk.EW)
 
     def set_headers(self, headers):
         """Sets the header of the output table
@@ -45,60 +81,39 @@ class OutputBox(gui.templates.HideablePage):
         Returns:
             None
         """
+        font = tkfont.nametofont(gui.templates.font)
 
-        # Sets the first column to 1
-        column = 1
+        # The heading of each column
+        headings = []
 
         # For each table in the headers
         for table in headers:
 
-            # If there are no fields in that table, ignore it
-            if len(headers[table]) == 0:
-                continue
-
-            # Add a vertical seperator between this major header and the next
-            self.__elements.append(ttk.Separator(self, orient=tk.VERTICAL))
-            self.__elements[-1].grid(
-                column=column + len(headers[table]) * 2 - 1,
-                row=0,
-                rowspan=100,
-                sticky=tk.NS,
-            )
-
-            # Create the label for the major header
-            table_lb = tk.Label(self, text=table)
-            table_lb.grid(column=column, columnspan=len(headers[table]), row=0)
-            self.__elements.append(table_lb)
-
-            # For each field in the table
+            # For each field in the table, name the column after both the
+            # table and the field. Headers without a field (such as errors)
+            # only use the table, and custom selects, which are kept under a
+            # blank table, only use their label
             for field in headers[table]:
-
-                # Create a seperator between the minor headers
-                self.__elements.append(ttk.Separator(self, orient=tk.VERTICAL))
-                self.__elements[-1].grid(
-                    column=column + 1, row=1, rowspan=100, sticky=tk.NS
-                )
-
-                # Create the lable for the minor header
-                field_lb = tk.Label(self, text=field)
-                field_lb.grid(column=column, row=2)
-                self.__elements.append(field_lb)
-
-                # Increment the column by 2 (for the seperator and the label)
-                column += 2
-
-            # Increment the column by 2 again for the other seperator
-            column += 2
-
-        # Create the seperators betweent he minor headers and the major headers
-        self.__elements.append(ttk.Separator(self, orient=tk.HORIZONTAL))
-        self.__elements[-1].grid(column=0, row=1, columnspan=100, sticky=tk.EW)
-        self.__elements.append(ttk.Separator(self, orient=tk.HORIZONTAL))
-        self.__elements[-1].grid(column=0, row=3, columnspan=100, sticky=tk.EW)
-
-        # Create a seperator at the begining because relief refuses to work
-        self.__elements.append(ttk.Separator(self, orient=tk.VERTICAL))
-        self.__elements[-1].grid(column=0, row=0, rowspan=100, sticky=tk.NS)
+                if not field:
+                    headings.append(table)
+                elif not table.strip():
+                    headings.append(field)
+                else:
+                    headings.append(f"{table}.{field}")
+
+        # Create the columns
+        columns = [f"#{i}" for i in range(1, len(headings) + 1)]
+        self.__table.configure(columns=columns)
+
+        # Set the heading and the width of each column
+        for column, heading in zip(columns, headings):
+            self.__table.heading(column, text=heading, anchor=tk.W)
+            self.__table.column(
+                column,
+                anchor=tk.W,
+                width=max(MIN_COLUMN_WIDTH, font.measure(heading) + 20),
+                stretch=False,
+            )
 
     def set_data(self, data):
         """Sets the data to that spefified in data
@@ -111,26 +126,27 @@ class OutputBox(gui.templates.HideablePage):
             None
         """
 
-        # The Row number
-        rown = 4
+        # Remove the previous data
+        self.__table.delete(*self.__table.get_children())
+        self.add_data(data)
 
-        # For each row in the data
-        for row in data:
+    def add_data(self, data):
+        """Adds rows to the end of the data in the table
 
-            # Set the column to 1
-            column = 1
+        Arguments:
+            data (list[][])
+                -- The rows to add
 
-            # For each item in the row
-            for item in row:
+        Returns:
+            None
+        """
 
-                # Create a label for that item
-                label = tk.Label(self, text=item)
-                label.grid(column=column, row=rown, sticky=tk.W)
-                self.__elements.append(label)
+        # For each row in the data
+        for row in data:
 
-                # Increase the row by 2 (seperator and label)
-                column += 2
-            rown += 1
+            # Show NULL as an empty cell
+            values = ["" if item is None else item for item in row]
+            self.__table.insert("", tk.END, values=values)
 
     def reset(self):
         """Reset the output box
@@ -142,10 +158,6 @@ class OutputBox(gui.templates.HideablePage):
             None
         """
 
-        # Destroy every element
-        for element in self.__elements:
-            element.destroy()
-
-        # Make sure the elements are really gone
-        while self.__elements:
-            del self.__elements[0]
+        # Remove every row and column
+        self.__table.delete(*self.__table.get_children())
+        self.__table.configure(columns=())
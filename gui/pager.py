@@ -0,0 +1,109 @@
+"""This file contains the classes used to move between pages of the output"""
+
+import tkinter as tk
+
+import gui.templates
+
+
+class Pager(gui.templates.HideablePage):
+    """The buttons to move between pages of the output
+
+    Inherits from gui.templates.HideablePage
+
+    Tkinter Widgets:
+        __previous_button (gui.pager.PreviousPageButton)
+            -- The button to go to the previous page
+        __next_button (gui.pager.NextPageButton)
+            -- The button to go to the next page
+
+    Methods:
+        Overridden:
+            _init_elements() -> None
+        Public:
+            set_state(has_previous: bool, has_next: bool) -> None
+                -- Enables or disables the buttons
+            previous_page() -> None
+                -- Relay from PreviousPageButton to gui.master.Gui
+            next_page() -> None
+                -- Relay from NextPageButton to gui.master.Gui
+    """
+
+    def _init_elements(self):
+        """Initilises the buttons
+
+        Arguments:
+            None
+
+        Returns:
+            None
+        """
+        self.__previous_button = PreviousPageButton(self)
+        self.__next_button = NextPageButton(self)
+
+        self.__previous_button.grid(column=0, row=0)
+        self.__next_button.grid(column=1, row=0)
+
+    def set_state(self, has_previous, has_next):
+        """Enables or disables the buttons
+
+        Arguments:
+            has_previous (bool)
+                -- Whether there is a previous page
+            has_next (bool)
+                -- Whether there is a next page
+
+        Returns:
+            None
+        """
+        self.__previous_button.config(
+            state=tk.NORMAL if has_previous else tk.DISABLED
+        )
+        self.__next_button.config(state=tk.NORMAL if has_next else tk.DISABLED)
+
+    def previous_page(self):
+        """Relay from PreviousPageButton to gui.master.Gui"""
+        self._parent.previous_page()
+
+    def next_page(self):
+        """Relay from NextPageButton to gui.master.Gui"""
+        self._parent.next_page()
+
+
+class PreviousPageButton(gui.templates.Button):
+    """The button to go to the previous page
+
+    Inherits from gui.templates.Button
+
+    Methods:
+        Overridden:
+            _get_text() -> str
+            _command() -> None
+    """
+
+    def _get_text(self):
+        """Gets the text for the button"""
+        return "Previous Page"
+
+    def _command(self):
+        """Runs the command when the button is pressed"""
+        self._parent.previous_page()
+
+
+class NextPageButton(gui.templates.Button):
+    """The button to go to the next page
+
+    Inherits from gui.templates.Button
+
+    Methods:
+        Overridden:
+            _get_text() -> str
+            _command() -> None
+    """
+
+    def _get_text(self):
+        """Gets the text for the button"""
+        return "Next Page"
+
+    def _command(self):
+        """Runs the command when the button is pressed"""
+        self._parent.next_page()
@@ -0,0 +1,140 @@
+"""This file contains the classes used to show how long the queries take"""
+
+import tkinter as tk
+from tkinter import ttk
+
+import backend.timings
+import gui.templates
+
+# How often to refresh the timings while the window is open (ms)
+REFRESH_INTERVAL = 1000
+
+# The name, heading and width (pixels) of each column of the table
+COLUMNS = (
+    ("template", "Template", 320),
+    ("step", "Step", 80),
+    ("count", "Count", 60),
+    ("mean", "Mean ms", 80),
+    ("p50", "p50 ms", 80),
+    ("p95", "p95 ms", 80),
+    ("max", "Max ms", 80),
+)
+
+
+class StatsButton(gui.templates.Button):
+    """The button which opens the timings window.
+
+    Inherits from gui.templates.Button
+
+    Methods:
+        Overridden:
+            _get_text() -> str
+                -- Gets the text for the button
+            _command() -> None
+                -- Runs when the button is pressed
+    """
+
+    def _get_text(self):
+        """Gets the text for the button"""
+        return "Show Timings"
+
+    def _command(self):
+        """Runs the command when the button is pressed"""
+        # Opens the timings window
+        self._parent.show_stats()
+
+
+class StatsWindow(tk.Toplevel):
+    """The window which shows how long each step of each template takes
+
+    Inherits from tkinter.Toplevel
+
+    Attributes:
+        Protected:
+            _parent (gui.master.Gui)
+                -- The parent to this window
+        Tkinter Widgets:
+            __table (tkinter.ttk.Treeview)
+                -- The table of the timings
+            __scrollbar (tkinter.ttk.Scrollbar)
+                -- Scrolls the table up and down
+
+    Methods:
+        Overridden:
+            __init__(parent: gui.master.Gui) -> None
+        Public:
+            refresh() -> None
+                -- Shows the latest timings
+    """
+
+    def __init__(self, parent):
+        """The constructor for StatsWindow
+
+        Arguments:
+            parent (gui.master.Gui)
+                -- The parent to this window
+
+        Returns:
+            None
+        """
+        self._parent = parent
+        super().__init__(parent)
+        self.title("Timings")
+
+        # The table of the timings, with a column for each of COLUMNS
+        names = [name for name, _, _ in COLUMNS]
+        self.__table = ttk.Treeview(self, columns=names, show="headings")
+        for name, heading, width in COLUMNS:
+            self.__table.heading(name, text=heading)
+            self.__table.column(name, width=width, stretch=False)
+
+        self.__scrollbar = ttk.Scrollbar(
+            self, orient=tk.VERTICAL, command=self.__table.yview
+        )
+        self.__table.configure(yscrollcommand=self.__scrollbar.set)
+
+        self.__table.grid(column=0, row=0, sticky=tk.NSEW)
+        self.__scrollbar.grid(column=1, row=0, sticky=tk.NS)
+        self.rowconfigure(0, weight=1)
+        self.columnconfigure(0, weight=1)
+
+        self.refresh()
+
+    def refresh(self):
+        """Shows the latest timings
+
+        Arguments:
+            None
+
+        Returns:
+            None
+        """
+        # Stop refreshing once the window has been closed
+        if not self.winfo_exists():
+            return
+        self.after(REFRESH_INTERVAL, self.refresh)
+
+        # Keep the place in the table when it is refilled
+        position = self.__table.yview()[0]
+        self.__table.delete(*self.__table.get_children())
+
+        for title, steps in self._parent.get_timing_stats().items():
+            for step in backend.timings.STEPS:
+                if step not in steps:
+                    continue
+                stats = steps[step]
+                self.__table.insert(
+                    "",
+                    tk.END,
+                    values=(
+                        title,
+                        step,
+                        stats["count"],
+                        f"{stats['mean_ms']:.2f}",
+                        f"{stats['p50_ms']:.2f}",
+                        f"{stats['p95_ms']:.2f}",
+                        f"{stats['max_ms']:.2f}",
+                    ),
+                )
+
+        self.__table.yview_moveto(position)
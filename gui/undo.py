@@ -1,9 +1,87 @@
-"""This file contains the class used in the undo button"""
+"""This file contains the classes used in the save, undo and redo buttons"""
 
 import gui.templates
 import tkinter as tk
 
 
+class UndoBar(gui.templates.Page):
+    """The buttons to save, undo and redo changes
+
+    Inherits from gui.templates.Page
+
+    Tkinter Widgets:
+        __save_button (gui.undo.SaveButton)
+            -- The save button
+        __undo_button (gui.undo.UndoButton)
+            -- The undo button
+        __redo_button (gui.undo.RedoButton)
+            -- The redo button
+
+    Methods:
+        Overridden:
+            _init_elements() -> None
+        Public:
+            save() -> None
+                -- Relay from SaveButton to gui.master.Gui
+            undo() -> None
+                -- Relay from UndoButton to gui.master.Gui
+            redo() -> None
+                -- Relay from RedoButton to gui.master.Gui
+    """
+
+    def _init_elements(self):
+        """Initilises the buttons
+
+        Arguments:
+            None
+
+        Returns:
+            None
+        """
+        self.__save_button = SaveButton(self)
+        self.__undo_button = UndoButton(self)
+        self.__redo_button = RedoButton(self)
+
+        self.__save_button.grid(column=0, row=0)
+        self.__undo_button.grid(column=1, row=0)
+        self.__redo_button.grid(column=2, row=0)
+
+    def save(self):
+        """Relay from SaveButton to gui.master.Gui"""
+        self._parent.save()
+
+    def undo(self):
+        """Relay from UndoButton to gui.master.Gui"""
+        self._parent.undo()
+
+    def redo(self):
+        """Relay from RedoButton to gui.master.Gui"""
+        self._parent.redo()
+
+
+class SaveButton(gui.templates.Button):
+    """The save button.
+
+    Inherits from gui.templates.Button
+
+    Methods:
+        Overridden:
+            _get_text() -> str
+                -- Gets the text for the button
+            _command() -> None
+                -- Runs when the button is pressed
+    """
+
+    def _get_text(self):
+        """Gets the text for the button"""
+        return "Save Changes"
+
+    def _command(self):
+        """Runs the command when the button is pressed"""
+        # Commits the changes so far
+        self._parent.save()
+
+
 class UndoButton(gui.templates.Button):
     """The undo button.
 
@@ -31,3 +109,26 @@ class UndoButton(gui.templates.Button):
         if answer == tk.messagebox.YES:
             # Undoes the previous change.
             self._parent.undo()
+
+
+class RedoButton(gui.templates.Button):
+    """The redo button.
+
+    Inherits from gui.templates.Button
+
+    Methods:
+        Overridden:
+            _get_text() -> str
+                -- Gets the text for the button
+            _command() -> None
+                -- Runs when the button is pressed
+    """
+
+    def _get_text(self):
+        """Gets the text for the button"""
+        return "Redo the Undone Change"
+
+    def _command(self):
+        """Runs the command when the button is pressed"""
+        # Redoes the most recently undone change
+        self._parent.redo()
@@ -0,0 +1,209 @@
+"""This file contains the thread which runs the database work for the GUI
+
+Tkinter is not thread safe, so the worker never touches a widget. Instead the
+result of each job is put on a queue which the GUI empties from its own
+thread with `poll()`, normally from a `tkinter.Misc.after` loop.
+"""
+
+import queue
+import threading
+
+
+class Worker:
+    """A thread which runs jobs in the order they are submitted
+
+    Every call to the backend goes through the same worker, so only one
+    thread ever uses the database connection at a time.
+
+    Attributes:
+        Private:
+            __jobs (queue.Queue)
+                -- The jobs waiting to run
+            __results (queue.Queue)
+                -- The results waiting to be handled by the GUI
+            __pending (int)
+                -- How many jobs have been submitted but not handled
+            __thread (threading.Thread)
+                -- The thread which runs the jobs
+
+    Methods:
+        Magic:
+            __init__() -> None
+        Public:
+            submit(function: Callable,
+                   *args,
+                   callback: Callable=None,
+                   error_callback: Callable=None,
+                   item_callback: Callable=None) -> None
+                -- Runs a function on the worker without waiting for it
+            call(function: Callable, *args) -> Any
+                -- Runs a function on the worker and waits for the result
+            poll() -> None
+                -- Runs the callbacks of the finished jobs
+            is_busy() -> bool
+                -- Whether any jobs have not been handled yet
+            stop() -> None
+                -- Stops the worker once the submitted jobs have run
+        Private:
+            __run() -> None
+                -- The loop of the thread
+    """
+
+    def __init__(self):
+        """The constructor for Worker
+
+        Arguments:
+            None
+
+        Returns:
+            None
+        """
+        self.__jobs = queue.Queue()
+        self.__results = queue.Queue()
+        self.__pending = 0
+
+        # A daemon thread so a stuck query can not stop the program exiting
+        self.__thread = threading.Thread(
+            target=self.__run, name="database-worker", daemon=True
+        )
+        self.__thread.start()
+
+    def __run(self):
+        """The loop of the thread
+
+        Arguments:
+            None
+
+        Returns:
+            None
+        """
+        while True:
+            job = self.__jobs.get()
+
+            # None is the signal to stop
+            if job is None:
+                return
+
+            function, args, callback, error_callback, item_callback = job
+            try:
+                result = function(*args)
+
+                # Hand over each item as soon as it is ready
+                if item_callback is not None:
+                    for item in result:
+                        self.__results.put((item_callback, None, item, None, False))
+                    result = None
+            except Exception as err:
+                self.__results.put((None, error_callback, None, err, True))
+            else:
+                self.__results.put((callback, None, result, None, True))
+
+    def submit(
+        self, function, *args, callback=None, error_callback=None, item_callback=None
+    ):
+        """Runs a function on the worker without waiting for it
+
+        The callbacks are run by `poll()` on the thread which calls it.
+
+        Arguments:
+            function (Callable)
+                -- The function to run
+            *args
+                -- The arguments to pass to the function
+
+        Keyword Arguments:
+            callback (Callable[[Any], None]) default None
+                -- Called with the result of the function
+            error_callback (Callable[[Exception], None]) default None
+                -- Called with the exception if the function raises one. If
+                   there is none, the exception is raised by `poll()`
+            item_callback (Callable[[Any], None]) default None
+                -- If given, the function must return an iterable. Each item
+                   is read on the worker and passed to item_callback, then
+                   callback is called with None
+
+        Returns:
+            None
+        """
+        self.__pending += 1
+        self.__jobs.put((function, args, callback, error_callback, item_callback))
+
+    def call(self, function, *args):
+        """Runs a function on the worker and waits for the result
+
+        The jobs submitted before it are run first.
+
+        Arguments:
+            function (Callable)
+                -- The function to run
+            *args
+                -- The arguments to pass to the function
+
+        Returns:
+            result (Any)
+                -- What the function returned
+        """
+        done = threading.Event()
+        outcome = {}
+
+        def job():
+            try:
+                outcome["result"] = function(*args)
+            except Exception as err:
+                outcome["error"] = err
+            finally:
+                done.set()
+
+        # Submit the job and wait for it
+        self.submit(job)
+        done.wait()
+
+        # Raise the error on this thread instead
+        if "error" in outcome:
+            raise outcome["error"]
+        return outcome["result"]
+
+    def poll(self):
+        """Runs the callbacks of the finished jobs
+
+        Arguments:
+            None
+
+        Returns:
+            None
+        """
+        while True:
+            try:
+                callback, error_callback, result, error, is_done = (
+                    self.__results.get_nowait()
+                )
+            except queue.Empty:
+                return
+
+            # Items are handed over before the job has finished
+            if is_done:
+                self.__pending -= 1
+
+            if error is None:
+                if callback is not None:
+                    callback(result)
+            elif error_callback is not None:
+                error_callback(error)
+            else:
+                raise error
+
+    def is_busy(self):
+        """Whether any jobs have not been handled yet"""
+        return self.__pending > 0
+
+    def stop(self):
+        """Stops the worker once the submitted jobs have run
+
+        Arguments:
+            None
+
+        Returns:
+            None
+        """
+        self.__jobs.put(None)
+        self.__thread.join()
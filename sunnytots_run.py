@@ -5,19 +5,50 @@ Usage:
         python3 sunnytots_run.py
     Windows/MacOS:
         python sunnytots_run.py
+
+To append the timings of the queries to a log, set SUNNYTOTS_TIMINGS_LOG to
+the file to write them to (see backend/timings.py).
+
+Queries slower than SUNNYTOTS_SLOW_QUERY_MS (default 250, or off) are logged
+with their plans to SUNNYTOTS_SLOW_QUERY_LOG, or to stderr if it is not set
+(see backend/slow_log.py).
+
+Changes are only saved when asked or on exit. To also commit them every
+minute and every few changes, set SUNNYTOTS_AUTOSAVE to 1. Answering "No"
+on exit then only discards the changes since the last autosave.
 """
 
+import os
+
 # Import __init__ from the GUI and the backend
 import gui
 import backend
+from gui.master import AUTOSAVE_INTERVAL
+
+# The environment variable which turns on autosaving
+AUTOSAVE_ENV = "SUNNYTOTS_AUTOSAVE"
 
 
 def main():
-    # Create the backend
-    backend_master = backend.Backend()
+    # Only autosave if asked to, as it stops "No" on exit discarding the
+    # changes
+    autosave = os.environ.get(AUTOSAVE_ENV, "").strip().lower() in (
+        "1",
+        "on",
+        "yes",
+        "true",
+    )
+
+    # Create the backend, committing every so many changes if autosaving
+    backend_master = backend.Backend(
+        autosave_writes=backend.master.AUTOSAVE_WRITES if autosave else None
+    )
 
     # Create the GUI with reference to the backend
-    gui_master = gui.Gui(backend_master)
+    gui_master = gui.Gui(
+        backend_master,
+        autosave_interval=AUTOSAVE_INTERVAL if autosave else None,
+    )
 
     # Run the GUI
     gui_master.mainloop()